@@ -1,8 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass, field, asdict
-from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Generic, List as PyList
-import json, os, datetime
-from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar, Generic, Union, List as PyList
+import json, os, shutil, sys, time, weakref, datetime, zlib, mmap, csv, itertools, threading, queue, functools, contextlib, heapq, operator, tempfile, bisect
+import concurrent.futures
+from collections import deque, namedtuple
+from array import array
+try:
+    import numpy as _np  # optional: vectorized representative scoring
+except ImportError:
+    _np = None
 
 #Subject adding system (Linked List)
 class _LLNode:
@@ -14,7 +20,9 @@ class _LLNode:
 class SinglyLinkedList:
     def __init__(self, values: Optional[Iterable[Any]]=None):
         self._head: Optional[_LLNode] = None
+        self._tail: Optional[_LLNode] = None
         self._size = 0
+        self._counts: Dict[Any, int] = {}
         if values:
             for v in values:
                 self.append(v)
@@ -25,25 +33,28 @@ class SinglyLinkedList:
             yield cur.value
             cur = cur.next
     def __contains__(self, item: Any) -> bool:
-        for v in self:
-            if v == item: return True
-        return False
+        return item in self._counts
     def to_list(self) -> List[Any]: return list(iter(self))
     def append(self, value: Any) -> None:
         n = _LLNode(value)
-        if not self._head: self._head = n
-        else:
-            cur = self._head
-            while cur.next is not None: cur = cur.next
-            cur.next = n
+        if self._tail is None: self._head = n
+        else: self._tail.next = n
+        self._tail = n
         self._size += 1
+        self._counts[value] = self._counts.get(value, 0) + 1
     def remove(self, value: Any) -> bool:
+        if value not in self._counts: return False
         prev = None; cur = self._head
         while cur is not None:
             if cur.value == value:
                 if prev is None: self._head = cur.next
                 else: prev.next = cur.next
-                self._size -= 1; return True
+                if cur is self._tail: self._tail = prev
+                self._size -= 1
+                c = self._counts[value] - 1
+                if c: self._counts[value] = c
+                else: del self._counts[value]
+                return True
             prev, cur = cur, cur.next
         return False
 
@@ -127,50 +138,564 @@ class BinarySearchTree:
     def _compute_size(self, n: Optional[_BSTNode]) -> int:
         return 0 if n is None else 1 + self._compute_size(n.left) + self._compute_size(n.right)
 
+# Student index (AVL, size-augmented)
+class _AVLNode:
+    __slots__ = ("key","value","left","right","height","size")
+    def __init__(self, key: Any, value: Any):
+        self.key = key; self.value = value
+        self.left: Optional[_AVLNode] = None; self.right: Optional[_AVLNode] = None
+        self.height = 1; self.size = 1
+
+def _avl_h(n: Optional[_AVLNode]) -> int: return n.height if n is not None else 0
+def _avl_sz(n: Optional[_AVLNode]) -> int: return n.size if n is not None else 0
+
+def _avl_fix(n: _AVLNode) -> None:
+    n.height = 1 + max(_avl_h(n.left), _avl_h(n.right))
+    n.size = 1 + _avl_sz(n.left) + _avl_sz(n.right)
+
+def _avl_rot_right(n: _AVLNode) -> _AVLNode:
+    l = n.left; n.left = l.right; l.right = n
+    _avl_fix(n); _avl_fix(l); return l
+
+def _avl_rot_left(n: _AVLNode) -> _AVLNode:
+    r = n.right; n.right = r.left; r.left = n
+    _avl_fix(n); _avl_fix(r); return r
+
+def _avl_balance(n: _AVLNode) -> _AVLNode:
+    _avl_fix(n)
+    bf = _avl_h(n.left) - _avl_h(n.right)
+    if bf > 1:
+        if _avl_h(n.left.left) < _avl_h(n.left.right): n.left = _avl_rot_left(n.left)
+        return _avl_rot_right(n)
+    if bf < -1:
+        if _avl_h(n.right.right) < _avl_h(n.right.left): n.right = _avl_rot_right(n.right)
+        return _avl_rot_left(n)
+    return n
+
+class AVLTree:
+    def __init__(self): self._root: Optional[_AVLNode] = None
+    def __len__(self): return _avl_sz(self._root)
+    def insert(self, key: Any, value: Any) -> None:
+        def _ins(n: Optional[_AVLNode]) -> _AVLNode:
+            if n is None: return _AVLNode(key, value)
+            if key < n.key: n.left = _ins(n.left)
+            elif key > n.key: n.right = _ins(n.right)
+            else: n.value = value; return n
+            return _avl_balance(n)
+        self._root = _ins(self._root)
+    def search(self, key: Any) -> Optional[Any]:
+        n = self._root
+        while n is not None:
+            if key < n.key: n = n.left
+            elif key > n.key: n = n.right
+            else: return n.value
+        return None
+    def delete(self, key: Any) -> None:
+        def _pop_min(n: _AVLNode) -> Tuple[Optional[_AVLNode], _AVLNode]:
+            if n.left is None: return n.right, n
+            n.left, m = _pop_min(n.left)
+            return _avl_balance(n), m
+        def _del(n: Optional[_AVLNode]) -> Optional[_AVLNode]:
+            if n is None: return None
+            if key < n.key: n.left = _del(n.left)
+            elif key > n.key: n.right = _del(n.right)
+            else:
+                if n.left is None: return n.right
+                if n.right is None: return n.left
+                rest, m = _pop_min(n.right)
+                m.left, m.right = n.left, rest
+                n = m
+            return _avl_balance(n)
+        self._root = _del(self._root)
+    @classmethod
+    def from_sorted(cls, items: List[Tuple[Any,Any]]) -> "AVLTree":
+        # O(n) build of a perfectly balanced tree from items already sorted by key
+        def _build(lo: int, hi: int) -> Optional[_AVLNode]:
+            if lo >= hi: return None
+            mid = (lo+hi)//2
+            n = _AVLNode(*items[mid]); n.left = _build(lo, mid); n.right = _build(mid+1, hi)
+            _avl_fix(n); return n
+        t = cls(); t._root = _build(0, len(items)); return t
+    def at(self, i: int) -> Tuple[Any,Any]:
+        n = self._root
+        while n is not None:
+            l = _avl_sz(n.left)
+            if i < l: n = n.left
+            elif i == l: return (n.key, n.value)
+            else: i -= l + 1; n = n.right
+        raise IndexError("AVLTree index out of range")
+    def slice(self, start: int, count: int) -> List[Tuple[Any,Any]]:
+        # rank select: O(log n) to reach position start, then in-order for count items
+        stack: List[_AVLNode] = []; n = self._root; i = max(0, start)
+        while n is not None:
+            l = _avl_sz(n.left)
+            if i < l: stack.append(n); n = n.left
+            elif i == l: stack.append(n); break
+            else: i -= l + 1; n = n.right
+        out: List[Tuple[Any,Any]] = []
+        while stack and len(out) < count:
+            n = stack.pop(); out.append((n.key, n.value))
+            m = n.right
+            while m is not None: stack.append(m); m = m.left
+        return out
+    def inorder(self) -> Iterator[Tuple[Any,Any]]:
+        return self.range()
+    def range(self, lo: Any=None, hi: Any=None) -> Iterator[Tuple[Any,Any]]:
+        # in-order walk bounded to lo <= key <= hi; subtrees outside the bounds are never visited
+        stack: List[_AVLNode] = []; n = self._root
+        while True:
+            while n is not None:
+                if lo is not None and n.key < lo: n = n.right
+                else: stack.append(n); n = n.left
+            if not stack: return
+            n = stack.pop()
+            if hi is not None and n.key > hi: return
+            yield (n.key, n.value)
+            n = n.right
+    def prefix(self, prefix: str) -> Iterator[Tuple[Any,Any]]:
+        for k, v in self.range(prefix):
+            if not k.startswith(prefix): return
+            yield (k, v)
+
+# Slot index (centered interval tree over half-open [start, end) intervals; built once, queried in O(log n + k))
+class _IntervalNode:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+    def __init__(self, center: float, here: List[Tuple[int,int,Any]]):
+        self.center = center
+        self.by_start = sorted(here, key=lambda t: t[0])
+        self.by_end = sorted(here, key=lambda t: t[1], reverse=True)
+        self.left: Optional[_IntervalNode] = None; self.right: Optional[_IntervalNode] = None
+
+class IntervalIndex:
+    def __init__(self, items: Iterable[Tuple[int,int,Any]]=()):
+        items = list(items)
+        self._n = len(items)
+        self._root = self._build(items)
+    def _build(self, items: List[Tuple[int,int,Any]]) -> Optional[_IntervalNode]:
+        if not items: return None
+        # the median start always lies inside its own interval, so every level keeps at least one
+        center = sorted(t[0] for t in items)[len(items)//2]
+        here = [t for t in items if t[0] <= center < t[1]]
+        node = _IntervalNode(center, here)
+        node.left = self._build([t for t in items if t[1] <= center])
+        node.right = self._build([t for t in items if t[0] > center])
+        return node
+    def __len__(self) -> int: return self._n
+    def at(self, t: float) -> List[Any]:
+        # keys of intervals with start <= t < end
+        out: List[Any] = []; n = self._root
+        while n is not None:
+            if t < n.center:
+                for s, e, k in n.by_start:
+                    if s > t: break
+                    out.append(k)
+                n = n.left
+            else:
+                for s, e, k in n.by_end:
+                    if e <= t: break
+                    out.append(k)
+                n = n.right
+        return out
+    def overlapping(self, start: float, end: float) -> List[Any]:
+        # keys of intervals sharing any time with [start, end); touching endpoints do not overlap
+        out: List[Any] = []; stack = [self._root]
+        while stack:
+            n = stack.pop()
+            if n is None: continue
+            if end <= n.center:
+                for s, e, k in n.by_start:
+                    if s >= end: break
+                    out.append(k)
+                stack.append(n.left)
+            elif start >= n.center:
+                for s, e, k in n.by_end:
+                    if e <= start: break
+                    out.append(k)
+                stack.append(n.right)
+            else:
+                out.extend(k for _, _, k in n.by_start)
+                stack.append(n.left); stack.append(n.right)
+        return out
+
+# Name search index: trigram postings over normalized names for fuzzy and substring matches, plus a sorted
+# (word, key) list for word-prefix matches; add/remove patch both, so it never needs a rebuild
+def _norm_name(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+class NameIndex:
+    __slots__ = ("_names", "_grams", "_words")
+    def __init__(self, items: Iterable[Tuple[Any, str]]=()):
+        self._names: Dict[Any, str] = {}
+        self._grams: Dict[str, Dict[Any, None]] = {}
+        self._words: List[Tuple[str, Any]] = []
+        # bulk build: words are sorted once at the end instead of insorted one by one
+        for key, name in items: self._words.extend((w, key) for w in self._post(key, name))
+        self._words.sort()
+    def __len__(self) -> int: return len(self._names)
+    def _post(self, key: Any, name: str) -> Set[str]:
+        if key in self._names: self.remove(key)
+        n = self._names[key] = _norm_name(name)
+        for g in _trigrams(f" {n} "): self._grams.setdefault(g, {})[key] = None
+        return set(n.split())
+    def add(self, key: Any, name: str) -> None:
+        for w in self._post(key, name): bisect.insort(self._words, (w, key))
+    def remove(self, key: Any) -> None:
+        n = self._names.pop(key, None)
+        if n is None: return
+        for g in _trigrams(f" {n} "):
+            keys = self._grams.get(g)
+            if keys is None: continue
+            keys.pop(key, None)
+            if not keys: del self._grams[g]
+        for w in set(n.split()):
+            i = bisect.bisect_left(self._words, (w, key))
+            if i < len(self._words) and self._words[i] == (w, key): del self._words[i]
+    def _prefixed(self, word: str) -> List[Any]:
+        # keys with a word starting with `word` (once per such word)
+        words = self._words
+        i = bisect.bisect_left(words, (word,)); j = bisect.bisect_left(words, (word[:-1] + chr(ord(word[-1]) + 1),))
+        return [k for _, k in words[i:j]]
+    def search(self, query: str, limit: int=10, min_score: float=0.4) -> List[Tuple[Any, float]]:
+        # best matches first as (key, score). Every query word starting some word of the name scores 1.5
+        # (2 when the whole name starts with the query); those outrank the fuzzy matches, scored by the share
+        # of the query's trigrams found in the name and kept when >= min_score (typos, partial words)
+        q = _norm_name(query)
+        if not q or limit <= 0: return []
+        names = self._names; qwords = q.split()
+        keys = self._prefixed(max(qwords, key=len))
+        if len(qwords) > 1:
+            keys = [k for k in dict.fromkeys(keys) if all(any(w.startswith(x) for w in names[k].split()) for x in qwords)]
+        scores: Dict[Any, float] = dict.fromkeys(keys, 1.5)
+        lead = [k for k in scores if names[k].startswith(q)]
+        for k in lead: scores[k] = 2.0
+        grams = sorted((self._grams.get(g, {}) for g in _trigrams(f" {q}")), key=len)
+        if grams and len(scores) < limit:
+            # a name reaching `need` matching trigrams must be in one of the len(grams) - need + 1 shortest
+            # posting lists, so only those are scanned for candidates
+            total = len(grams); need = max(1, int(-(-min_score * total // 1)))
+            seen: Set[Any] = set()
+            for ks in grams[:total - need + 1]:
+                for key in ks:
+                    if key in seen or key in scores: continue
+                    seen.add(key)
+                    hit = sum(1 for g in grams if key in g)
+                    if hit >= need: scores[key] = hit / total
+        pool = lead if len(lead) >= limit else scores
+        return [(k, scores[k]) for k in heapq.nsmallest(limit, pool, key=lambda k: (-scores[k], abs(len(names[k]) - len(q)), names[k], k))]
+
 # Sorting & Searching
+# Every entry point decorates first: each key is evaluated once per element, never per comparison.
+KeySpec = Union[str, Callable[[Any], Any], Tuple[Union[str, Callable[[Any], Any]], bool]]
+
+def _key_fn(spec: KeySpec) -> Tuple[Callable[[Any], Any], bool]:
+    # a key is a callable or an attribute name, optionally paired with descending=True
+    desc = False
+    if isinstance(spec, tuple): spec, desc = spec
+    return (operator.attrgetter(spec) if isinstance(spec, str) else spec), bool(desc)
+
+def sort_by(items: Iterable[Any], *keys: KeySpec) -> List[Any]:
+    # stable multi-key sort, e.g. sort_by(students, "department", (Student.gpa, True), "name");
+    # one stable pass per key from last to first, each over a precomputed key column
+    arr = list(items)
+    if not keys:
+        # no keys: the items' own ordering (numbers, strings, summaries); Students have none
+        try: return sorted(arr)
+        except TypeError as e: raise ValueError(f"sort_by() needs at least one key to order {type(arr[0]).__name__} items") from e
+    idx = list(range(len(arr)))
+    for fn, desc in reversed([_key_fn(k) for k in keys]):
+        col = [fn(x) for x in arr]
+        idx.sort(key=col.__getitem__, reverse=desc)
+    return [arr[i] for i in idx]
+
+class _Desc:
+    # inverts ordering inside a composite key (external merge needs one comparable key per row)
+    __slots__ = ("v",)
+    def __init__(self, v: Any): self.v = v
+    def __lt__(self, other: "_Desc") -> bool: return other.v < self.v
+    def __eq__(self, other: object) -> bool: return isinstance(other, _Desc) and self.v == other.v
+
+def external_sort(items: Iterable[Any], *keys: KeySpec, chunk_size: int=100000,
+                  encode: Callable[[Any], Any]=lambda x: x, decode: Callable[[Any], Any]=lambda x: x,
+                  tmpdir: Optional[str]=None) -> Iterator[Any]:
+    # sorts more rows than fit in memory: sorted runs of chunk_size rows are spilled to temp files as
+    # JSON lines [keys, encode(item)] and lazily k-way merged; stable, keys are evaluated once per row
+    specs = [_key_fn(k) for k in keys] or [(lambda x: x, False)]
+    runs: List[Any] = []
+    try:
+        it = iter(items)
+        while True:
+            chunk = list(itertools.islice(it, chunk_size))
+            if not chunk: break
+            rows = sort_by(([[fn(x) for fn, _ in specs], encode(x)] for x in chunk), *[((lambda r, i=i: r[0][i]), d) for i, (_, d) in enumerate(specs)])
+            f = tempfile.TemporaryFile("w+", encoding="utf-8", dir=tmpdir)
+            for r in rows: f.write(json.dumps(r, separators=(",",":"))); f.write("\n")
+            f.seek(0); runs.append(f)
+        def composite(r: list) -> tuple:
+            return tuple(_Desc(v) if d else v for v, (_, d) in zip(r[0], specs))
+        for r in heapq.merge(*((json.loads(line) for line in f) for f in runs), key=composite):
+            yield decode(r[1])
+    finally:
+        for f in runs: f.close()
+
 def mergesort(arr: List[Any], key: Optional[Callable[[Any], Any]]=None) -> List[Any]:
-    if key is None: key = lambda x: x
-    if len(arr) <= 1: return arr[:]
-    mid = len(arr)//2
-    left = mergesort(arr[:mid], key=key)
-    right = mergesort(arr[mid:], key=key)
-    return _merge(left, right, key)
-
-def _merge(a: List[Any], b: List[Any], key: Callable[[Any], Any]) -> List[Any]:
-    i=j=0; out: List[Any]=[]
-    while i<len(a) and j<len(b):
-        if key(a[i]) <= key(b[j]): out.append(a[i]); i+=1
-        else: out.append(b[j]); j+=1
-    out.extend(a[i:]); out.extend(b[j:]); return out
+    # stable bottom-up merge sort over (key, position) with one scratch buffer; no per-level slice copies
+    keys = list(arr) if key is None else [key(x) for x in arr]
+    n = len(keys); src = list(range(n)); dst = src[:]
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2*width):
+            mid = min(lo+width, n); hi = min(lo+2*width, n)
+            i, j = lo, mid
+            for k in range(lo, hi):
+                if j >= hi or (i < mid and keys[src[i]] <= keys[src[j]]): dst[k] = src[i]; i += 1
+                else: dst[k] = src[j]; j += 1
+        src, dst = dst, src; width *= 2
+    return [arr[i] for i in src]
 
 def quicksort(arr: List[Any], key: Optional[Callable[[Any], Any]]=None) -> List[Any]:
-    if key is None: key = lambda x: x
-    if len(arr)<=1: return arr[:]
-    pivot = arr[len(arr)//2]; pv = key(pivot)
-    less = [x for x in arr if key(x) < pv]
-    equal = [x for x in arr if key(x) == pv]
-    greater = [x for x in arr if key(x) > pv]
-    return quicksort(less, key=key) + equal + quicksort(greater, key=key)
+    # three-way partition on precomputed keys; equal keys keep their input order, as before
+    keys = list(arr) if key is None else [key(x) for x in arr]
+    def qs(idx: List[int]) -> List[int]:
+        if len(idx) <= 1: return idx
+        pv = keys[idx[len(idx)//2]]
+        less = [i for i in idx if keys[i] < pv]
+        equal = [i for i in idx if keys[i] == pv]
+        greater = [i for i in idx if keys[i] > pv]
+        return qs(less) + equal + qs(greater)
+    return [arr[i] for i in qs(list(range(len(arr))))]
 
 def binary_search(sorted_arr: List[Any], target: Any, key: Optional[Callable[[Any], Any]]=None) -> int:
+    # index of the first element whose key equals target, or -1; O(log n) key evaluations
     if key is None: key = lambda x: x
-    lo, hi = 0, len(sorted_arr)-1
-    while lo<=hi:
-        mid = (lo+hi)//2; km = key(sorted_arr[mid])
-        if km == target:
-            while mid>0 and key(sorted_arr[mid-1])==target: mid -= 1
-            return mid
-        elif km < target: lo = mid+1
-        else: hi = mid-1
-    return -1
+    lo, hi = 0, len(sorted_arr)
+    while lo < hi:
+        mid = (lo+hi)//2
+        if key(sorted_arr[mid]) < target: lo = mid+1
+        else: hi = mid
+    return lo if lo < len(sorted_arr) and key(sorted_arr[lo]) == target else -1
 
 # Models
+# Interned codes shared by every student: subjects are stored as small ints in per-student columns; only stored
+# values are ever interned (queries never add codes), so the tables grow with the distinct subjects in the data
+class _Interner:
+    __slots__ = ("values", "ids", "_lock")
+    def __init__(self) -> None:
+        self.values: List[Any] = []; self.ids: Dict[Any, int] = {}; self._lock = threading.Lock()
+    def id(self, v: Any) -> int:
+        i = self.ids.get(v)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(v)
+                if i is None:
+                    i = len(self.values); self.values.append(sys.intern(v) if isinstance(v, str) else v); self.ids[v] = i
+        return i
+
+_SUBJECT_CODES = _Interner()
+_DATE_CODES = _Interner()
+
+# Day numbers (proleptic ordinals) for ISO dates; other date strings are kept but left out of date queries.
+# The parse cache is bounded and failed parses are not cached.
+@functools.lru_cache(maxsize=4096)
+def _iso_day(date: str) -> int:
+    return datetime.date.fromisoformat(date).toordinal()
+
+def _day_number(date: Any) -> Optional[int]:
+    try: return _iso_day(date)
+    except (TypeError, ValueError): return None
+
+# Date codes stored in attendance columns: the day number of a canonical YYYY-MM-DD date (it prints back
+# unchanged), anything else an interned id tagged with _DATE_INTERNED
+_DATE_INTERNED = 1 << 31
+
+@functools.lru_cache(maxsize=4096)
+def _iso_date(day: int) -> str:
+    return datetime.date.fromordinal(day).isoformat()
+
+def _date_code(date: Any) -> int:
+    day = _day_number(date)
+    if day is not None and _iso_date(day) == date: return day
+    return _DATE_INTERNED | _DATE_CODES.id(date)
+
+def _date_of(code: int) -> Any:
+    return _DATE_CODES.values[code ^ _DATE_INTERNED] if code & _DATE_INTERNED else _iso_date(code)
+
+def _code_day(code: int) -> Optional[int]:
+    return _day_number(_DATE_CODES.values[code ^ _DATE_INTERNED]) if code & _DATE_INTERNED else code
+
+def _day_bound(v: Any) -> Optional[int]:
+    # query bound: None (open), a datetime.date or an ISO date string
+    if v is None: return None
+    if isinstance(v, datetime.date): return v.toordinal()
+    day = _day_number(str(v).strip())
+    if day is None: raise ValueError(f"Invalid date {v!r}, expected YYYY-MM-DD")
+    return day
+
+def _period_start(day: int, period: str) -> int:
+    d = datetime.date.fromordinal(day)
+    if period == "week": return day - d.weekday()
+    if period == "month": return d.replace(day=1).toordinal()
+    raise ValueError(f"Unknown period {period!r}, expected 'week' or 'month'")
+
+def _period_next(start: int, period: str) -> int:
+    if period == "week": return start + 7
+    d = datetime.date.fromordinal(start)
+    return (datetime.date(d.year + 1, 1, 1) if d.month == 12 else datetime.date(d.year, d.month + 1, 1)).toordinal()
+
+def _period_label(start: int, period: str) -> str:
+    d = datetime.date.fromordinal(start)
+    if period == "week":
+        iso = d.isocalendar(); return f"{iso[0]}-W{iso[1]:02d}"
+    return f"{d.year}-{d.month:02d}"
+
 @dataclass
 class AttendanceRecord:
+    __slots__ = ("date", "subject", "present")
     date: str
     subject: str
     present: bool
 
+class AttendanceLog:
+    # columnar attendance log: date codes, interned subject ids and a presence bitset (~8 bytes per record);
+    # behaves like the list of AttendanceRecords it replaces. A student's own log sends append/extend through
+    # record_attendance, so the running aggregates, journal and listeners see them
+    __slots__ = ("_dates", "_subjects", "_present", "_n", "_index", "_raw", "_owner")
+    def __init__(self, records: Iterable[AttendanceRecord]=()) -> None:
+        self._dates = array("I"); self._subjects = array("I"); self._present = bytearray(); self._n = 0
+        self._owner: Optional["Student"] = None
+        # row -> present as given when it was not a bool (e.g. 1 from a data file), so saves write it back unchanged
+        self._raw: Optional[Dict[int, Any]] = None
+        # date index, built on the first date query: subject (None = all) -> (sorted day numbers,
+        # prefix counts of present); in-order appends extend it, an out-of-order date drops it
+        self._index: Optional[Dict[Optional[str], Tuple[Any, Any]]] = None
+        for r in records: self.append(r)
+    def add(self, date: str, subject: str, present: bool) -> None:
+        n = self._n
+        code = _date_code(date)
+        self._dates.append(code); self._subjects.append(_SUBJECT_CODES.id(subject))
+        if not n & 7: self._present.append(0)
+        if present: self._present[n >> 3] |= 1 << (n & 7)
+        if type(present) is not bool:
+            if self._raw is None: self._raw = {}
+            self._raw[n] = present
+        self._n = n + 1
+        if self._index is not None:
+            day = _code_day(code)
+            if day is not None and not self._index_add(self._index, day, subject, present): self._index = None
+    @staticmethod
+    def _index_add(index: Dict[Optional[str], Tuple[Any, Any]], day: int, subject: str, present: bool) -> bool:
+        for key in (None, subject):
+            col = index.get(key)
+            if col is None: col = index[key] = (array("I"), array("I", [0]))
+            days, pre = col
+            if days and day < days[-1]: return False
+            days.append(day); pre.append(pre[-1] + bool(present))
+        return True
+    def _columns(self, subject: Optional[str]) -> Optional[Tuple[Any, Any]]:
+        if self._index is None:
+            index: Dict[Optional[str], Tuple[Any, Any]] = {}
+            codes, bits = _SUBJECT_CODES.values, self._present
+            rows = sorted(((day, codes[self._subjects[i]], bits[i >> 3] >> (i & 7) & 1) for i, c in enumerate(self._dates)
+                           for day in (_code_day(c),) if day is not None), key=lambda r: r[0])
+            for day, subj, p in rows: self._index_add(index, day, subj, p)
+            self._index = index
+        return self._index.get(subject)
+    def counts(self, start: Optional[int]=None, end: Optional[int]=None, subject: Optional[str]=None) -> Tuple[int, int]:
+        # (present, total) for day numbers start..end inclusive, two bisects on the date index
+        col = self._columns(subject)
+        if col is None: return 0, 0
+        days, pre = col
+        lo = 0 if start is None else bisect.bisect_left(days, start)
+        hi = len(days) if end is None else bisect.bisect_right(days, end)
+        return (pre[hi] - pre[lo], hi - lo) if hi > lo else (0, 0)
+    def rollup(self, period: str, start: Optional[int]=None, end: Optional[int]=None, subject: Optional[str]=None) -> List[Tuple[str, int, int]]:
+        # (label, present, total) per non-empty week or month; one bisect per bucket
+        col = self._columns(subject)
+        if col is None: return []
+        days, pre = col
+        cur = 0 if start is None else bisect.bisect_left(days, start)
+        hi = len(days) if end is None else bisect.bisect_right(days, end)
+        out: List[Tuple[str, int, int]] = []
+        while cur < hi:
+            b = _period_start(days[cur], period)
+            nxt = bisect.bisect_left(days, _period_next(b, period), cur, hi)
+            out.append((_period_label(b, period), pre[nxt] - pre[cur], nxt - cur))
+            cur = nxt
+        return out
+    def append(self, r: AttendanceRecord) -> None:
+        if self._owner is not None: self._owner.record_attendance(r.date, r.subject, r.present)
+        else: self.add(r.date, r.subject, r.present)
+    def extend(self, records: Iterable[AttendanceRecord]) -> None:
+        for r in records: self.append(r)
+    def rows(self) -> Iterator[Tuple[str, str, bool]]:
+        seen: Dict[int, Any] = {}; subjects, bits = _SUBJECT_CODES.values, self._present
+        for i in range(self._n):
+            c = self._dates[i]; d = seen.get(c)
+            if d is None: d = seen[c] = _date_of(c)
+            yield d, subjects[self._subjects[i]], bool(bits[i >> 3] >> (i & 7) & 1)
+    def saved_rows(self) -> Iterator[Tuple[str, str, Any]]:
+        # rows() with present exactly as it was added, for writing data files
+        raw = self._raw
+        if not raw: yield from self.rows(); return
+        for i, (d, subj, p) in enumerate(self.rows()): yield d, subj, raw.get(i, p)
+    def __iter__(self) -> Iterator[AttendanceRecord]:
+        for d, subj, p in self.rows(): yield AttendanceRecord(d, subj, p)
+    def __len__(self) -> int: return self._n
+    def copy(self) -> "AttendanceLog":
+        c = AttendanceLog()
+        c._dates = array("I", self._dates); c._subjects = array("I", self._subjects); c._present = bytearray(self._present); c._n = self._n
+        if self._raw: c._raw = dict(self._raw)
+        return c
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0: i += self._n
+        if not 0 <= i < self._n: raise IndexError("attendance log index out of range")
+        return AttendanceRecord(_date_of(self._dates[i]), _SUBJECT_CODES.values[self._subjects[i]], bool(self._present[i >> 3] >> (i & 7) & 1))
+    def __eq__(self, other: object) -> bool:
+        # present values kept as given (1 rather than True) are saved as given, so they count too
+        if isinstance(other, AttendanceLog):
+            return (self._dates == other._dates and self._subjects == other._subjects and self._present == other._present
+                    and self._saved_raw() == other._saved_raw())
+        return isinstance(other, list) and list(self) == other
+    def _saved_raw(self) -> Dict[int, Tuple[type, Any]]:
+        return {i: (type(v), v) for i, v in self._raw.items()} if self._raw else {}
+    def __repr__(self) -> str: return f"AttendanceLog({list(self)!r})"
+
+class GradeHistory(Stack[Tuple[str, float]]):
+    # the undo stack as parallel columns: interned subject ids and float64 scores, plus the positions of
+    # scores pushed as ints (handed back as ints, so saved files keep 90 rather than 90.0)
+    def __init__(self, items: Iterable[Tuple[str, float]]=()) -> None:
+        self._subjects = array("I"); self._scores = array("d"); self._ints: Set[int] = set()
+        for item in items: self.push(item)
+    def push(self, item: Tuple[str, float]) -> None:
+        if type(item[1]) is int: self._ints.add(len(self._scores))
+        self._subjects.append(_SUBJECT_CODES.id(item[0])); self._scores.append(item[1])
+    def pop(self) -> Tuple[str, float]:
+        if not self._scores: raise IndexError("pop from empty stack")
+        i = len(self._scores) - 1
+        sc: float = self._scores.pop()
+        if i in self._ints: self._ints.discard(i); sc = int(sc)
+        return _SUBJECT_CODES.values[self._subjects.pop()], sc
+    def is_empty(self) -> bool: return len(self._scores) == 0
+    def peek(self) -> Tuple[str, float]:
+        if not self._scores: raise IndexError("peek from empty stack")
+        sc = self._scores[-1]
+        return _SUBJECT_CODES.values[self._subjects[-1]], int(sc) if len(self._scores) - 1 in self._ints else sc
+    def __iter__(self) -> Iterator[Tuple[str, float]]:
+        codes, ints = _SUBJECT_CODES.values, self._ints
+        if not ints: return ((codes[i], sc) for i, sc in zip(self._subjects, self._scores))
+        return ((codes[i], int(sc) if n in ints else sc) for n, (i, sc) in enumerate(zip(self._subjects, self._scores)))
+    def __len__(self) -> int: return len(self._scores)
+    def copy(self) -> "GradeHistory":
+        c = GradeHistory(); c._subjects = array("I", self._subjects); c._scores = array("d", self._scores); c._ints = set(self._ints)
+        return c
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, GradeHistory) and self._subjects == other._subjects and self._scores == other._scores and self._ints == other._ints
+
+StudentSummary = namedtuple("StudentSummary", "student_id name department gender year gpa")
+
 @dataclass
 class Student:
     student_id: str
@@ -179,151 +704,1319 @@ class Student:
     gender: str
     year: int
     subjects: SinglyLinkedList = field(default_factory=SinglyLinkedList)
-    grades: Dict[str, List[float]] = field(default_factory=dict)
-    grade_history: Stack[Tuple[str, float]] = field(default_factory=Stack)
-    attendance_log: List[AttendanceRecord] = field(default_factory=list)
+    grades: Dict[str, "array[float]"] = field(default_factory=dict)  # subject -> array('d') of scores; change through add_grade/undo_last_grade
+    grade_history: Stack[Tuple[str, float]] = field(default_factory=GradeHistory)
+    attendance_log: AttendanceLog = field(default_factory=AttendanceLog)
+    # running aggregates so gpa()/attendance_rate() never rescan the history
+    _grade_sum: Dict[str, float] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _grade_cnt: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _gpa: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _att_present: int = field(default=0, init=False, repr=False, compare=False)
+    _att_total: int = field(default=0, init=False, repr=False, compare=False)
+    _att_by_subject: Dict[str, List[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # subject -> positions of scores given as ints; array('d') stores them as floats, saves write them back as ints
+    _int_scores: Dict[str, Set[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # set by the owning registry; called as listener(student, op, args) after every mutation
+    _listener: Optional[Callable[["Student", str, tuple], None]] = field(default=None, init=False, repr=False, compare=False)
+    # set by the owning registry; called as before(student) inside the lock, right before any mutation
+    _before: Optional[Callable[["Student"], None]] = field(default=None, init=False, repr=False, compare=False)
+    # no-op unless the owning registry is thread-safe, then a registry-read + per-student lock
+    _lock: Any = field(default=contextlib.nullcontext(), init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if self.year < 1 or self.year > 4:
             raise ValueError("Year must be 1..4")
+        # plain lists/Stacks passed by callers are converted to the compact columns
+        if not isinstance(self.attendance_log, AttendanceLog): self.attendance_log = AttendanceLog(self.attendance_log)
+        self.attendance_log._owner = self
+        if not isinstance(self.grade_history, GradeHistory): self.grade_history = GradeHistory(self.grade_history)
+        if self.grades:
+            for k, v in self.grades.items():
+                if not isinstance(v, array): self._keep_ints(k, v)
+            self.grades = {k: v if isinstance(v, array) else array("d", v) for k, v in self.grades.items()}
+        if self.grades or self.attendance_log: self._rebuild_aggregates()
     def enroll_subject(self, code: str) -> None:
         code = code.strip().upper()
-        if code in self.subjects: raise ValueError(f"Subject {code} already enrolled.")
-        self.subjects.append(code)
+        with self._lock:
+            if code in self.subjects: raise ValueError(f"Subject {code} already enrolled.")
+            if self._before is not None: self._before(self)
+            self.subjects.append(sys.intern(code))
+            self._notify("enroll", code)
     def drop_subject(self, code: str) -> None:
         code = code.strip().upper()
-        if not self.subjects.remove(code): raise ValueError(f"Subject {code} not found.")
+        with self._lock:
+            if code not in self.subjects: raise ValueError(f"Subject {code} not found.")
+            if self._before is not None: self._before(self)
+            self.subjects.remove(code)
+            self._notify("drop", code)
     def add_grade(self, subject: str, score: float) -> None:
         subject = subject.strip().upper()
-        if subject not in self.subjects: raise ValueError(f"Not enrolled in {subject}.")
-        if not (0 <= score <= 100): raise ValueError("Score must be 0..100")
-        self.grades.setdefault(subject, []).append(score)
-        self.grade_history.push((subject, score))
+        with self._lock:
+            if subject not in self.subjects: raise ValueError(f"Not enrolled in {subject}.")
+            if not (0 <= score <= 100): raise ValueError("Score must be 0..100")
+            if self._before is not None: self._before(self)
+            lst = self.grades.get(subject)
+            if lst is None: lst = self.grades[subject] = array("d")
+            if type(score) is int: self._int_scores.setdefault(subject, set()).add(len(lst))
+            lst.append(score)
+            self.grade_history.push((subject, score))
+            self._track_grade(subject, score, 1)
+            self._notify("grade", subject, score)
     def undo_last_grade(self) -> None:
-        if self.grade_history.is_empty(): raise ValueError("No grades to undo.")
-        subj, score = self.grade_history.pop()
-        lst = self.grades.get(subj, [])
-        if lst and lst[-1] == score: lst.pop()
+        with self._lock:
+            if self.grade_history.is_empty(): raise ValueError("No grades to undo.")
+            if self._before is not None: self._before(self)
+            subj, score = self.grade_history.pop()
+            lst = self.grades.get(subj, [])
+            if lst and lst[-1] == score:
+                lst.pop(); self._track_grade(subj, score, -1)
+                ints = self._int_scores.get(subj)
+                if ints: ints.discard(len(lst))
+            self._notify("undo")
     def record_attendance(self, date: str, subject: str, present: bool) -> None:
         subject = subject.strip().upper()
-        if subject not in self.subjects: raise ValueError(f"Not enrolled in {subject}.")
-        self.attendance_log.append(AttendanceRecord(date=date, subject=subject, present=present))
+        with self._lock:
+            if subject not in self.subjects: raise ValueError(f"Not enrolled in {subject}.")
+            if self._before is not None: self._before(self)
+            self.attendance_log.add(date, subject, present)
+            self._track_attendance(subject, present)
+            self._notify("attend", date, subject, present)
+    def _append_attendance(self, records: List[Tuple[str, str, bool]]) -> None:
+        # trusted bulk path: subjects are already normalized and checked against enrollment
+        with self._lock:
+            if records and self._before is not None: self._before(self)
+            log = self.attendance_log
+            for date, subject, present in records:
+                log.add(date, subject, present)
+                self._track_attendance(subject, present)
+            if records: self._notify("attend_many", records)
     def gpa(self) -> float:
-        if not self.grades: return 0.0
-        avgs = [sum(v)/len(v) for v in self.grades.values() if v]
-        if not avgs: return 0.0
-        pct = sum(avgs)/len(avgs)
-        return round((pct/100)*4, 2)
+        g = self._gpa
+        if g is None:
+            with self._lock:
+                # per-subject sums are exact, so this matches a fresh recomputation bit for bit
+                avgs = [self._grade_sum[k]/self._grade_cnt[k] for k in self.grades if self._grade_cnt.get(k)]
+                g = self._gpa = round((sum(avgs)/len(avgs)/100)*4, 2) if avgs else 0.0
+        return g
     def attendance_rate(self, subject: Optional[str]=None) -> float:
-        logs = self.attendance_log if subject is None else [r for r in self.attendance_log if r.subject == subject.upper()]
-        if not logs: return 0.0
-        present = sum(1 for r in logs if r.present)
-        return round(100.0 * present / len(logs), 2)
+        if subject is None: present, total = self._att_present, self._att_total
+        else: present, total = self._att_by_subject.get(subject.upper(), (0, 0))
+        if not total: return 0.0
+        return round(100.0 * present / total, 2)
+    def attendance_between(self, start: Any=None, end: Any=None, subject: Optional[str]=None) -> Tuple[int, int]:
+        # (present, total) for start <= date <= end; bounds are ISO dates or datetime.date, None leaves a side open
+        lo, hi = _day_bound(start), _day_bound(end)
+        with self._lock: return self.attendance_log.counts(lo, hi, subject.strip().upper() if subject else None)
+    def attendance_rate_between(self, start: Any=None, end: Any=None, subject: Optional[str]=None) -> float:
+        present, total = self.attendance_between(start, end, subject)
+        return round(100.0 * present / total, 2) if total else 0.0
+    def attendance_rollup(self, period: str="month", subject: Optional[str]=None, start: Any=None, end: Any=None) -> List[Tuple[str, int, int, float]]:
+        # [(label, present, total, rate)] per week ("2024-W05") or month ("2024-02") that has records
+        if period not in ("week", "month"): raise ValueError(f"Unknown period {period!r}, expected 'week' or 'month'")
+        lo, hi = _day_bound(start), _day_bound(end)
+        with self._lock: rows = self.attendance_log.rollup(period, lo, hi, subject.strip().upper() if subject else None)
+        return [(label, p, n, round(100.0 * p / n, 2)) for label, p, n in rows]
+    def _notify(self, op: str, *args: Any) -> None:
+        if self._listener is not None: self._listener(self, op, args)
+    def _track_grade(self, subject: str, score: float, sign: int) -> None:
+        lst = self.grades.get(subject, [])
+        if not lst:
+            self._grade_sum.pop(subject, None); self._grade_cnt.pop(subject, None)
+        else:
+            # re-sum on undo instead of subtracting so the total never drifts from sum(lst)
+            self._grade_sum[subject] = self._grade_sum.get(subject, 0) + score if sign > 0 else sum(lst)
+            self._grade_cnt[subject] = len(lst)
+        self._gpa = None
+    def _track_attendance(self, subject: str, present: bool) -> None:
+        bucket = self._att_by_subject.get(subject)
+        if bucket is None: bucket = self._att_by_subject[subject] = [0, 0]
+        if present: self._att_present += 1; bucket[0] += 1
+        self._att_total += 1; bucket[1] += 1
+    def _rebuild_aggregates(self) -> None:
+        self._grade_sum = {}; self._grade_cnt = {}; self._gpa = None
+        for subj, scores in self.grades.items():
+            if scores: self._grade_sum[subj] = sum(scores); self._grade_cnt[subj] = len(scores)
+        self._att_present = self._att_total = 0; self._att_by_subject = {}
+        for _, subj, present in self.attendance_log.rows(): self._track_attendance(subj, present)
+    def _clone(self) -> "Student":
+        # independent copy for registry snapshots: column copies plus the running aggregates, no rescans
+        c = Student(self.student_id, self.name, self.department, self.gender, self.year, SinglyLinkedList(self.subjects))
+        c.grades = {k: array("d", v) for k, v in self.grades.items()}
+        c.grade_history = self.grade_history.copy(); c.attendance_log = self.attendance_log.copy(); c.attendance_log._owner = c
+        c._grade_sum = dict(self._grade_sum); c._grade_cnt = dict(self._grade_cnt); c._gpa = self._gpa
+        c._att_present = self._att_present; c._att_total = self._att_total
+        c._att_by_subject = {k: list(v) for k, v in self._att_by_subject.items()}
+        c._int_scores = {k: set(v) for k, v in self._int_scores.items()}
+        return c
+    def summary(self) -> StudentSummary:
+        return StudentSummary(self.student_id, self.name, self.department, self.gender, self.year, self.gpa())
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["subjects"] = self.subjects.to_list()
-        d["grade_history"] = list(self.grade_history)
-        d["attendance_log"] = [asdict(r) for r in self.attendance_log]
-        return d
+        with self._lock: return self._to_dict()
+    def _to_dict(self) -> dict:
+        return {
+            "student_id": self.student_id, "name": self.name, "department": self.department,
+            "gender": self.gender, "year": self.year,
+            "subjects": self.subjects.to_list(),
+            "grades": {k: self._saved_scores(k, v) for k, v in self.grades.items()},
+            "grade_history": list(self.grade_history),
+            "attendance_log": [{"date": d, "subject": subj, "present": p} for d, subj, p in self.attendance_log.saved_rows()],
+        }
+    def _saved_scores(self, subject: str, scores: "array[float]") -> list:
+        ints = self._int_scores.get(subject)
+        if not ints: return list(scores)
+        return [int(v) if i in ints else v for i, v in enumerate(scores)]
+    def _keep_ints(self, subject: str, scores: Iterable[Any]) -> None:
+        ints = {i for i, v in enumerate(scores) if type(v) is int}
+        if ints: self._int_scores[subject] = ints
     @staticmethod
     def from_dict(d: dict) -> "Student":
         s = Student(d["student_id"], d["name"], d["department"], d["gender"], int(d["year"]))
-        for sub in d.get("subjects", []): s.subjects.append(sub)
-        s.grades = {k: list(v) for k,v in d.get("grades", {}).items()}
+        for sub in d.get("subjects", []): s.subjects.append(sys.intern(sub))
+        grades = d.get("grades", {})
+        s.grades = {k: array("d", v) for k,v in grades.items()}
+        for k, v in grades.items(): s._keep_ints(k, v)
         for subj,score in d.get("grade_history", []): s.grade_history.push((subj, float(score)))
-        for rec in d.get("attendance_log", []): s.attendance_log.append(AttendanceRecord(**rec))
+        log = s.attendance_log
+        for rec in d.get("attendance_log", []): log.add(rec["date"], rec["subject"], rec["present"])
+        s._rebuild_aggregates()
         return s
 
+# Bulk attendance ingestion
+@dataclass
+class AttendanceIngestResult:
+    applied: int = 0
+    rejected: int = 0
+    errors: List[Tuple[int, str, str]] = field(default_factory=list)  # (row number, student id, reason)
+    def reject(self, row: int, sid: str, reason: str) -> None:
+        self.rejected += 1; self.errors.append((row, sid, reason))
+
+_PRESENT_WORDS = {"1": True, "1.0": True, "true": True, "yes": True, "y": True, "p": True, "present": True,
+                  "0": False, "0.0": False, "false": False, "no": False, "n": False, "a": False, "absent": False}
+
+def _parse_present(v: Any) -> bool:
+    if isinstance(v, bool): return v
+    if isinstance(v, int): return bool(v)
+    if isinstance(v, float) and v in (0.0, 1.0): return v == 1.0
+    w = _PRESENT_WORDS.get(str(v).strip().lower())
+    if w is None: raise ValueError(f"bad present value {v!r}")
+    return w
+
+def _group_attendance_rows(rows: Iterable[Any], result: AttendanceIngestResult) -> Dict[str, List[Tuple[int, str, str, bool]]]:
+    # rows are (sid, date, subject, present) tuples or dicts with those keys ("student_id" also accepted);
+    # returns sid -> [(row number, date, SUBJECT, present)] in input order, malformed rows go to result
+    today = str(datetime.date.today())
+    groups: Dict[str, List[Tuple[int, str, str, bool]]] = {}
+    subjects: Dict[str, str] = {}  # raw -> normalized, most rows repeat a handful of codes
+    for n, row in enumerate(rows, 1):
+        sid = ""
+        try:
+            if isinstance(row, dict):
+                sid = str(row.get("student_id", row.get("sid", ""))).strip()
+                date, subj, present = row.get("date", ""), row["subject"], row["present"]
+            else:
+                sid, date, subj, present = row; sid = str(sid).strip()
+            if not sid: raise ValueError("missing student id")
+            code = subjects.get(subj)
+            if code is None: code = subjects[subj] = str(subj).strip().upper()
+            if not code: raise ValueError("missing subject")
+            if present is not True and present is not False: present = _parse_present(present)
+            lst = groups.get(sid)
+            if lst is None: lst = groups[sid] = []
+            lst.append((n, date.strip() if date else today, code, present))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            result.reject(n, sid, f"Malformed row: {e}")
+    return groups
+
 # Registry
 DATA_FILE = "data.json"
 CATALOG_FILE = "catalog.json"  
+SHARD_DIR = "data.shards"
+INDEXED_FILE = "data.idx"
+DEFAULT_SHARDS = 64
 
-class StudentRegistry:
+# Secondary indexes: field -> normalized key of a student
+_INDEXED_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "name": lambda v: str(v).lower(),
+    "department": lambda v: str(v).lower(),
+    "year": lambda v: int(v),
+    "gender": lambda v: str(v).upper(),
+}
+
+# Timetable DP (weighted interval scheduling); module level so process pool workers can run it
+def _timetable_items(codes: Iterable[str], catalog: Dict[str, Dict[str, float]]) -> List[Tuple[int,int,float,str]]:
+    # canonical order (end, start, code): the result depends only on the set of codes, not enrollment order
+    items = [(int(slot["start"]), int(slot["end"]), float(slot.get("weight",1.0)), code)
+             for code in codes for slot in (catalog.get(code),) if slot]
+    items.sort(key=lambda x: (x[1], x[0], x[3]))
+    return items
+
+def _optimize_slots(items: List[Tuple[int,int,float,str]]) -> List[str]:
+    n = len(items)
+    if not n: return []
+    ends = [it[1] for it in items]
+    # p[j]: number of items ending no later than item j starts (bisect over the sorted end times)
+    p = [bisect.bisect_right(ends, items[j][0], 0, j) for j in range(n)]
+    dp = [0.0]*(n+1)
+    keep = [False]*(n+1)
+    for j in range(1, n+1):
+        incl = items[j-1][2] + dp[p[j-1]]
+        excl = dp[j-1]
+        if incl > excl:
+            dp[j] = incl; keep[j] = True
+        else:
+            dp[j] = excl; keep[j] = False
+    chosen_codes: List[str] = []
+    j = n
+    while j > 0:
+        if keep[j]:
+            chosen_codes.append(items[j-1][3])
+            j = p[j-1]
+        else:
+            j -= 1
+    chosen_codes.reverse()
+    return chosen_codes
+
+_TIMETABLE_POOL_MIN = 256  # with workers > 0, fewer distinct enrollment sets than this are still solved inline
+
+# Sorted views: ascending (key, seq, id) entries kept in order with bisect and patched as students change;
+# seq (insertion order) breaks ties, so listings match a stable sort of the insertion order
+class _SortedView:
+    __slots__ = ("key", "entries", "where", "version")
+    def __init__(self, key: Callable[[StudentSummary], Any]) -> None:
+        self.key = key
+        self.entries: List[Tuple[Any, int, str]] = []
+        self.where: Dict[str, Tuple[Any, int, str]] = {}
+        self.version = -1
+    def build(self, rows: Iterable[Tuple[int, StudentSummary]]) -> None:
+        self.entries = sorted((self.key(sm), seq, sm.student_id) for seq, sm in rows)
+        self.where = {e[2]: e for e in self.entries}
+    def add(self, seq: int, sm: StudentSummary) -> None:
+        e = (self.key(sm), seq, sm.student_id)
+        bisect.insort(self.entries, e); self.where[e[2]] = e
+    def remove(self, sid: str) -> None:
+        e = self.where.pop(sid, None)
+        if e is not None: del self.entries[bisect.bisect_left(self.entries, e)]
+    def update(self, sm: StudentSummary) -> None:
+        e = self.where.get(sm.student_id)
+        if e is None or e[0] == self.key(sm): return
+        self.remove(sm.student_id); self.add(e[1], sm)
+    def ids(self, start: int=0, count: Optional[int]=None, reverse: bool=False) -> List[str]:
+        n = len(self.entries); start = max(0, start)
+        stop = n if count is None else min(n, start + max(0, count))
+        if reverse: return [e[2] for e in reversed(self.entries[max(0, n-stop):n-start])] if start < n else []
+        return [e[2] for e in self.entries[start:stop]]
+
+_VIEW_KEYS: Dict[str, Callable[[StudentSummary], Any]] = {
+    "insertion": lambda sm: 0,
+    "name": lambda sm: sm.name.lower(),
+    "gpa": lambda sm: sm.gpa,
+}
+
+# Concurrency (thread-safe registry mode)
+class RWLock:
+    # writer-preferring readers-writer lock; re-entrant for readers, for writers, and for reads inside a write
     def __init__(self) -> None:
-        self._students: List[Student] = []
-        self._index = BinarySearchTree()
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0; self._writer: Optional[int] = None; self._write_depth = 0; self._waiting_writers = 0
+        self._local = threading.local()
+    def acquire_read(self) -> None:
+        local = self._local
+        if self._writer == threading.get_ident():
+            local.free = getattr(local, "free", 0) + 1; return
+        depth = getattr(local, "reads", 0)
+        if depth: local.reads = depth + 1; return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers: self._cond.wait()
+            self._readers += 1
+        local.reads = 1
+    def release_read(self) -> None:
+        local = self._local
+        if getattr(local, "free", 0): local.free -= 1; return
+        local.reads -= 1
+        if local.reads: return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers: self._cond.notify_all()
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me: self._write_depth += 1; return
+        if getattr(self._local, "reads", 0): raise RuntimeError("cannot upgrade a read lock to a write lock")
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers: self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me; self._write_depth = 1
+    def release_write(self) -> None:
+        self._write_depth -= 1
+        if self._write_depth: return
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try: yield
+        finally: self.release_read()
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try: yield
+        finally: self.release_write()
+
+class _StudentGuard:
+    # student mutations hold the registry read lock (so writers see a quiescent registry) plus the student's own lock
+    __slots__ = ("_rw", "_lock")
+    def __init__(self, rw: RWLock): self._rw = rw; self._lock = threading.RLock()
+    def __enter__(self) -> "_StudentGuard":
+        self._rw.acquire_read(); self._lock.acquire(); return self
+    def __exit__(self, *exc: Any) -> None:
+        self._lock.release(); self._rw.release_read()
+
+def _locked(fn: Callable[..., Any], ctx: Callable[[], Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def wrapper(*a: Any, **k: Any) -> Any:
+        with ctx(): return fn(*a, **k)
+    return wrapper
+
+def _quiet(fn: Callable[..., Any]) -> Callable[..., Any]:
+    # bulk loads: no per-student events, subscribers get a single "reset" once the outermost load returns
+    @functools.wraps(fn)
+    def wrapper(self: "StudentRegistry", *a: Any, **k: Any) -> Any:
+        self._muted += 1
+        try: return fn(self, *a, **k)
+        finally:
+            self._muted -= 1
+            if not self._muted: self._emit("reset", None)
+    return wrapper
+
+# Metrics (opt-in): timers are only installed by StudentRegistry.enable_metrics() and removed again by
+# disable_metrics(), so a registry that never enables them runs exactly the original methods
+class _OpStats:
+    __slots__ = ("count", "total", "max", "items", "bytes", "errors", "rejected", "recent")
+    def __init__(self, window: int) -> None:
+        self.count = 0; self.total = 0.0; self.max = 0.0; self.items = 0; self.bytes = 0; self.errors = 0; self.rejected = 0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+class Metrics:
+    # per operation: calls, errors, cumulative and max seconds, items / bytes handled, rows rejected by
+    # attendance ingest, and the latencies of the last `window` calls for percentiles
+    def __init__(self, window: int=1024) -> None:
+        self.window = window
+        self._ops: Dict[str, _OpStats] = {}
+        self._lock = threading.Lock()
+    def record(self, op: str, seconds: float, items: int=0, nbytes: int=0, error: bool=False, rejected: int=0) -> None:
+        with self._lock:
+            st = self._ops.get(op)
+            if st is None: st = self._ops[op] = _OpStats(self.window)
+            st.count += 1; st.total += seconds; st.items += items; st.bytes += nbytes; st.rejected += rejected
+            if seconds > st.max: st.max = seconds
+            if error: st.errors += 1
+            st.recent.append(seconds)
+    def reset(self) -> None:
+        with self._lock: self._ops = {}
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        # op -> count, errors, total_s, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, items, bytes, rejected
+        with self._lock: ops = [(op, st.count, st.errors, st.total, st.max, st.items, st.bytes, st.rejected, sorted(st.recent)) for op, st in self._ops.items()]
+        out: Dict[str, Dict[str, Any]] = {}
+        for op, count, errors, total, mx, items, nbytes, rejected, recent in sorted(ops):
+            pct = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))] * 1000.0 if recent else 0.0
+            out[op] = {"count": count, "errors": errors, "total_s": total, "mean_ms": total / count * 1000.0 if count else 0.0,
+                       "p50_ms": pct(0.5), "p90_ms": pct(0.9), "p99_ms": pct(0.99), "max_ms": mx * 1000.0, "items": items, "bytes": nbytes,
+                       "rejected": rejected}
+        return out
+    def to_json(self) -> str:
+        return json.dumps(self.stats(), indent=2)
+    def to_prometheus(self, prefix: str="student_records") -> str:
+        # text exposition format: a latency summary plus item / byte / error counters per op
+        st = self.stats(); lines: List[str] = []
+        def esc(op: str) -> str: return op.replace("\\", "\\\\").replace('"', '\\"')
+        lines += [f"# HELP {prefix}_op_seconds Latency of registry and student operations.", f"# TYPE {prefix}_op_seconds summary"]
+        for op, r in st.items():
+            for q, key in (("0.5", "p50_ms"), ("0.9", "p90_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{prefix}_op_seconds{{op="{esc(op)}",quantile="{q}"}} {r[key] / 1000.0:.9g}')
+            lines.append(f'{prefix}_op_seconds_sum{{op="{esc(op)}"}} {r["total_s"]:.9g}')
+            lines.append(f'{prefix}_op_seconds_count{{op="{esc(op)}"}} {r["count"]}')
+        for field, help_ in (("items", "Items returned or processed."), ("bytes", "Bytes read or written."), ("errors", "Calls that raised."),
+                             ("rejected", "Attendance rows rejected.")):
+            lines += [f"# HELP {prefix}_op_{field}_total {help_}", f"# TYPE {prefix}_op_{field}_total counter"]
+            lines += [f'{prefix}_op_{field}_total{{op="{esc(op)}"}} {r[field]}' for op, r in st.items()]
+        return "\n".join(lines) + "\n"
+
+def _metric_items(out: Any) -> int:
+    # items a call handled, judged from its result
+    if isinstance(out, bool) or out is None: return 0
+    if isinstance(out, int): return out
+    if isinstance(out, AttendanceIngestResult): return out.applied + out.rejected
+    if isinstance(out, (list, tuple, dict, set, frozenset)): return len(out)
+    return 1
+
+def _timed(fn: Callable[..., Any], op: str, sinks: Callable[[tuple], Sequence[Metrics]], count: Callable[[tuple, dict, Any], Tuple[int, int, int]]) -> Callable[..., Any]:
+    # sinks(args) names the Metrics a call is recorded into; calls with none are not timed;
+    # count(args, kwargs, result) gives (items, bytes, rejected)
+    @functools.wraps(fn)
+    def wrapper(*a: Any, **k: Any) -> Any:
+        ms = sinks(a)
+        if not ms: return fn(*a, **k)
+        t = time.perf_counter()
+        try: out = fn(*a, **k)
+        except BaseException:
+            dt = time.perf_counter() - t
+            for m in ms: m.record(op, dt, error=True)
+            raise
+        dt = time.perf_counter() - t
+        items, nbytes, rejected = count(a, k, out)
+        for m in ms: m.record(op, dt, items, nbytes, rejected=rejected)
+        return out
+    wrapper._metered = fn  # type: ignore[attr-defined]
+    return wrapper
+
+# Students held by a registry with metrics enabled are switched to _MeteredStudent (and back on disable or
+# removal); plain Students never pass through a timer. Each call is recorded into the Metrics of the
+# registry owning that student
+_STUDENT_METRIC_METHODS = ("enroll_subject", "drop_subject", "add_grade", "undo_last_grade", "record_attendance", "gpa",
+                           "attendance_rate", "attendance_between", "attendance_rate_between", "attendance_rollup", "summary", "to_dict")
+
+def _owner_metrics(a: tuple) -> Tuple[Metrics, ...]:
+    # a student's owning registry is the one its change listener is bound to (None once removed)
+    m = getattr(getattr(a[0]._listener, "__self__", None), "metrics", None)
+    return (m,) if m is not None else ()
+
+class _MeteredStudent(Student):
+    def __repr__(self) -> str:
+        r = Student.__repr__(self); return "Student" + r[r.index("("):]
+
+for _name in _STUDENT_METRIC_METHODS:
+    setattr(_MeteredStudent, _name, _timed(getattr(Student, _name), "Student." + _name, _owner_metrics, lambda a, k, out: (_metric_items(out), 0, 0)))
+
+def _meter_student(s: Student, on: bool) -> None:
+    # only exact Students are switched; subclasses keep their own class and go unmetered
+    if type(s) is (Student if on else _MeteredStudent): s.__class__ = _MeteredStudent if on else Student
+
+def _atomic_write(path: str, data: bytes) -> None:
+    # write-to-temp + fsync + rename: readers see either the old file or the new one, never a torn write
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# Point-in-time snapshots (copy-on-write). Taking one shares the registry's id -> student map, which the
+# registry copies on its next add or remove; a student is copied the first time it is about to change, or
+# is removed, while the snapshot is open. Readers of the snapshot therefore see every student as it was,
+# without blocking writers or copying unchanged students.
+class RegistrySnapshot:
+    def __init__(self, reg: "StudentRegistry") -> None:
+        self.version = reg._version
+        self._reg: Optional[StudentRegistry] = reg
+        # None marks a lazily loaded student that was still undecoded; resolved when the registry decodes it
+        self._members: Dict[str, Optional[Student]] = reg._students
+        reg._students_shared = True
+        self._frozen: Dict[str, Student] = {}
+        self._lock = threading.Lock()
+    def __len__(self) -> int: return len(self._members)
+    def __contains__(self, sid: object) -> bool: return sid in self._members
+    def __iter__(self) -> Iterator[str]: return iter(list(self._members))  # ids, insertion order
+    def __enter__(self) -> "RegistrySnapshot": return self
+    def __exit__(self, *exc: Any) -> None: self.close()
+    def close(self) -> None:
+        # stop copying students for this snapshot; it cannot be read afterwards
+        reg = self._reg
+        if reg is None: return
+        self._reg = None; self._members = {}; self._frozen = {}
+        reg._prune_snapshots()
+    def _check(self) -> "StudentRegistry":
+        if self._reg is None: raise ValueError("Snapshot is closed.")
+        return self._reg
+    def read(self, sid: str, fn: Callable[[Student], T]) -> T:
+        # fn(student as of the snapshot); fn must not modify or keep the student (it may be the live object)
+        reg = self._check()
+        f = self._frozen.get(sid)
+        if f is not None: return fn(f)
+        s = self._members[sid]
+        if s is None:
+            with self._lock:
+                f = self._frozen.get(sid)
+                if f is not None: return fn(f)
+                s = self._members[sid] or reg._materialize(sid)
+        # a mutation copies the student into _frozen under this same lock before changing it
+        with s._lock:
+            f = self._frozen.get(sid)
+            return fn(f if f is not None else s)
+    def map(self, fn: Callable[[Student], T]) -> Iterator[T]:
+        for sid in self: yield self.read(sid, fn)
+    def student(self, sid: str) -> Optional[Student]:
+        # a private copy, safe to keep
+        if sid not in self._members: return None
+        return self.read(sid, Student._clone)
+    def summaries(self) -> List[StudentSummary]:
+        return list(self.map(Student.summary))
+    def records(self) -> Iterator[dict]:
+        # data.json records; students still undecoded are served from the mapped file without decoding them
+        reg = self._check()
+        for sid in self:
+            if self._members.get(sid, 0) is None:
+                raw = None
+                with self._lock, reg._mat_lock:
+                    if self._members[sid] is None and sid not in self._frozen and sid in reg._pending: raw = reg._raw(sid)
+                if raw is not None: yield json.loads(raw); continue
+            yield self.read(sid, Student._to_dict)
+    def save(self, path: str) -> None:
+        # writes the snapshot as a standalone data file, in the same format as StudentRegistry.save;
+        # the registry's own save state (dirty set, journal) is left untouched
+        _atomic_write(path, json.dumps(list(self.records()), indent=2).encode("utf-8"))
+
+class StudentRegistry:
+    # methods wrapped with the readers-writer lock in thread-safe mode
+    _READ_METHODS: Tuple[str, ...] = (
+        "get_by_id", "list_students", "summaries", "sorted_by_name", "sorted_by_id", "students_in_id_range",
+        "students_with_id_prefix", "sorted_by_gpa", "sorted_by", "export_sorted", "binary_search_by_name", "search", "query",
+        "ingest_attendance", "process_attendance", "daily_absences", "choose_class_representatives", "get_subject_slot",
+        "list_subject_slots", "snapshot", "subjects_at", "subjects_in_window", "subjects_overlapping", "conflict_graph",
+        "enrollment_conflicts", "optimize_timetable_for", "optimize_timetables", "page")
+    _WRITE_METHODS: Tuple[str, ...] = (
+        "add_student", "remove_student", "save", "load", "save_shards", "load_shards", "save_indexed",
+        "load_indexed", "compact", "save_catalog", "load_catalog", "set_subject_slot")
+    # timed by enable_metrics() on top of the locked methods; file ops also record the size of their file
+    _METRIC_METHODS: Tuple[str, ...] = ("enqueue_attendance", "ingest_attendance_csv", "close")
+    _METRIC_FILES: Dict[str, str] = {"save": DATA_FILE, "load": DATA_FILE, "save_catalog": CATALOG_FILE, "load_catalog": CATALOG_FILE}
+
+    def __init__(self, journal: bool=False, compact_every: int=1000, thread_safe: bool=False) -> None:
+        # journal mode: every mutation is appended to <data file>.journal and replayed on load;
+        # the data file itself is only rewritten when the journal is compacted
+        self._journaling = journal
+        self.compact_every = compact_every
+        self._journal: Optional[Any] = None
+        self._journal_records = 0
+        self._path = DATA_FILE
+        self._catalog_path = CATALOG_FILE  # the catalog last loaded; save() and compaction write it back there
+        # dirty tracking: ids changed since the last save to _saved_to (a data file or shard dir)
+        self._dirty: Set[str] = set()
+        self._saved_to: Optional[str] = None
+        self._shard_count = 0
+        self._shard_members: Dict[int, Dict[str, None]] = {}
+        # indexed (lazy) storage: ids whose record is still undecoded in the mapped file
+        self._mm: Optional[mmap.mmap] = None
+        self._mm_file: Optional[Any] = None
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._summaries: Dict[str, StudentSummary] = {}
+        self._students: Dict[str, Optional[Student]] = {}
+        self._students_shared = False  # _students is also an open snapshot's member map: copy before adding or removing
+        self._index = AVLTree()
+        self._secondary: Dict[str, Dict[Any, Dict[str, None]]] = {f: {} for f in _INDEXED_FIELDS}
         self._attendance_q: Queue[Tuple[str, str, str, bool]] = Queue()
         self._subject_catalog: Dict[str, Dict[str, float]] = {}
+        # derived from the catalog, dropped by _catalog_changed(): optimized timetables per distinct set of
+        # scheduled codes, the slot interval index and its conflict graph (both built on first use)
+        self._timetable_memo: Dict[FrozenSet[str], List[str]] = {}
+        self._slot_index: Optional[IntervalIndex] = None
+        self._conflicts: Optional[Dict[str, Set[str]]] = None
+        # _version moves on every change; sorted views are built on first use, then patched on every change
+        # and stamped with the version they reflect (a mismatch means a change bypassed them: rebuild)
+        self._version = 0
+        self._views: Dict[str, _SortedView] = {}
+        self._view_lock = threading.Lock()
+        self._seq = 0
+        # registry-wide attendance per day number -> [absent, total], with its days kept sorted; built on
+        # the first daily_absences() call, then maintained by the same hooks that patch the views
+        self._daily: Optional[Dict[int, List[int]]] = None
+        self._daily_days: List[int] = []
+        # name search index over every student (undecoded ones by their summary name); built on the first
+        # search() call, then patched by add_student/remove_student
+        self._names: Optional[NameIndex] = None
+        # representative scoring arrays, stamped with the _version they were built at
+        self._scores: Optional[Tuple[int, Dict[str, Tuple[List[Student], Any, Any]]]] = None
+        # change notifications: callback(event, key) with event in added/removed/updated (key = student id),
+        # slot (key = subject code) or reset (key = None, after a load)
+        self._subscribers: List[Callable[[str, Optional[str]], None]] = []
+        self._muted = 0
+        # weak references to open snapshots; replaced as a whole (never mutated) so mutating threads can scan it
+        self._snapshots: Tuple["weakref.ref[RegistrySnapshot]", ...] = ()
+        self._snap_lock = threading.RLock()
+        # opt-in operation metrics (enable_metrics); _metric_prev keeps what each timer replaced
+        self.metrics: Optional[Metrics] = None
+        self._metric_prev: Dict[str, Any] = {}
+        # thread-safe mode: registry methods take the RW lock, students get a _StudentGuard;
+        # nothing is wrapped otherwise, so single-threaded use pays no locking cost
+        self.thread_safe = thread_safe
+        self._rw = RWLock()
+        self._journal_lock = threading.Lock()
+        self._mat_lock = threading.Lock()
+        self._compact_due = False
+        self._queue_lock = threading.Lock()
+        self._batch = threading.local()  # the last process_attendance result per thread, for its metrics
+        self._worker: Optional["AttendanceWorker"] = None
+        if thread_safe:
+            for name in self._READ_METHODS: setattr(self, name, _locked(getattr(self, name), self._rw.read))
+            for name in self._WRITE_METHODS: setattr(self, name, _locked(getattr(self, name), self._rw.write))
+    def _adopt(self, s: Student) -> None:
+        s._listener = self._on_student_change
+        s._before = self._before_student_change
+        if self.thread_safe and not isinstance(s._lock, _StudentGuard): s._lock = _StudentGuard(self._rw)
+        _meter_student(s, self.metrics is not None)
+    def _release(self, s: Student) -> None:
+        s._listener = None; s._before = None
+        _meter_student(s, False)
+    def _held_students(self) -> List[Student]:
+        # the Student objects this registry has built (undecoded records have none yet)
+        return [s for s in list(self._students.values()) if s is not None]
     def add_student(self, s: Student) -> None:
-        if self.get_by_id(s.student_id) is not None:
+        if s.student_id in self._students:
             raise ValueError(f"Student ID {s.student_id} already exists.")
-        self._students.append(s)
+        if self._students_shared: self._unshare_students()
+        self._students[s.student_id] = s
         self._index.insert(s.student_id, s)
+        self._index_secondary(s)
+        if self._shard_count: self._shard_members.setdefault(self._shard_for(s.student_id), {})[s.student_id] = None
+        self._adopt(s)
+        with self._view_lock:
+            self._version += 1; self._seq += 1
+            if self._views:
+                sm = s.summary()
+                for v in self._views.values(): v.add(self._seq, sm); v.version = self._version
+            if self._daily is not None: self._count_days(s.attendance_log.rows(), 1)
+            if self._names is not None: self._names.add(s.student_id, s.name)
+        self._dirty.add(s.student_id)
+        self._log("add", s.to_dict())
+        self._emit("added", s.student_id)
     def get_by_id(self, sid: str) -> Optional[Student]:
-        return self._index.search(sid)
+        s = self._index.search(sid)
+        if s is None and sid in self._pending: s = self._materialize(sid)
+        return s
     def remove_student(self, sid: str) -> None:
-        if self.get_by_id(sid) is None: raise ValueError("Not found.")
-        self._students = [x for x in self._students if x.student_id != sid]
+        s = self.get_by_id(sid)
+        if s is None: raise ValueError("Not found.")
+        self._summaries.pop(sid, None)
+        if self._students_shared: self._unshare_students()
+        del self._students[sid]
         self._index.delete(sid)
-    def enqueue_attendance(self, sid: str, date: str, subject: str, present: bool) -> None:
-        self._attendance_q.enqueue((sid, date, subject, present))
+        self._unindex_secondary(s)
+        if self._shard_count: self._shard_members.get(self._shard_for(sid), {}).pop(sid, None)
+        if self._snapshots: self._before_student_change(s)
+        self._release(s)
+        with self._view_lock:
+            self._version += 1
+            for v in self._views.values(): v.remove(sid); v.version = self._version
+            if self._daily is not None: self._count_days(s.attendance_log.rows(), -1)
+            if self._names is not None: self._names.remove(sid)
+        self._dirty.add(sid)
+        self._log("remove", sid)
+        self._emit("removed", sid)
+    def _on_student_change(self, s: Student, op: str, args: tuple) -> None:
+        with self._view_lock:
+            self._version += 1
+            if self._views:
+                sm = s.summary()
+                for v in self._views.values(): v.update(sm); v.version = self._version
+            if self._daily is not None:
+                if op == "attend": self._count_days([args], 1)
+                elif op == "attend_many": self._count_days(args[0], 1)
+        self._dirty.add(s.student_id)
+        self._log(op, s.student_id, *args)
+        self._emit("updated", s.student_id)
+
+    # Change notifications; callbacks run synchronously on the mutating thread (with registry locks held
+    # in thread-safe mode), so they should only record the event and return
+    def subscribe(self, callback: Callable[[str, Optional[str]], None]) -> Callable[[str, Optional[str]], None]:
+        self._subscribers.append(callback)
+        return callback
+    def unsubscribe(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        if callback in self._subscribers: self._subscribers.remove(callback)
+    def _emit(self, event: str, key: Optional[str]) -> None:
+        if self._muted or not self._subscribers: return
+        for cb in list(self._subscribers):
+            try: cb(event, key)
+            except Exception as e: print(f"[WARN] change subscriber failed on {event}:", e)
+
+    # Metrics: enable_metrics() times every public method of this registry and of the students it holds;
+    # disable_metrics() restores the originals, so nothing is paid while they are off
+    def enable_metrics(self, metrics: Optional[Metrics]=None) -> Metrics:
+        if self.metrics is not None: return self.metrics
+        m = self.metrics = metrics if metrics is not None else Metrics()
+        sinks = lambda a: (m,)
+        for name in dict.fromkeys(self._READ_METHODS + self._WRITE_METHODS + self._METRIC_METHODS):
+            self._metric_prev[name] = self.__dict__.get(name)
+            setattr(self, name, _timed(getattr(self, name), name, sinks, functools.partial(self._metric_count, name)))
+        for s in self._held_students(): _meter_student(s, True)
+        return m
+    def disable_metrics(self) -> Optional[Metrics]:
+        m = self.metrics
+        if m is None: return None
+        for name, prev in self._metric_prev.items():
+            if prev is None: del self.__dict__[name]
+            else: setattr(self, name, prev)
+        self._metric_prev = {}; self.metrics = None
+        for s in self._held_students(): _meter_student(s, False)
+        return m
+    def _metric_count(self, name: str, a: tuple, k: dict, out: Any) -> Tuple[int, int, int]:
+        # (items, bytes, rejected) of one call: loads count the students held afterwards, file ops the file's
+        # size, attendance ingest the rows of the batch and how many were rejected
+        if name == "process_attendance": out = getattr(self._batch, "result", out)
+        items = len(self) if name.startswith("load") and name != "load_catalog" else _metric_items(out)
+        rejected = out.rejected if isinstance(out, AttendanceIngestResult) else 0
+        path = self._METRIC_FILES.get(name)
+        if path is None: return items, 0, rejected
+        path = a[0] if a else k.get("path", path)
+        try: return items, os.path.getsize(path), 0
+        except (OSError, TypeError): return items, 0, 0
+    # Snapshots
+    def snapshot(self) -> RegistrySnapshot:
+        # consistent read-only view as of now; close() it (or use it as a context manager) when done
+        snap = RegistrySnapshot(self)
+        with self._snap_lock: self._snapshots = tuple(r for r in self._snapshots if r() is not None) + (weakref.ref(snap, self._prune_snapshots),)
+        return snap
+    def _prune_snapshots(self, _ref: Any=None) -> None:
+        with self._snap_lock: self._snapshots = tuple(r for r in self._snapshots if getattr(r(), "_reg", None) is not None)
+    def _unshare_students(self) -> None:
+        # first add/remove since a snapshot: the snapshots keep the old map, the registry continues on a copy
+        self._students = dict(self._students); self._students_shared = False
+    def _open_snapshots(self) -> List[RegistrySnapshot]:
+        return [snap for snap in (r() for r in self._snapshots) if snap is not None and snap._reg is not None]
+    def _before_student_change(self, s: Student) -> None:
+        # runs under the student's lock right before it changes: every open snapshot that still shares
+        # this object gets a copy (one copy, shared between snapshots)
+        if not self._snapshots: return
+        sid = s.student_id; copy: Optional[Student] = None
+        for snap in self._open_snapshots():
+            if snap._members.get(sid) is s and sid not in snap._frozen:
+                if copy is None: copy = s._clone()
+                snap._frozen[sid] = copy
+    def _detach_snapshots(self) -> None:
+        # a reload drops the mapped file, so open snapshots decode the records they still read from it
+        for snap in self._open_snapshots():
+            with snap._lock:
+                for sid, s in list(snap._members.items()):
+                    if s is None and sid not in snap._frozen and sid in self._pending:
+                        snap._frozen[sid] = Student.from_dict(json.loads(self._raw(sid)))
+
+    def _index_secondary(self, s: Student) -> None:
+        for f, norm in _INDEXED_FIELDS.items():
+            self._secondary[f].setdefault(norm(getattr(s, f)), {})[s.student_id] = None
+    def _unindex_secondary(self, s: Student) -> None:
+        for f, norm in _INDEXED_FIELDS.items():
+            postings = self._secondary[f]; k = norm(getattr(s, f))
+            ids = postings.get(k)
+            if ids is None: continue
+            ids.pop(s.student_id, None)
+            if not ids: del postings[k]
+    def query(self, name: Optional[str]=None, department: Optional[str]=None, year: Optional[int]=None, gender: Optional[str]=None) -> List[Student]:
+        wanted = [(f, v) for f, v in (("name",name),("department",department),("year",year),("gender",gender)) if v is not None]
+        if not wanted: return self.list_students()
+        lists: List[Dict[str, None]] = []
+        for f, v in wanted:
+            ids = self._secondary[f].get(_INDEXED_FIELDS[f](v))
+            if not ids: return []
+            lists.append(ids)
+        lists.sort(key=len)
+        first, rest = lists[0], lists[1:]
+        return [self.get_by_id(sid) for sid in first if all(sid in ids for ids in rest)]
+    def enqueue_attendance(self, sid: str, date: str, subject: str, present: bool, timeout: Optional[float]=None) -> None:
+        # with the background worker running its queue is bounded: timeout=None blocks until there is room,
+        # otherwise queue.Full is raised after timeout seconds
+        if self._worker is not None: self._worker.submit(sid, date, subject, present, timeout=timeout); return
+        with self._queue_lock: self._attendance_q.enqueue((sid, date, subject, present))
     def process_attendance(self) -> int:
-        cnt=0
-        while not self._attendance_q.is_empty():
-            sid,date,subj,present = self._attendance_q.dequeue()
+        rows = []
+        with self._queue_lock:
+            while not self._attendance_q.is_empty(): rows.append(self._attendance_q.dequeue())
+        res = self._batch.result = self.ingest_attendance(rows)
+        for _, sid, reason in res.errors:
+            if reason == "Unknown student": print(f"[WARN] Unknown student {sid}")
+            else: print(f"[WARN] attendance failed for {sid}: {reason}")
+        return res.applied
+    def ingest_attendance(self, rows: Iterable[Any]) -> AttendanceIngestResult:
+        # one lookup per student and one enrollment check per (student, subject), then one append pass per student
+        res = AttendanceIngestResult()
+        for sid, recs in _group_attendance_rows(rows, res).items():
             s = self.get_by_id(sid)
             if s is None:
-                print(f"[WARN] Unknown student {sid}"); continue
-            try:
-                if not date: date = str(datetime.date.today())
-                s.record_attendance(date, subj, present)
-                cnt += 1
-            except Exception as e:
-                print(f"[WARN] attendance failed for {sid}: {e}")
-        return cnt
-    def list_students(self) -> List[Student]: return list(self._students)
+                for n, *_ in recs: res.reject(n, sid, "Unknown student")
+                continue
+            enrolled: Dict[str, bool] = {}
+            ok: List[Tuple[str, str, bool]] = []
+            for n, date, subj, present in recs:
+                e = enrolled.get(subj)
+                if e is None: e = enrolled[subj] = subj in s.subjects
+                if e: ok.append((date, subj, present))
+                else: res.reject(n, sid, f"Not enrolled in {subj}.")
+            s._append_attendance(ok)
+            res.applied += len(ok)
+        res.errors.sort(key=lambda e: e[0])  # grouping by student reorders rejections; report them in input order
+        return res
+    def ingest_attendance_csv(self, stream: Iterable[str]) -> AttendanceIngestResult:
+        # columns: student_id,date,subject,present; a header row naming them (any order and case, "sid" for
+        # student_id, date optional) is recognized, otherwise the first row is data in that column order
+        reader = csv.reader(stream)
+        first = next(reader, None)
+        if first is None: return AttendanceIngestResult()
+        cols = [c.strip().lower() for c in first]
+        if {"subject", "present"} <= set(cols) and ("student_id" in cols or "sid" in cols):
+            rows: Iterable[Any] = (dict(zip(cols, r)) for r in reader)
+        else:
+            rows = itertools.chain([first], reader)
+        return self.ingest_attendance(rows)
+    # Attendance by date
+    def _count_days(self, rows: Iterable[Tuple[str, str, bool]], sign: int, daily: Optional[Dict[int, List[int]]]=None,
+                    days: Optional[List[int]]=None) -> None:
+        if daily is None: daily, days = self._daily, self._daily_days
+        for date, _subj, present in rows:
+            day = _day_number(date)
+            if day is None: continue
+            c = daily.get(day)
+            if c is None:
+                c = daily[day] = [0, 0]; bisect.insort(days, day)
+            if not present: c[0] += sign
+            c[1] += sign
+    def daily_absences(self, start: Any=None, end: Any=None) -> Dict[str, int]:
+        # ISO date -> absences across every student, for days with attendance between start and end (inclusive)
+        # the first call builds the tallies like _view() builds a view: outside _view_lock, installed only if
+        # nothing changed meanwhile (retried a few times, then this call is served from its own build)
+        lo, hi = _day_bound(start), _day_bound(end)
+        daily: Dict[int, List[int]] = {}; days: List[int] = []
+        for _ in range(3):
+            with self._view_lock:
+                if self._daily is not None: return self._days_between(self._daily, self._daily_days, lo, hi)
+                version = self._version
+            daily, days = self._build_daily()
+            with self._view_lock:
+                if self._daily is None and self._version == version: self._daily, self._daily_days = daily, days
+                if self._daily is not None: return self._days_between(self._daily, self._daily_days, lo, hi)
+        return self._days_between(daily, days, lo, hi)
+    def _build_daily(self) -> Tuple[Dict[int, List[int]], List[int]]:
+        # each log is read under its student's lock, which the student also holds while notifying the registry:
+        # a change is either in the rows read here or still to be counted by _on_student_change after install
+        daily: Dict[int, List[int]] = {}; days: List[int] = []
+        for sid in list(self._students):
+            s = self._students.get(sid)
+            if s is None:
+                with self._mat_lock: raw = self._raw(sid) if sid in self._pending else None
+                if raw is not None:
+                    self._count_days(((r["date"], r["subject"], r["present"]) for r in json.loads(raw).get("attendance_log", [])), 1, daily, days)
+                    continue
+                s = self._students.get(sid)
+                if s is None: continue
+            with s._lock: self._count_days(s.attendance_log.rows(), 1, daily, days)
+        return daily, days
+    @staticmethod
+    def _days_between(daily: Dict[int, List[int]], days: List[int], lo: Optional[int], hi: Optional[int]) -> Dict[str, int]:
+        i = 0 if lo is None else bisect.bisect_left(days, lo)
+        j = len(days) if hi is None else bisect.bisect_right(days, hi)
+        return {datetime.date.fromordinal(d).isoformat(): daily[d][0] for d in days[i:j] if daily[d][1]}
+
+    def __len__(self) -> int: return len(self._students)
+    def page(self, start: int, count: int, order: str="insertion") -> List[StudentSummary]:
+        # one window of table rows; orders: insertion, id, name, gpa (descending)
+        if order == "id":
+            sids = [k for k, _ in self._index.slice(start, count)]
+        elif order in _VIEW_KEYS:
+            sids = self._view(order).ids(start, count, reverse=order == "gpa")
+        else: raise ValueError(f"Unknown order {order!r}")
+        return [self._summary_of(sid) for sid in sids]
+    def _view(self, order: str) -> _SortedView:
+        # keys come from summaries, so building a view never decodes lazily loaded students; the build runs
+        # outside _view_lock (student mutations take it while holding their own lock) and is only installed
+        # if nothing changed meanwhile, otherwise it serves this call and the next one rebuilds
+        with self._view_lock:
+            v = self._views.get(order)
+            if v is not None and v.version == self._version: return v
+            version = self._version
+        v = _SortedView(_VIEW_KEYS[order])
+        v.build(enumerate(self._summary_of(sid) for sid in list(self._students)))
+        with self._view_lock:
+            if self._version == version:
+                v.version = version; self._views[order] = v
+                self._seq = max(self._seq, len(v.entries))
+        return v
+    def _by_ids(self, sids: Iterable[str]) -> List[Student]:
+        out: List[Student] = []
+        for sid in sids:
+            s = self._students[sid]
+            out.append(s if s is not None else self._materialize(sid))
+        return out
+    def _summary_of(self, sid: str) -> StudentSummary:
+        s = self._students[sid]
+        return self._summaries[sid] if s is None else s.summary()
+    def list_students(self) -> List[Student]:
+        self._ensure_loaded()
+        return list(self._students.values())
+    def summaries(self, students: Optional[Iterable[Student]]=None) -> List[StudentSummary]:
+        # table rows; undecoded students are served straight from the file header
+        if students is not None: return [s.summary() for s in students]
+        return [self._summaries[sid] if s is None else s.summary() for sid, s in self._students.items()]
     def sorted_by_name(self) -> List[Student]:
-        key = lambda s: s.name.lower()
-        return mergesort(self._students, key=key)
+        return self._by_ids(self._view("name").ids())
     def sorted_by_id(self) -> List[Student]:
-        return [v for _, v in self._index.inorder()]
+        return [v if v is not None else self.get_by_id(k) for k, v in self._index.inorder()]
+    def students_in_id_range(self, lo: str, hi: str) -> List[Student]:
+        return [v if v is not None else self.get_by_id(k) for k, v in self._index.range(lo, hi)]
+    def students_with_id_prefix(self, prefix: str) -> List[Student]:
+        return [v if v is not None else self.get_by_id(k) for k, v in self._index.prefix(prefix)]
     def sorted_by_gpa(self, descending: bool=True) -> List[Student]:
-        arr = self._students[:]; key = lambda s: s.gpa()
-        out = mergesort(arr, key=key)
-        return list(reversed(out)) if descending else out
+        return self._by_ids(self._view("gpa").ids(reverse=descending))
+    def sorted_by(self, *keys: KeySpec) -> List[Student]:
+        # e.g. sorted_by("department", (Student.gpa, True), "name")
+        return sort_by(self.list_students(), *keys)
     def binary_search_by_name(self, name: str) -> List[Student]:
-        arr = mergesort(self._students, key=lambda s: s.name.lower())
-        idx = binary_search(arr, name.lower(), key=lambda s: s.name.lower())
-        if idx == -1: return []
-        out=[]; i=idx
-        while i<len(arr) and arr[i].name.lower()==name.lower(): out.append(arr[i]); i+=1
-        return out
+        return self.query(name=name)
+    # Search-as-you-type: ID prefix matches first (in ID order), then ranked name matches
+    def search(self, text: str, limit: int=20) -> List[StudentSummary]:
+        text = text.strip()
+        if not text or limit <= 0: return []
+        hits: Dict[str, None] = dict.fromkeys(self._ids_with_prefix(text, limit))
+        if len(hits) < limit and text.upper() != text: hits.update(dict.fromkeys(self._ids_with_prefix(text.upper(), limit - len(hits))))
+        if len(hits) < limit:
+            for sid, _ in self._name_index().search(text, limit):
+                hits[sid] = None
+                if len(hits) >= limit: break
+        return self._summaries_of(list(hits))
+    def _ids_with_prefix(self, prefix: str, limit: int) -> List[str]:
+        return [k for k, _ in itertools.islice(self._index.prefix(prefix), limit)]
+    def _summaries_of(self, sids: List[str]) -> List[StudentSummary]:
+        return [self._summary_of(sid) for sid in sids]
+    def _name_index(self) -> NameIndex:
+        # names are immutable and read straight off the student or its summary, so no student lock is taken
+        with self._view_lock:
+            if self._names is None:
+                self._names = NameIndex((sid, s.name if s is not None else self._summaries[sid].name) for sid, s in list(self._students.items()))
+            return self._names
+    def export_sorted(self, path: str, *keys: KeySpec, chunk_size: Optional[int]=None) -> int:
+        # writes the student records as a JSON array ordered by summary fields, e.g.
+        # export_sorted("out.json", "department", ("gpa", True), "name"); with chunk_size the sort
+        # spills runs of that many records to temp files instead of holding every record in memory
+        records = self._sorted_records(keys, chunk_size)
+        n = 0; tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[")
+            for rec in records:
+                f.write(",\n" if n else "\n"); f.write(json.dumps(rec)); n += 1
+            f.write("\n]\n"); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return n
+    def _sorted_records(self, keys: Sequence[KeySpec], chunk_size: Optional[int]) -> Iterable[dict]:
+        rows = self.summaries()
+        if chunk_size is None: return (self._record(sm.student_id) for sm in sort_by(rows, *keys))
+        return external_sort(rows, *keys, chunk_size=chunk_size, encode=lambda sm: self._record(sm.student_id))
+    def _record(self, sid: str) -> dict:
+        s = self._students[sid]
+        if s is None: return json.loads(self._raw(sid))
+        return s.to_dict()
+    def _dump(self) -> bytes:
+        return json.dumps([self._record(sid) for sid in self._students], indent=2).encode("utf-8")
     def save(self, path: str=DATA_FILE) -> None:
-        with open(path,"w",encoding="utf-8") as f:
-            json.dump([s.to_dict() for s in self._students], f, indent=2)
+        # data.json is one JSON array and is always rewritten whole; the incremental paths are
+        # journal mode (save only syncs the journal) and save_shards (only dirty shards are rewritten)
+        if self._journal is not None and path == self._path:
+            with self._journal_lock:
+                self._journal.flush(); os.fsync(self._journal.fileno())
+            self.save_catalog()
+            self.maybe_compact()
+            return
+        if path != self._saved_to or self._dirty:
+            _atomic_write(path, self._dump())
+            self._dirty.clear(); self._saved_to = path
         self.save_catalog()
-    def load(self, path: str=DATA_FILE) -> None:
+    def _reset(self) -> None:
+        if self._snapshots: self._detach_snapshots()
+        self._pending = {}; self._summaries = {}
+        self._unmap()
+        self._students = {}; self._students_shared = False; self._index = AVLTree()
+        with self._view_lock: self._version += 1; self._views = {}; self._scores = None; self._daily = None; self._names = None
+        self._secondary = {f: {} for f in _INDEXED_FIELDS}
+        self._shard_count = 0; self._shard_members = {}
+    @_quiet
+    def load(self, path: str=DATA_FILE, progress: Optional[Callable[[int, int], None]]=None) -> None:
+        # progress(done, total) is called every 1000 records and once at the end
+        self._close_journal()
         if not os.path.exists(path):
-            with open(path, "w", encoding="utf-8") as f: json.dump([], f)
+            _atomic_write(path, b"[]")
+        raw = b""
         try:
-            with open(path, "r", encoding="utf-8") as f:
+            with open(path, "rb") as f:
                 raw = f.read()
             if not raw.strip():
                 data = []
             else:
-                data = json.loads(raw)
+                data = json.loads(raw.decode("utf-8"))
         except Exception:
             try:
                 os.replace(path, path + ".corrupt")
             except Exception:
                 pass
-            data = []
-        self._students.clear(); self._index = BinarySearchTree()
-        for d in data:
+            data = []; raw = b""
+        self._reset()
+        total = len(data)
+        for i, d in enumerate(data, 1):
             try:
                 self.add_student(Student.from_dict(d))
             except Exception:
                 continue
+            finally:
+                if progress is not None and not i % 1000: progress(i, total)
         self.load_catalog()
-    def save_catalog(self, path: str=CATALOG_FILE) -> None:
+        if progress is not None: progress(total, total)
+        self._path = path
+        self._dirty.clear(); self._saved_to = path
+        if self._journaling:
+            self._open_journal(zlib.crc32(raw))
+
+    # Sharded storage: <dir>/manifest.json + shard-NNNN.json, one shard per crc32(id) % n
+    def _shard_for(self, sid: str) -> int:
+        return zlib.crc32(sid.encode("utf-8")) % self._shard_count
+    def save_shards(self, dirpath: str=SHARD_DIR, shards: Optional[int]=None) -> None:
+        # shards=None keeps the current count (DEFAULT_SHARDS for a new directory)
+        manifest = os.path.join(dirpath, "manifest.json")
+        shards = max(1, int(shards if shards is not None else self._shard_count or DEFAULT_SHARDS))
+        full = dirpath != self._saved_to or shards != self._shard_count or not os.path.exists(manifest)
+        if full:
+            # a changed count repartitions every id: drop the manifest first so a crash mid-rewrite
+            # leaves a directory load_shards refuses instead of one that mixes two partitionings
+            if os.path.exists(manifest):
+                try:
+                    with open(manifest, "r", encoding="utf-8") as f: old = int(json.load(f)["shards"])
+                except Exception:
+                    old = 0
+                if old != shards: os.remove(manifest)
+            self._shard_count = shards; self._shard_members = {}
+            for sid in self._students: self._shard_members.setdefault(self._shard_for(sid), {})[sid] = None
+            targets: Iterable[int] = range(self._shard_count)
+        else:
+            targets = sorted({self._shard_for(sid) for sid in self._dirty})
+        os.makedirs(dirpath, exist_ok=True)
+        for k in targets:
+            rows = [self._record(sid) for sid in self._shard_members.get(k, ())]
+            _atomic_write(os.path.join(dirpath, f"shard-{k:04d}.json"), json.dumps(rows, separators=(",",":")).encode("utf-8"))
+        if full:
+            _atomic_write(manifest, json.dumps({"shards": self._shard_count}).encode("utf-8"))
+            for name in os.listdir(dirpath):
+                k = name[6:-5]
+                if name.startswith("shard-") and name.endswith(".json") and k.isdigit() and int(k) >= self._shard_count:
+                    os.remove(os.path.join(dirpath, name))
+        self._dirty.clear(); self._saved_to = dirpath
+        self.save_catalog()
+    @_quiet
+    def load_shards(self, dirpath: str=SHARD_DIR) -> None:
+        # every shard is read before the registry is reset; an unreadable shard is moved aside to .corrupt
+        self._close_journal()
+        with open(os.path.join(dirpath, "manifest.json"), "r", encoding="utf-8") as f:
+            n = int(json.load(f)["shards"])
+        shards: List[List[dict]] = []
+        for k in range(n):
+            shard = os.path.join(dirpath, f"shard-{k:04d}.json")
+            if not os.path.exists(shard): continue
+            try:
+                with open(shard, "rb") as f:
+                    rows = json.loads(f.read().decode("utf-8"))
+                if not isinstance(rows, list): raise ValueError("not a JSON array")
+            except Exception as e:
+                print(f"[WARN] skipping corrupt shard {shard}: {e}")
+                try: os.replace(shard, shard + ".corrupt")
+                except Exception: pass
+                continue
+            shards.append(rows)
+        self._reset()
+        self._shard_count = n
+        for d in itertools.chain.from_iterable(shards):
+            try:
+                self.add_student(Student.from_dict(d))
+            except Exception:
+                continue
+        self.load_catalog()
+        self._dirty.clear(); self._saved_to = dirpath
+
+    # Indexed storage: one header line {"format", "index": [[id, offset, length, name, dept, gender, year, gpa], ...]}
+    # followed by one JSON record per student; records are decoded only when first touched
+    def save_indexed(self, path: str=INDEXED_FILE) -> None:
+        ids = list(self._students)
+        blobs = [self._raw(sid) if self._students[sid] is None else json.dumps(self._students[sid].to_dict(), separators=(",",":")).encode("utf-8") for sid in ids]
+        index = []; off = 0
+        for sid, blob in zip(ids, blobs):
+            sm = self._summaries[sid] if self._students[sid] is None else self._students[sid].summary()
+            index.append([sid, off, len(blob), sm.name, sm.department, sm.gender, sm.year, sm.gpa])
+            off += len(blob) + 1
+        header = json.dumps({"format": "student-records-indexed/1", "index": index}, separators=(",",":")).encode("utf-8") + b"\n"
+        remap = self._mm is not None and os.path.abspath(path) == os.path.abspath(self._mm_file.name)
+        if remap: self._unmap()
+        _atomic_write(path, header + b"\n".join(blobs) + b"\n")
+        if remap:
+            self._map(path)
+            base = len(header)
+            for (sid, o, ln, *_rest) in index:
+                if sid in self._pending: self._pending[sid] = (base + o, ln)
+        self.save_catalog()
+    @_quiet
+    def load_indexed(self, path: str=INDEXED_FILE) -> None:
+        # the file is mapped and its header checked before the registry is reset; a bad file is moved
+        # aside to .corrupt and the registry comes back empty, as load() does
+        self._close_journal()
+        mm_file = open(path, "rb")
+        try:
+            mm = mmap.mmap(mm_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            mm_file.close(); mm = mm_file = None
+        entries: List[Tuple[str, int, int, StudentSummary]] = []
+        try:
+            if mm is None: raise ValueError("empty file")
+            header_line = mm.readline()
+            header = json.loads(header_line.decode("utf-8"))
+            base = len(header_line)
+            for sid, off, ln, name, dept, gender, year, gpa in header["index"]:
+                if int(off) < 0 or base + int(off) + int(ln) > len(mm): raise ValueError(f"record {sid} is past the end of the file")
+                entries.append((sid, base + int(off), int(ln), StudentSummary(sid, name, dept, gender, int(year), float(gpa))))
+        except Exception as e:
+            if mm is not None: mm.close(); mm_file.close()
+            print(f"[WARN] {path} is corrupt, moved to {path}.corrupt: {e}")
+            try: os.replace(path, path + ".corrupt")
+            except Exception: pass
+            mm = mm_file = None; entries = []
+        self._reset()
+        self._mm, self._mm_file = mm, mm_file
+        keys: List[Tuple[str, None]] = []
+        for sid, off, ln, sm in entries:
+            self._students[sid] = None
+            self._pending[sid] = (off, ln)
+            self._summaries[sid] = sm
+            self._index_secondary(sm)
+            keys.append((sid, None))
+        keys.sort(key=lambda kv: kv[0])
+        self._index = AVLTree.from_sorted(keys)
+        self.load_catalog()
+        self._dirty.clear(); self._saved_to = None
+    def _map(self, path: str) -> None:
+        self._mm_file = open(path, "rb")
+        self._mm = mmap.mmap(self._mm_file.fileno(), 0, access=mmap.ACCESS_READ)
+    def _unmap(self) -> None:
+        if self._mm is not None: self._mm.close(); self._mm = None
+        if self._mm_file is not None: self._mm_file.close(); self._mm_file = None
+    def _raw(self, sid: str) -> bytes:
+        off, ln = self._pending[sid]
+        return self._mm[off:off+ln]
+    def _materialize(self, sid: str) -> Optional[Student]:
+        with self._mat_lock:  # concurrent readers may race to decode the same record
+            if sid not in self._pending: return self._index.search(sid)
+            s = Student.from_dict(json.loads(self._raw(sid)))
+            del self._pending[sid]; self._summaries.pop(sid, None)
+            self._students[sid] = s
+            self._index.insert(sid, s)
+            self._adopt(s)
+            if self._snapshots:
+                for snap in self._open_snapshots():
+                    if snap._members.get(sid, 0) is None: snap._members[sid] = s
+            return s
+    def _ensure_loaded(self) -> None:
+        for sid in list(self._pending): self._materialize(sid)
+
+    # Write-ahead journal
+    def _log(self, op: str, *args: Any) -> None:
+        if self._journal is None: return
+        line = json.dumps([op, *args], separators=(",",":")) + "\n"
+        with self._journal_lock:
+            self._journal.write(line)
+            self._journal.flush()
+            self._journal_records += 1
+            due = self._journal_records >= self.compact_every
+        if due:
+            # a mutating thread holds a read lock and cannot compact; defer to maybe_compact()
+            if self.thread_safe: self._compact_due = True
+            else:
+                try: self.compact()
+                except Exception as e: print("[WARN] compaction failed, keeping the journal:", e)
+    def maybe_compact(self) -> None:
+        if self._compact_due:
+            self._compact_due = False
+            self.compact()
+    def _open_journal(self, base_crc: int) -> None:
+        # the first journal line names the snapshot it extends; a journal written against an
+        # older snapshot was already folded into the data file by a compaction and is discarded
+        # anything that is dropped instead (another base, a corrupt record before the tail) is kept as .journal.stale
+        jpath = self._path + ".journal"
+        replayed, good = 0, 0
+        if os.path.exists(jpath):
+            with open(jpath, "rb") as f:
+                lines = f.readlines()
+            try:
+                header = json.loads(lines[0]) if lines else None
+            except ValueError:
+                header = None
+            if header == ["base", base_crc]:
+                good = len(lines[0])
+                for i, line in enumerate(lines[1:], 2):
+                    if not line.endswith(b"\n"): break  # torn tail from a crash mid-append
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        print(f"[WARN] journal {jpath} corrupt at line {i}, dropping {len(lines) - i + 1} records (kept in {jpath}.stale)")
+                        shutil.copyfile(jpath, jpath + ".stale")
+                        break
+                    self._replay(rec); replayed += 1; good += len(line)
+            elif lines:
+                print(f"[WARN] journal {jpath} does not extend {self._path}, moved to {jpath}.stale")
+                os.replace(jpath, jpath + ".stale")
+        if good:
+            with open(jpath, "r+b") as f: f.truncate(good)
+        else:
+            _atomic_write(jpath, (json.dumps(["base", base_crc]) + "\n").encode("utf-8"))
+        self._journal = open(jpath, "a", encoding="utf-8")
+        self._journal_records = replayed
+    def _replay(self, rec: list) -> None:
+        op, args = rec[0], rec[1:]
+        try:
+            if op == "add": self.add_student(Student.from_dict(args[0])); return
+            if op == "remove": self.remove_student(args[0]); return
+            if op == "slot": self.set_subject_slot(*args); return
+            s = self.get_by_id(args[0])
+            if s is None: print(f"[WARN] journal {op} rejected: Unknown student {args[0]}"); return
+            if op == "enroll": s.enroll_subject(args[1])
+            elif op == "drop": s.drop_subject(args[1])
+            elif op == "grade": s.add_grade(args[1], args[2])
+            elif op == "undo": s.undo_last_grade()
+            elif op == "attend": s.record_attendance(args[1], args[2], bool(args[3]))
+            elif op == "attend_many": s._append_attendance([(d, subj, bool(p)) for d, subj, p in args[1]])
+        except Exception as e:
+            print(f"[WARN] journal {op} rejected for {args[0] if args else '?'}: {e}")
+    def compact(self) -> None:
+        # the catalog goes first: once the data file is rewritten the journal (and its slot records) no longer
+        # matches it, so a failed catalog write aborts here with the old data file and journal still in place
+        if not self._journaling: self.save(self._path); return
+        data = self._dump()
+        self._write_catalog(self._catalog_path)
+        _atomic_write(self._path, data)
+        self._dirty.clear(); self._saved_to = self._path
+        self._close_journal()
+        crc = zlib.crc32(data)
+        _atomic_write(self._path + ".journal", (json.dumps(["base", crc]) + "\n").encode("utf-8"))
+        self._open_journal(crc)
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close(); self._journal = None
+    def close(self) -> None:
+        # not a locked method: the worker drains its queue through ingest_attendance (a read lock),
+        # so it is stopped first and only the final compaction runs under the write lock
+        self.stop_attendance_worker()
+        with self._rw.write():
+            if self._journal is not None: self.compact()
+            self._close_journal()
+
+    # Background attendance worker
+    def start_attendance_worker(self, batch_size: int=500, max_queue: int=10000, flush_interval: float=0.5) -> "AttendanceWorker":
+        if not self.thread_safe: raise ValueError("Background worker needs StudentRegistry(thread_safe=True)")
+        if self._worker is None:
+            self._worker = AttendanceWorker(self, batch_size=batch_size, max_queue=max_queue, flush_interval=flush_interval)
+            self._worker.start()
+        return self._worker
+    def stop_attendance_worker(self, flush: bool=True) -> None:
+        w, self._worker = self._worker, None
+        if w is not None: w.stop(flush=flush)
+    def save_catalog(self, path: Optional[str]=None) -> None:
+        if path is None: path = self._catalog_path
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self._subject_catalog, f, indent=2)
+            self._write_catalog(path)
         except Exception as e:
             print("[WARN] could not save catalog:", e)
+    def _write_catalog(self, path: str) -> None:
+        _atomic_write(path, json.dumps(self._subject_catalog, indent=2).encode("utf-8"))
+    @_quiet
     def load_catalog(self, path: str=CATALOG_FILE) -> None:
+        self._catalog_path = path
         if not os.path.exists(path):
-            with open(path, "w", encoding="utf-8") as f: json.dump({}, f)
+            _atomic_write(path, b"{}")
         try:
             with open(path, "r", encoding="utf-8") as f:
                 raw = f.read().strip()
@@ -334,17 +2027,45 @@ class StudentRegistry:
             except Exception:
                 pass
             self._subject_catalog = {}
-            
+        self._catalog_changed()
+
     # Class Representatives (Greedy)
+    # per department: students in insertion order with their GPA (0-100 scale) and attendance % as arrays;
+    # rebuilt only after a change, so re-tuning alpha/beta only re-scores
+    def _score_table(self) -> Dict[str, Tuple[List[Student], Any, Any]]:
+        with self._view_lock:
+            hit = self._scores
+            if hit is not None and hit[0] == self._version: return hit[1]
+            version = self._version
+        groups: Dict[str, Tuple[List[Student], Any, Any]] = {}
+        for s in self.list_students():
+            g = groups.get(s.department or "-")
+            if g is None: g = groups[s.department or "-"] = ([], array("d"), array("d"))
+            g[0].append(s); g[1].append(s.gpa()/4.0*100.0); g[2].append(s.attendance_rate())
+        if _np is not None:
+            groups = {d: (studs, _np.frombuffer(gpa), _np.frombuffer(att)) for d, (studs, gpa, att) in groups.items()}
+        with self._view_lock:
+            if self._version == version: self._scores = (version, groups)
+        return groups
     def choose_class_representatives(self, top_per_dept: int=1, alpha: float=0.7, beta: float=0.3) -> Dict[str, List[Tuple[Student, float]]]:
-        buckets: Dict[str, List[Tuple[Student, float]]] = {}
-        for s in self._students:
-            score = alpha * (s.gpa()/4.0*100.0) + beta * s.attendance_rate()
-            buckets.setdefault(s.department or "-", []).append((s, round(score, 2)))
+        # top k per department by rounded score, ties in insertion order; O(n log k) with bounded heaps
+        k = max(1, int(top_per_dept))
         chosen: Dict[str, List[Tuple[Student, float]]] = {}
-        for dept, lst in buckets.items():
-            lst.sort(key=lambda t: t[1], reverse=True)
-            chosen[dept] = lst[:max(1, int(top_per_dept))]
+        for dept, (studs, gpa, att) in self._score_table().items():
+            if _np is not None:
+                raw = alpha * gpa + beta * att
+                sc = _np.round(raw, 2)
+                # np.round rounds raw*100 half to even; near those halves take round(), which the pure-Python
+                # and SQLite paths use (it rounds the exact binary value), so every path picks the same scores
+                t = raw * 100.0
+                for i in _np.flatnonzero(_np.abs(t - _np.floor(t) - 0.5) < 1e-6).tolist(): sc[i] = round(float(raw[i]), 2)
+                cand = _np.arange(len(sc))
+                if k < len(sc): cand = _np.flatnonzero(sc >= _np.partition(sc, len(sc) - k)[len(sc) - k])
+                top = cand[_np.lexsort((cand, -sc[cand]))][:k]
+                chosen[dept] = [(studs[i], float(sc[i])) for i in top.tolist()]
+            else:
+                scores = [round(alpha * g + beta * a, 2) for g, a in zip(gpa, att)]
+                chosen[dept] = [(studs[i], scores[i]) for i in heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)]
         return chosen
     
     # Timetable Optimizer
@@ -352,49 +2073,131 @@ class StudentRegistry:
         code = code.strip().upper()
         if end_min <= start_min: raise ValueError("End must be after start")
         self._subject_catalog[code] = {"start": int(start_min), "end": int(end_min), "weight": float(weight)}
+        self._catalog_changed()
+        self._log("slot", code, int(start_min), int(end_min), float(weight))
+        self._emit("slot", code)
     def get_subject_slot(self, code: str) -> Optional[Dict[str, float]]:
         return self._subject_catalog.get(code.strip().upper())
     def list_subject_slots(self) -> Dict[str, Dict[str, float]]:
         return dict(self._subject_catalog)
+    def _catalog_changed(self) -> None:
+        self._timetable_memo = {}; self._slot_index = None; self._conflicts = None
+    def _slots(self) -> IntervalIndex:
+        idx = self._slot_index
+        if idx is None:
+            idx = self._slot_index = IntervalIndex((int(v["start"]), int(v["end"]), code) for code, v in self._subject_catalog.items())
+        return idx
+    def subjects_at(self, minute: int) -> List[str]:
+        # subjects in session at the given minute of the day
+        return sorted(self._slots().at(minute))
+    def subjects_in_window(self, start_min: int, end_min: int) -> List[str]:
+        return sorted(self._slots().overlapping(start_min, end_min))
+    def subjects_overlapping(self, code: str) -> List[str]:
+        code = code.strip().upper()
+        return sorted(self.conflict_graph().get(code, ()))
+    def conflict_graph(self) -> Dict[str, Set[str]]:
+        # code -> codes whose slots overlap it; computed once per catalog version, treat as read-only
+        graph = self._conflicts
+        if graph is None:
+            idx = self._slots(); graph = {}
+            for code, v in self._subject_catalog.items():
+                graph[code] = {c for c in idx.overlapping(int(v["start"]), int(v["end"])) if c != code}
+            self._conflicts = graph
+        return graph
+    def enrollment_conflicts(self, student_id: str) -> List[Tuple[str, str]]:
+        # pairs of the student's subjects whose slots overlap
+        s = self.get_by_id(student_id)
+        if s is None: raise ValueError("Student not found")
+        graph = self.conflict_graph(); codes = [c for c in s.subjects if c in graph]
+        mine = set(codes)
+        return sorted({tuple(sorted((a, b))) for a in codes for b in graph[a] & mine})
     def optimize_timetable_for(self, student_id: str) -> List[str]:
-
         s = self.get_by_id(student_id)
         if s is None: raise ValueError("Student not found")
-        items: List[Tuple[int,int,float,str]] = []
-        for code in s.subjects:
-            slot = self._subject_catalog.get(code)
-            if slot:
-                items.append((int(slot["start"]), int(slot["end"]), float(slot.get("weight",1.0)), code))
-        if not items: return []
-        items.sort(key=lambda x: x[1])
-        n = len(items)
-
-        p = [0]*n
-        for j in range(n):
-            p[j] = 0
-            sj_start = items[j][0]
-            for i in range(j-1, -1, -1):
-                if items[i][1] <= sj_start:
-                    p[j] = i+1
-                    break
-        
-        dp = [0.0]*(n+1)
-        keep = [False]*(n+1)
-        for j in range(1, n+1):
-            incl = items[j-1][2] + dp[p[j-1]]
-            excl = dp[j-1]
-            if incl > excl:
-                dp[j] = incl; keep[j] = True
-            else:
-                dp[j] = excl; keep[j] = False
-    
-        chosen_codes: List[str] = []
-        j = n
-        while j > 0:
-            if keep[j]:
-                chosen_codes.append(items[j-1][3])
-                j = p[j-1]
-            else:
-                j -= 1
-        chosen_codes.reverse()
-        return chosen_codes
+        key = frozenset(code for code in s.subjects if code in self._subject_catalog)
+        memo = self._timetable_memo
+        out = memo.get(key)
+        if out is None: out = memo[key] = _optimize_slots(_timetable_items(key, self._subject_catalog))
+        return list(out)
+    def _enrollments(self, student_ids: Optional[Iterable[str]]) -> Iterator[Tuple[str, Iterable[str]]]:
+        if student_ids is None:
+            for s in self.list_students(): yield s.student_id, s.subjects
+            return
+        for sid in student_ids:
+            s = self.get_by_id(sid)
+            if s is None: raise ValueError(f"Student {sid} not found")
+            yield sid, s.subjects
+    def optimize_timetables(self, student_ids: Optional[Iterable[str]]=None, workers: int=0) -> Dict[str, List[str]]:
+        # every student (or the given cohort) in one call: one DP per distinct set of scheduled codes, in-process
+        # by default (each DP is cheaper than pickling it to a worker); workers > 0 opts into a process pool
+        catalog = self._subject_catalog; memo = self._timetable_memo
+        keys: Dict[str, FrozenSet[str]] = {}
+        for sid, subjects in self._enrollments(student_ids):
+            keys[sid] = frozenset(code for code in subjects if code in catalog)
+        missing = [k for k in set(keys.values()) if k not in memo]
+        jobs = [_timetable_items(k, catalog) for k in missing]
+        results: Optional[List[List[str]]] = None
+        if workers > 0 and len(jobs) >= _TIMETABLE_POOL_MIN:
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_optimize_slots, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+            except Exception as e:
+                print("[WARN] process pool unavailable, optimizing in-process:", e)
+        if results is None: results = [_optimize_slots(items) for items in jobs]
+        memo.update(zip(missing, results))
+        return {sid: list(memo[k]) for sid, k in keys.items()}
+
+# Drains attendance in batches on a background thread; submit() blocks when the bounded queue is full
+class AttendanceWorker:
+    def __init__(self, registry: StudentRegistry, batch_size: int=500, max_queue: int=10000, flush_interval: float=0.5,
+                 on_batch: Optional[Callable[[AttendanceIngestResult], None]]=None) -> None:
+        self.registry = registry
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.on_batch = on_batch
+        self.applied = 0; self.rejected = 0
+        self.errors: deque = deque(maxlen=1000)  # most recent (row, sid, reason)
+        self._q: "queue.Queue[Tuple[str, str, str, bool]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._stop = threading.Event()
+        self._submit_lock = threading.Lock()  # the stop check and the put are one step, so no row lands after _run exits
+        self._discard = False
+        self._thread = threading.Thread(target=self._run, name="attendance-worker", daemon=True)
+    def start(self) -> None: self._thread.start()
+    def submit(self, sid: str, date: str, subject: str, present: bool, timeout: Optional[float]=None) -> None:
+        with self._submit_lock:
+            if self._stop.is_set(): raise RuntimeError("Attendance worker is stopped")
+            self._q.put((sid, date, subject, present), timeout=timeout)  # raises queue.Full on timeout
+    def pending(self) -> int: return self._q.qsize()
+    def flush(self) -> None: self._q.join()
+    def stop(self, flush: bool=True, timeout: Optional[float]=None) -> None:
+        self._discard = not flush
+        with self._submit_lock: self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive(): return
+        # nothing can be queued any more; anything left (a worker that died) is rejected so flush() never blocks
+        while True:
+            try: sid, *_ = self._q.get_nowait()
+            except queue.Empty: break
+            self.rejected += 1; self.errors.append((0, sid, "Attendance worker stopped"))
+            self._q.task_done()
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop.is_set(): return
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try: batch.append(self._q.get_nowait())
+                except queue.Empty: break
+            try:
+                if not self._discard:
+                    res = self.registry.ingest_attendance(batch)
+                    self.applied += res.applied; self.rejected += res.rejected; self.errors.extend(res.errors)
+                    self.registry.maybe_compact()
+                    if self.on_batch is not None: self.on_batch(res)
+            except Exception as e:
+                print("[WARN] attendance batch failed:", e)
+            finally:
+                for _ in batch: self._q.task_done()
@@ -1,8 +1,10 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import datetime
+from tkinter import ttk, messagebox, filedialog
+import datetime, os, queue, threading
+from collections import deque
 
 from student_records import StudentRegistry, Student
+import student_records_analytics as analytics
 
 #timetable
 def time_to_minutes(hhmm: str) -> int:
@@ -21,37 +23,276 @@ def minutes_to_time(mins: int) -> str:
     h = mins // 60; m = mins % 60
     return f"{h:02d}:{m:02d}"
 
+#Virtualized table: a fixed pool of Treeview rows re-filled from fetch(start, count) as the user scrolls
+class VirtualTable(ttk.Frame):
+    def __init__(self, master, columns, fetch, total, row_values, rowheight=20):
+        super().__init__(master)
+        self.fetch, self.total, self.row_values = fetch, total, row_values
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in columns], show="headings", selectmode="browse")
+        for c, txt, w, anchor in columns:
+            self.tree.heading(c, text=txt); self.tree.column(c, width=w, anchor=anchor)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew"); self.vsb.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1); self.grid_columnconfigure(0, weight=1)
+        self.rowheight = rowheight
+        self.offset = 0; self.visible = 18; self._n = 0
+        self._pool = []; self.selected_key = None
+        self.frozen = False; self._stale = False
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for key, step in (("<Up>", -1), ("<Down>", 1)): self.tree.bind(key, lambda e, d=step: self._step(d))
+        for key, step in (("<Prior>", -1), ("<Next>", 1)): self.tree.bind(key, lambda e, d=step: self.scroll(d, "pages") or "break")
+
+    def reset(self):
+        self.offset = 0; self.selected_key = None; self.refresh()
+
+    def freeze(self, frozen):
+        # while a task holds the registry write lock, fetching would block the Tk loop
+        self.frozen = frozen
+        if not frozen and self._stale: self.refresh()
+
+    def refresh(self):
+        if self.frozen: self._stale = True; return
+        self._stale = False
+        self._n = self.total()
+        self.offset = max(0, min(self.offset, self._n - self.visible))
+        rows = self.fetch(self.offset, self.visible)
+        while len(self._pool) < len(rows):
+            self._pool.append(self.tree.insert("", tk.END))
+        while len(self._pool) > len(rows):
+            self.tree.delete(self._pool.pop())
+        sel = None
+        for iid, r in zip(self._pool, rows):
+            vals = self.row_values(r)
+            self.tree.item(iid, values=vals)
+            if vals[0] == self.selected_key: sel = iid
+        self.tree.selection_set(sel) if sel else self.tree.selection_remove(self.tree.selection())
+        if self._n: self.vsb.set(self.offset / self._n, (self.offset + len(rows)) / self._n)
+        else: self.vsb.set(0.0, 1.0)
+
+    def patch(self, key, values):
+        # rewrite one visible row in place; False if the key is not on screen
+        for iid in self._pool:
+            vals = self.tree.item(iid, "values")
+            if vals and vals[0] == key:
+                self.tree.item(iid, values=values); return True
+        return False
+
+    def scroll(self, amount, what="units"):
+        step = amount * (self.visible - 1 if what == "pages" else 1)
+        self.jump(self.offset + step)
+
+    def jump(self, row):
+        self.offset = max(0, int(row)); self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto": self.jump(float(args[1]) * self._n)
+        elif args[0] == "scroll": self.scroll(int(args[1]), args[2])
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - self.rowheight) // self.rowheight)
+        if visible != self.visible:
+            self.visible = visible; self.refresh()
+
+    def _on_select(self, _event):
+        sel = self.tree.selection()
+        if sel:
+            vals = self.tree.item(sel[0], "values")
+            self.selected_key = vals[0] if vals else None
+
+    def _step(self, d):
+        sel = self.tree.selection()
+        idx = self._pool.index(sel[0]) if sel else -1
+        if (d < 0 and idx == 0) or (d > 0 and idx == len(self._pool) - 1):
+            self.scroll(d)
+            self.tree.selection_set(self._pool[idx]); self._on_select(None)
+            return "break"
+
+class TaskCancelled(Exception):
+    pass
+
+class Task:
+    # handle passed to a task function: report progress, poll for cancellation
+    def __init__(self, runner):
+        self._runner = runner; self.cancel_event = threading.Event()
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+    def progress(self, done, total):
+        self._runner._events.put(("progress", self, (done, total)))
+    def check(self):
+        if self.cancelled: raise TaskCancelled()
+
+#Task runner: one registry task at a time on a worker thread; progress and results come back through after()
+class TaskRunner:
+    def __init__(self, app, poll_ms=50):
+        self.app = app; self.poll_ms = poll_ms
+        self._events = queue.Queue()
+        self.current = None; self.write = False
+        bar = ttk.Frame(app); bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status = tk.StringVar(value="Ready")
+        ttk.Label(bar, textvariable=self.status).pack(side=tk.LEFT, padx=8, pady=3)
+        self.cancel_btn = ttk.Button(bar, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_btn.pack(side=tk.RIGHT, padx=6, pady=3)
+        self.bar = ttk.Progressbar(bar, length=220, mode="indeterminate")
+        self.bar.pack(side=tk.RIGHT, padx=6, pady=3)
+
+    @property
+    def busy(self):
+        return self.current is not None
+
+    def run(self, label, fn, on_done=None, cancellable=True, write=False):
+        # fn(task) runs off the Tk thread; on_done(result) runs on it. write=True for tasks that take the
+        # registry write lock (load/save), during which the Tk side must not touch the registry at all
+        if self.busy:
+            messagebox.showwarning("Busy", f"Wait for '{self.status.get()}' to finish."); return None
+        task = self.current = Task(self); self.write = write
+        self._on_done = on_done
+        self.status.set(label + "..."); self._label = label
+        self.bar.configure(mode="indeterminate", value=0); self.bar.start(15)
+        self.cancel_btn.configure(state="normal" if cancellable else "disabled")
+        self.app._set_busy(True, write)
+        def work():
+            try: self._events.put(("done", task, fn(task)))
+            except TaskCancelled: self._events.put(("cancelled", task, None))
+            except Exception as e: self._events.put(("error", task, e))
+        threading.Thread(target=work, name=f"task:{label}", daemon=True).start()
+        self.app.after(self.poll_ms, self._poll)
+        return task
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel_event.set(); self.status.set(self._label + " (cancelling)...")
+
+    def _poll(self):
+        while True:
+            try: kind, task, payload = self._events.get_nowait()
+            except queue.Empty: break
+            if task is not self.current: continue
+            if kind == "progress":
+                done, total = payload
+                if total:
+                    if str(self.bar.cget("mode")) != "determinate": self.bar.stop(); self.bar.configure(mode="determinate", maximum=total)
+                    self.bar.configure(value=done); self.status.set(f"{self._label}... {done}/{total}")
+                continue
+            self._finish(); cancelled = task.cancelled or kind == "cancelled"
+            self.status.set(self._label + (" cancelled" if cancelled else " failed" if kind == "error" else " done"))
+            if kind == "error": messagebox.showerror("Error", str(payload))
+            elif not cancelled and self._on_done is not None: self._on_done(payload)
+            return
+        self.app.after(self.poll_ms, self._poll)
+
+    def _finish(self):
+        self.current = None; self.write = False
+        self.bar.stop(); self.bar.configure(mode="indeterminate", value=0)
+        self.cancel_btn.configure(state="disabled")
+        self.app._set_busy(False, False)
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Student Records (DSA) — GUI")
         self.geometry("1120x700")
         self.minsize(1000, 640)
-        self.reg = StudentRegistry()
-        self.reg.load() 
+        self.reg = StudentRegistry(journal=True, thread_safe=True)
+        self.worker = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         style = ttk.Style()
         try: style.theme_use("clam")
         except Exception: pass
 
+        self.tasks = TaskRunner(self)
         nb = ttk.Notebook(self)
         self.tab_students = ttk.Frame(nb)
         self.tab_academics = ttk.Frame(nb)
         self.tab_reports = ttk.Frame(nb)
         self.tab_bonus = ttk.Frame(nb)
+        self.tab_diag = ttk.Frame(nb)
         nb.add(self.tab_students, text="Students")
         nb.add(self.tab_academics, text="Academics")
         nb.add(self.tab_reports, text="Reports")
         nb.add(self.tab_bonus, text="Bonus")
+        nb.add(self.tab_diag, text="Diagnostics")
         nb.pack(fill="both", expand=True)
 
         self._build_students_tab()
         self._build_academics_tab()
         self._build_reports_tab()
         self._build_bonus_tab()
-
-        self._refresh_student_table()
-        self._refresh_catalog_table()
+        self._build_diagnostics_tab()
+
+        # registry change events are queued from whichever thread made the change and applied on the Tk loop;
+        # the window opens right away and the load's reset event fills the tables
+        self._changes = deque()
+        self.reg.subscribe(lambda event, key: self._changes.append((event, key)))
+        self.after(100, self._apply_changes)
+        self.tasks.run("Loading students", lambda t: self.reg.load(progress=t.progress), on_done=self._on_loaded, cancellable=False, write=True)
+
+    def _on_loaded(self, _result):
+        self.worker = self.reg.start_attendance_worker()
+
+    def _set_busy(self, busy, write):
+        # action buttons are disabled while a task runs; the student table also stops fetching during write tasks
+        stack = list(self.winfo_children())
+        while stack:
+            w = stack.pop(); stack.extend(w.winfo_children())
+            if isinstance(w, ttk.Button) and w is not self.tasks.cancel_btn: w.state(["disabled"] if busy else ["!disabled"])
+        self.table.freeze(busy and write)
+
+    #Diagnostics tab: registry / student operation metrics, recorded only while enabled
+    def _build_diagnostics_tab(self):
+        f = self.tab_diag
+        top = ttk.Frame(f); top.pack(side=tk.TOP, fill=tk.X, padx=10, pady=10)
+        self.metrics_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="Record metrics", variable=self.metrics_var, command=self._toggle_metrics).pack(side=tk.LEFT)
+        ttk.Button(top, text="Reset", command=self._reset_metrics).pack(side=tk.LEFT, padx=6)
+        ttk.Button(top, text="Export JSON", command=lambda: self._export_metrics("json")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(top, text="Export Prometheus", command=lambda: self._export_metrics("prom")).pack(side=tk.LEFT, padx=6)
+        cols = [("op","Operation",220,"w"),("count","Calls",70,"e"),("errors","Errors",60,"e"),("mean","Mean ms",80,"e"),("p50","p50 ms",80,"e"),
+                ("p90","p90 ms",80,"e"),("p99","p99 ms",80,"e"),("max","Max ms",80,"e"),("total","Total s",80,"e"),("items","Items",80,"e"),("bytes","Bytes",100,"e")]
+        self.diag_tree = ttk.Treeview(f, columns=[c[0] for c in cols], show="headings")
+        for key, text, width, anchor in cols:
+            self.diag_tree.heading(key, text=text); self.diag_tree.column(key, width=width, anchor=anchor)
+        self.diag_tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=(0,10))
+        self.after(1000, self._refresh_diagnostics)
+
+    def _toggle_metrics(self):
+        if self.metrics_var.get(): self.reg.enable_metrics()
+        else: self.reg.disable_metrics()
+
+    def _reset_metrics(self):
+        if self.reg.metrics is not None: self.reg.metrics.reset()
+        for i in self.diag_tree.get_children(): self.diag_tree.delete(i)
+
+    def _export_metrics(self, fmt):
+        m = self.reg.metrics
+        if m is None: messagebox.showinfo("Diagnostics", "Metrics are not being recorded."); return
+        ext = ".json" if fmt == "json" else ".prom"
+        path = filedialog.asksaveasfilename(title="Export metrics", defaultextension=ext, filetypes=[("Metrics", "*" + ext), ("All files", "*")])
+        if not path: return
+        with open(path, "w", encoding="utf-8") as out:
+            out.write(m.to_json() if fmt == "json" else m.to_prometheus())
+
+    def _refresh_diagnostics(self):
+        # once a second while metrics are on; reading them never takes a registry lock
+        m = self.reg.metrics
+        if m is not None:
+            for op, r in m.stats().items():
+                values = (op, r["count"], r["errors"], f"{r['mean_ms']:.3f}", f"{r['p50_ms']:.3f}", f"{r['p90_ms']:.3f}", f"{r['p99_ms']:.3f}",
+                          f"{r['max_ms']:.3f}", f"{r['total_s']:.3f}", r["items"], r["bytes"])
+                if self.diag_tree.exists(op): self.diag_tree.item(op, values=values)
+                else: self.diag_tree.insert("", tk.END, iid=op, values=values)
+        self.after(1000, self._refresh_diagnostics)
+
+    def _on_close(self):
+        self.tasks.cancel()
+        try: self.reg.close()
+        except Exception as e: print("[WARN] could not compact journal:", e)
+        self.destroy()
 
     #Students Tab
     def _build_students_tab(self):
@@ -80,27 +321,44 @@ class App(tk.Tk):
         ttk.Button(form, text="Add Student", command=self._add_student).grid(row=row, column=0, columnspan=2, sticky="ew", padx=6, pady=(10,6)); row+=1
         ttk.Button(form, text="Remove by ID", command=self._remove_student).grid(row=row, column=0, columnspan=2, sticky="ew", padx=6, pady=6); row+=1
         ttk.Button(form, text="Search by ID", command=self._search_by_id).grid(row=row, column=0, columnspan=2, sticky="ew", padx=6, pady=6); row+=1
-        ttk.Button(form, text="Save", command=self._save).grid(row=row, column=0, columnspan=2, sticky="ew", padx=6, pady=(6,12))
+        ttk.Button(form, text="Save", command=self._save).grid(row=row, column=0, columnspan=2, sticky="ew", padx=6, pady=(6,12)); row+=1
+
+        # search-as-you-type over IDs (prefix) and names (prefix / fuzzy); picking a match fills Student ID
+        self.find_var = tk.StringVar()
+        ttk.Label(form, text="Find").grid(row=row, column=0, sticky="w", padx=6, pady=6)
+        ttk.Entry(form, textvariable=self.find_var, width=28).grid(row=row, column=1, padx=6, pady=6); row+=1
+        self.find_list = tk.Listbox(form, height=10, exportselection=False)
+        self.find_list.grid(row=row, column=0, columnspan=2, sticky="nsew", padx=6, pady=(0,12))
+        self.find_list.bind("<<ListboxSelect>>", self._pick_found)
+        self._find_ids = []; self._find_job = None
+        self.find_var.trace_add("write", lambda *_: self._schedule_find())
 
         table_frame = ttk.Frame(f); table_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
-        cols = ("id","name","dept","gender","year","gpa")
-        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=18)
-        for c, txt, w, anchor in [("id","Student ID",120,"w"),("name","Name",200,"w"),("dept","Department",120,"w"),("gender","Gender",70,"center"),("year","Year",60,"center"),("gpa","GPA",60,"center")]:
-            self.tree.heading(c, text=txt); self.tree.column(c, width=w, anchor=anchor)
-        self.tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.table_order = "insertion"
+        self.table = VirtualTable(table_frame,
+            [("id","Student ID",120,"w"),("name","Name",200,"w"),("dept","Department",120,"w"),("gender","Gender",70,"center"),("year","Year",60,"center"),("gpa","GPA",60,"center")],
+            fetch=lambda start, count: self.reg.page(start, count, order=self.table_order),
+            total=lambda: len(self.reg),
+            row_values=lambda r: (r.student_id, r.name, r.department, r.gender, r.year, f"{r.gpa:.2f}"))
+        self.table.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.tree = self.table.tree
 
         btns = ttk.Frame(table_frame); btns.pack(side=tk.TOP, fill=tk.X)
-        ttk.Button(btns, text="Refresh", command=self._refresh_student_table).pack(side=tk.LEFT, padx=4, pady=6)
+        ttk.Button(btns, text="Refresh", command=lambda: self._show_order("insertion")).pack(side=tk.LEFT, padx=4, pady=6)
         ttk.Button(btns, text="List by Name", command=self._list_by_name).pack(side=tk.LEFT, padx=4)
         ttk.Button(btns, text="List by Student ID", command=self._list_by_id).pack(side=tk.LEFT, padx=4)
         ttk.Button(btns, text="List by GPA", command=self._list_by_gpa).pack(side=tk.LEFT, padx=4)
+        self.jump_var = tk.StringVar()
+        ttk.Button(btns, text="Go", width=4, command=self._jump_to_row).pack(side=tk.RIGHT, padx=4)
+        ttk.Entry(btns, textvariable=self.jump_var, width=8).pack(side=tk.RIGHT)
+        ttk.Label(btns, text="Row").pack(side=tk.RIGHT, padx=4)
 
     def _add_student(self):
         try:
             sid = self.sid_var.get().strip()
             if not sid: raise ValueError("Student ID is required.")
             s = Student(student_id=sid, name=self.name_var.get().strip() or "Unnamed", department=self.dept_var.get().strip() or "-", gender=self.gender_var.get().strip() or "F", year=int(self.year_var.get()))
-            self.reg.add_student(s); self._refresh_student_table()
+            self.reg.add_student(s)
             messagebox.showinfo("Added", f"Student {sid} added.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -109,7 +367,7 @@ class App(tk.Tk):
         sid = self.sid_var.get().strip() or self._selected_student_id()
         if not sid: messagebox.showwarning("Select", "Enter or select a Student ID to remove."); return
         try:
-            self.reg.remove_student(sid); self._refresh_student_table()
+            self.reg.remove_student(sid)
             messagebox.showinfo("Removed", f"Student {sid} removed.")
         except Exception as e: messagebox.showerror("Error", str(e))
 
@@ -117,32 +375,83 @@ class App(tk.Tk):
         sid = self.sid_var.get().strip()
         if not sid: messagebox.showwarning("Input", "Enter a Student ID to search."); return
         s = self.reg.get_by_id(sid)
-        if s is None: messagebox.showinfo("Search", "Not found.")
+        if s is None:
+            hits = self.reg.search(sid, limit=10)
+            if not hits: messagebox.showinfo("Search", "Not found.")
+            else: messagebox.showinfo("Search", "No exact ID match. Closest:\n" + "\n".join(f"{r.student_id}  {r.name}" for r in hits))
         else:
             info = f"ID: {s.student_id}\nName: {s.name}\nDept: {s.department}\nGender: {s.gender}\nYear: {s.year}\nGPA: {s.gpa()}"
             messagebox.showinfo("Found", info)
 
-    def _save(self):
-        try:
-            self.reg.save(); messagebox.showinfo("Saved", "Data + catalog saved.")
-        except Exception as e: messagebox.showerror("Error", str(e))
+    def _schedule_find(self):
+        # runs once typing pauses for 150ms
+        if self._find_job is not None: self.after_cancel(self._find_job)
+        self._find_job = self.after(150, self._run_find)
+
+    def _run_find(self):
+        self._find_job = None
+        if self.tasks.write: self._find_job = self.after(150, self._run_find); return
+        hits = self.reg.search(self.find_var.get(), limit=20)
+        self._find_ids = [r.student_id for r in hits]
+        self.find_list.delete(0, tk.END)
+        for r in hits: self.find_list.insert(tk.END, f"{r.student_id}  {r.name} ({r.department}, Y{r.year})")
+
+    def _pick_found(self, _event=None):
+        sel = self.find_list.curselection()
+        if sel: self.sid_var.set(self._find_ids[sel[0]])
 
-    def _fill_table(self, items):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        for s in items:
-            self.tree.insert("", tk.END, values=(s.student_id, s.name, s.department, s.gender, s.year, f"{s.gpa():.2f}"))
+    def _save(self):
+        self.tasks.run("Saving", lambda t: self.reg.save(), on_done=lambda _r: messagebox.showinfo("Saved", "Data + catalog saved."), cancellable=False, write=True)
+
+    def _apply_changes(self):
+        # patch only the affected rows; scroll position and selection are kept
+        if self.tasks.write: self.after(100, self._apply_changes); return
+        recount = reset = False; updated, slots = set(), set()
+        while self._changes:
+            event, key = self._changes.popleft()
+            if event == "reset": reset = True
+            elif event == "slot": slots.add(key)
+            elif event == "updated": updated.add(key)
+            else:
+                recount = True; updated.discard(key)
+                if event == "removed" and self.reps_tree.exists(key): self.reps_tree.delete(key)
+        if reset:
+            self.table.refresh(); self._refresh_catalog_table()
+            for i in self.reps_tree.get_children(): self.reps_tree.delete(i)
+        else:
+            if recount or (updated and self.table_order == "gpa"): self.table.refresh()
+            for sid in updated:
+                s = self.reg.get_by_id(sid)
+                if s is None: continue
+                if not recount and self.table_order != "gpa": self.table.patch(sid, self.table.row_values(s.summary()))
+                if self.reps_tree.exists(sid): self._set_rep_row(self.reps_tree.set(sid, "dept"), s)
+            for code in slots: self._set_slot_row(code)
+        if (reset or recount) and self.find_var.get().strip(): self._schedule_find()
+        self.after(100, self._apply_changes)
+
+    def _show_order(self, order):
+        # the ordering is computed (and memoized by the registry) on the task thread, then paged in
+        def done(_r):
+            self.table_order = order; self.table.reset()
+        self.tasks.run(f"Sorting by {order}", lambda t: self.reg.page(0, 1, order=order), on_done=done)
 
     def _refresh_student_table(self):
-        self._fill_table(self.reg.list_students())
+        self.table.refresh()
 
     def _list_by_name(self):
-        self._fill_table(self.reg.sorted_by_name())
+        self._show_order("name")
 
     def _list_by_id(self):
-        self._fill_table(self.reg.sorted_by_id())
+        self._show_order("id")
 
     def _list_by_gpa(self):
-        self._fill_table(self.reg.sorted_by_gpa(descending=True))
+        self._show_order("gpa")
+
+    def _jump_to_row(self):
+        try: row = int(self.jump_var.get()) - 1
+        except ValueError:
+            messagebox.showwarning("Row", "Enter a row number."); return
+        self.table.jump(row)
 
     def _selected_student_id(self):
         sel = self.tree.selection()
@@ -177,6 +486,7 @@ class App(tk.Tk):
         ttk.Checkbutton(att, text="Present", variable=self.present_var).grid(row=0, column=6, padx=6, pady=6)
         ttk.Button(att, text="Queue Attendance", command=self._queue_attendance).grid(row=1, column=0, columnspan=3, sticky="ew", padx=6, pady=6)
         ttk.Button(att, text="Process Queue", command=self._process_attendance).grid(row=1, column=3, columnspan=3, sticky="ew", padx=6, pady=6)
+        ttk.Button(att, text="Import CSV...", command=self._import_attendance_csv).grid(row=1, column=6, sticky="ew", padx=6, pady=6)
 
     def _get_student_or_warn(self, sid: str):
         s = self.reg.get_by_id(sid)
@@ -234,13 +544,55 @@ class App(tk.Tk):
         date = self.date_var.get().strip(); present = bool(self.present_var.get())
         if not sid or not subj:
             messagebox.showwarning("Input", "Enter Student ID and Subject Code."); return
-        self.reg.enqueue_attendance(sid, date or str(datetime.date.today()), subj, present)
-        messagebox.showinfo("Queued", "Attendance queued. Use 'Process Queue' to apply.")
+        try:
+            # never block the Tk thread on a full worker queue
+            self.reg.enqueue_attendance(sid, date or str(datetime.date.today()), subj, present, timeout=0.2)
+        except queue.Full:
+            messagebox.showwarning("Busy", "The attendance queue is full; the worker is catching up. Try again shortly."); return
+        except Exception as e:
+            messagebox.showerror("Error", str(e)); return
+        messagebox.showinfo("Queued", "Attendance queued. The background worker applies it shortly; 'Process Queue' flushes it now.")
 
     def _process_attendance(self):
-        try:
-            cnt = self.reg.process_attendance(); messagebox.showinfo("Processed", f"Processed {cnt} attendance record(s).")
-        except Exception as e: messagebox.showerror("Error", str(e))
+        worker = self.worker
+        if worker is None:  # only started once the initial load succeeds
+            messagebox.showwarning("Attendance", "The attendance worker is not running: student data did not load."); return
+        before, rejected = worker.applied, worker.rejected
+        def work(task):
+            total = worker.pending()
+            while worker.pending():
+                task.progress(total - worker.pending(), total)
+                task.cancel_event.wait(0.05); task.check()
+            worker.flush()
+            return self.reg.process_attendance()
+        def done(cnt):
+            cnt += worker.applied - before
+            msg = f"Processed {cnt} attendance record(s)."
+            if worker.rejected > rejected:
+                msg += "\n" + "\n".join(f"  {sid}: {reason}" for _, sid, reason in list(worker.errors)[-(worker.rejected - rejected):][-10:])
+            messagebox.showinfo("Processed", msg)
+        self.tasks.run("Processing attendance", work, on_done=done)
+
+    def _import_attendance_csv(self):
+        path = filedialog.askopenfilename(title="Attendance CSV", filetypes=[("CSV", "*.csv"), ("All files", "*")])
+        if not path: return
+        def work(task):
+            # rows are all read before any is applied, so cancelling while reading leaves the registry untouched
+            size = os.path.getsize(path); done = 0
+            def lines(f):
+                nonlocal done
+                for i, line in enumerate(f, 1):
+                    done += len(line)
+                    if not i % 2000: task.check(); task.progress(done, size)
+                    yield line
+            with open(path, newline="", encoding="utf-8") as f:
+                return self.reg.ingest_attendance_csv(lines(f))
+        def done(res):
+            lines = [f"Applied {res.applied}, rejected {res.rejected}."]
+            lines += [f"  row {n} ({sid or '?'}): {reason}" for n, sid, reason in res.errors[:15]]
+            if len(res.errors) > 15: lines.append(f"  ... {len(res.errors) - 15} more")
+            messagebox.showinfo("Attendance Import", "\n".join(lines))
+        self.tasks.run("Importing attendance", work, on_done=done)
 
     #Reports Tab
     def _build_reports_tab(self):
@@ -250,6 +602,7 @@ class App(tk.Tk):
         ttk.Label(top, text="Student ID").pack(side=tk.LEFT)
         ttk.Entry(top, textvariable=self.report_sid, width=18).pack(side=tk.LEFT, padx=6)
         ttk.Button(top, text="Show Report", command=self._show_report).pack(side=tk.LEFT, padx=6)
+        ttk.Button(top, text="School Summary", command=self._show_school_summary).pack(side=tk.LEFT, padx=6)
         self.report_text = tk.Text(f, height=20)
         self.report_text.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
 
@@ -268,12 +621,37 @@ class App(tk.Tk):
         ]
         for sub in s.subjects:
             lines.append(f"  {sub}: {s.attendance_rate(sub)}%")
+        months = s.attendance_rollup("month")
+        if months:
+            lines.append("Attendance by month:")
+            lines += [f"  {label}: {rate}% ({present}/{total})" for label, present, total, rate in months]
         lines.append("\nGrades:")
         for sub, scores in s.grades.items():
-            lines.append(f"  {sub}: {scores}")
+            lines.append(f"  {sub}: {list(scores)}")
         self.report_text.delete("1.0", tk.END)
         self.report_text.insert(tk.END, "\n".join(lines))
 
+    def _show_school_summary(self):
+        def done(d):
+            lines = [f"--- School summary | {d['students']} students ---", "GPA by department:"]
+            lines += [f"  {k}: n={g.count} mean={g.mean:.2f} sd={g.std:.2f} min={g.min:.2f} max={g.max:.2f}" for k, g in d["gpa_by_department"].items()]
+            lines.append("GPA by year:")
+            lines += [f"  Year {k}: n={g.count} mean={g.mean:.2f}" for k, g in d["gpa_by_year"].items()]
+            edges, hist = d["gpa_histogram"]
+            lines.append("GPA distribution (" + " ".join(f"{e:.1f}" for e in edges[:-1]) + "):")
+            lines += [f"  {k}: {counts}" for k, counts in hist.items()]
+            lines.append("Attendance by department:")
+            lines += [f"  {k}: mean={g.mean:.1f}%" for k, g in d["attendance_by_department"].items()]
+            lines.append("Subject scores (p25 / p50 / p75 / p90):")
+            for k, g in d["subject_scores"].items():
+                p = d["subject_percentiles"][k]
+                lines.append(f"  {k}: n={g.count} mean={g.mean:.1f} | " + " / ".join(f"{p[q]:.1f}" for q in (25, 50, 75, 90)))
+            lines.append("Attendance by year:")
+            lines += [f"  {y}: {rate}% ({present}/{total})" for y, (present, total, rate) in d["attendance_by_year"].items()]
+            self.report_text.delete("1.0", tk.END)
+            self.report_text.insert(tk.END, "\n".join(lines))
+        self.tasks.run("Computing school summary", lambda t: analytics.dashboard(self.reg), on_done=done)
+
     #Bonus chalanges tab
     def _build_bonus_tab(self):
         f = self.tab_bonus
@@ -284,6 +662,7 @@ class App(tk.Tk):
         self.alpha_var = tk.DoubleVar(value=0.7)
         self.beta_var = tk.DoubleVar(value=0.3)
         self.topk_var = tk.IntVar(value=1)
+        self._rep_weights = (0.7, 0.3)
 
         ttk.Label(reps, text="Weight α (GPA)").grid(row=0, column=0, padx=6, pady=6, sticky="w")
         ttk.Entry(reps, textvariable=self.alpha_var, width=6).grid(row=0, column=1, padx=6, pady=6)
@@ -337,13 +716,22 @@ class App(tk.Tk):
             if alpha < 0 or beta < 0: raise ValueError("Weights must be non-negative")
             if alpha + beta == 0: raise ValueError("At least one weight must be > 0")
             topk = int(self.topk_var.get())
-            data = self.reg.choose_class_representatives(top_per_dept=topk, alpha=alpha, beta=beta)
+        except Exception as e:
+            messagebox.showerror("Error", str(e)); return
+        def done(data):
+            self._rep_weights = (alpha, beta)
             for i in self.reps_tree.get_children(): self.reps_tree.delete(i)
             for dept, lst in data.items():
-                for stu, score in lst:
-                    self.reps_tree.insert("", tk.END, values=(dept, stu.student_id, stu.name, f"{stu.gpa():.2f}", f"{stu.attendance_rate():.1f}", f"{score:.1f}"))
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+                for stu, _score in lst: self._set_rep_row(dept, stu)
+        self.tasks.run("Picking representatives", lambda t: self.reg.choose_class_representatives(top_per_dept=topk, alpha=alpha, beta=beta), on_done=done)
+
+    def _set_rep_row(self, dept, stu):
+        # rows are keyed by student id so later grade/attendance changes can be patched in place
+        alpha, beta = self._rep_weights
+        score = alpha * (stu.gpa()/4.0*100.0) + beta * stu.attendance_rate()
+        vals = (dept, stu.student_id, stu.name, f"{stu.gpa():.2f}", f"{stu.attendance_rate():.1f}", f"{score:.1f}")
+        if self.reps_tree.exists(stu.student_id): self.reps_tree.item(stu.student_id, values=vals)
+        else: self.reps_tree.insert("", tk.END, iid=stu.student_id, values=vals)
 
     def _add_update_slot(self):
         code = (self.slot_code.get() or "").strip().upper()
@@ -357,15 +745,20 @@ class App(tk.Tk):
             emin = time_to_minutes(end)
             self.reg.set_subject_slot(code, smin, emin, weight)
             self.reg.save_catalog()
-            self._refresh_catalog_table()
             messagebox.showinfo("Saved", f"Slot saved for {code}.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def _refresh_catalog_table(self):
         for i in self.catalog_tree.get_children(): self.catalog_tree.delete(i)
-        for code, slot in self.reg.list_subject_slots().items():
-            self.catalog_tree.insert("", tk.END, values=(code, minutes_to_time(int(slot["start"])), minutes_to_time(int(slot["end"])), f"{slot.get('weight',1.0)}"))
+        for code in self.reg.list_subject_slots(): self._set_slot_row(code)
+
+    def _set_slot_row(self, code):
+        slot = self.reg.get_subject_slot(code)
+        if slot is None: return
+        vals = (code, minutes_to_time(int(slot["start"])), minutes_to_time(int(slot["end"])), f"{slot.get('weight',1.0)}")
+        if self.catalog_tree.exists(code): self.catalog_tree.item(code, values=vals)
+        else: self.catalog_tree.insert("", tk.END, iid=code, values=vals)
 
     def _optimize_timetable(self):
         sid = (self.opt_sid.get() or "").strip()
@@ -382,6 +775,9 @@ class App(tk.Tk):
             for code in chosen:
                 slot = self.reg.get_subject_slot(code)
                 self.opt_output.insert(tk.END, f"  {code}  {minutes_to_time(int(slot['start']))}-{minutes_to_time(int(slot['end']))}  w={slot.get('weight',1.0)}\n")
+            clashes = self.reg.enrollment_conflicts(sid)
+            if clashes:
+                self.opt_output.insert(tk.END, "Overlapping enrolled subjects: " + ", ".join(f"{a}/{b}" for a, b in clashes) + "\n")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
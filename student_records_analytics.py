@@ -0,0 +1,253 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from array import array
+from collections import namedtuple
+import datetime, functools, math, weakref
+
+from student_records import StudentRegistry, Student, _SUBJECT_CODES, _date_code, _code_day
+
+try:
+    import numpy as _np  # optional: vectorized aggregation
+except ImportError:
+    _np = None
+
+GroupStats = namedtuple("GroupStats", "count mean std min max")
+
+# one unpacked byte per presence bit, so whole bitsets expand with a single join
+_BITS = [bytes((b >> k) & 1 for k in range(8)) for b in range(256)]
+
+# Columnar snapshot: one array per field, students in registry order, grades and attendance in long form
+# (one row per score / per attendance record, pointing back at the student row)
+class Snapshot:
+    GROUPS = ("department", "gender", "year")
+    FIELDS = ("gpa", "year", "att_rate", "att_present", "att_total")
+
+    def __init__(self, use_numpy: Optional[bool]=None) -> None:
+        self.numpy = (_np is not None) if use_numpy is None else bool(use_numpy and _np is not None)
+        self.student_id: List[str] = []
+        self.labels: Dict[str, List[Any]] = {"department": [], "gender": []}  # code -> label per group field
+        self.department = array("I"); self.gender = array("I"); self.year = array("B")
+        self.gpa = array("d"); self.att_present = array("I"); self.att_total = array("I")
+        self.g_row = array("I"); self.g_subject = array("I"); self.g_score = array("d")
+        self.a_row = array("I"); self.a_date = array("I"); self.a_present = bytearray()
+        self._codes: Dict[str, Dict[Any, int]] = {"department": {}, "gender": {}}
+
+    def __len__(self) -> int: return len(self.student_id)
+
+    def _code(self, field: str, label: Any) -> int:
+        codes = self._codes[field]; c = codes.get(label)
+        if c is None: c = codes[label] = len(codes); self.labels[field].append(label)
+        return c
+
+    def _add(self, sid: str, dept: str, gender: str, year: int, gpa: float, present: int, total: int) -> int:
+        row = len(self.student_id)
+        self.student_id.append(sid)
+        self.department.append(self._code("department", dept or "-")); self.gender.append(self._code("gender", gender))
+        self.year.append(int(year)); self.gpa.append(gpa); self.att_present.append(present); self.att_total.append(total)
+        return row
+
+    def _finish(self) -> "Snapshot":
+        # freeze the columns as ndarrays (zero-copy views of the arrays) for the vectorized path
+        if self.numpy:
+            for name in ("department", "gender", "year", "gpa", "att_present", "att_total", "g_row", "g_subject", "g_score", "a_row", "a_date"):
+                col = getattr(self, name)
+                setattr(self, name, _np.frombuffer(col, dtype=col.typecode) if len(col) else _np.zeros(0, dtype=col.typecode))
+            self.a_present = _np.frombuffer(bytes(self.a_present), dtype=_np.uint8)
+        return self
+
+    # Columns
+    def column(self, field: str) -> Any:
+        if field == "att_rate":
+            if self.numpy:
+                tot = self.att_total.astype(float)
+                return _np.divide(100.0 * self.att_present, tot, out=_np.zeros(len(tot)), where=tot > 0)
+            return array("d", (100.0 * p / t if t else 0.0 for p, t in zip(self.att_present, self.att_total)))
+        if field not in self.FIELDS: raise ValueError(f"Unknown field {field!r}, expected one of {self.FIELDS}")
+        return getattr(self, field)
+
+    def _keys(self, by: Optional[str]) -> Tuple[Any, List[Any]]:
+        # (code per student row, label per code)
+        if by is None: return (_np.zeros(len(self), dtype=_np.int64) if self.numpy else array("I", bytes(4 * len(self)))), ["all"]
+        if by == "year": return self.year, [0, 1, 2, 3, 4]
+        if by not in self.GROUPS: raise ValueError(f"Unknown group {by!r}, expected one of {self.GROUPS}")
+        return getattr(self, by), self.labels[by]
+
+    # Aggregations
+    def group_by(self, by: Optional[str], field: str="gpa") -> Dict[Any, GroupStats]:
+        # count/mean/std (population)/min/max of a student field per group
+        codes, labels = self._keys(by)
+        return _group_stats(codes, self.column(field), labels, self.numpy)
+
+    def histogram(self, field: str="gpa", bins: int=10, lo: Optional[float]=None, hi: Optional[float]=None,
+                  by: Optional[str]=None) -> Tuple[List[float], Dict[Any, List[int]]]:
+        # equal-width bins over [lo, hi] (last bin closed); values outside are ignored
+        vals = self.column(field)
+        if lo is None: lo = float(min(vals)) if len(vals) else 0.0
+        if hi is None: hi = float(max(vals)) if len(vals) else 1.0
+        if hi <= lo: hi = lo + 1.0
+        edges = [lo + (hi - lo) * i / bins for i in range(bins + 1)]
+        codes, labels = self._keys(by)
+        scale = bins / (hi - lo)
+        if self.numpy:
+            v = _np.asarray(vals, dtype=float); keep = (v >= lo) & (v <= hi)
+            idx = _np.minimum(((v[keep] - lo) * scale).astype(_np.int64), bins - 1)
+            flat = _np.bincount(_np.asarray(codes)[keep].astype(_np.int64) * bins + idx, minlength=len(labels) * bins)
+            counts = {labels[g]: flat[g*bins:(g+1)*bins].tolist() for g in range(len(labels)) if flat[g*bins:(g+1)*bins].any()}
+        else:
+            acc: Dict[int, List[int]] = {}
+            for c, v in zip(codes, vals):
+                if lo <= v <= hi:
+                    row = acc.get(c)
+                    if row is None: row = acc[c] = [0] * bins
+                    row[min(int((v - lo) * scale), bins - 1)] += 1
+            counts = {labels[g]: acc[g] for g in sorted(acc)}
+        return edges, counts
+
+    def percentiles(self, field: str="gpa", qs: Sequence[float]=(25, 50, 75, 90), by: Optional[str]=None) -> Dict[Any, Dict[float, float]]:
+        codes, labels = self._keys(by)
+        return _group_percentiles(codes, self.column(field), labels, qs, self.numpy)
+
+    def subject_stats(self) -> Dict[str, GroupStats]:
+        # over every individual score, per subject
+        return _group_stats(self.g_subject, self.g_score, _SUBJECT_CODES.values, self.numpy)
+
+    def subject_percentiles(self, qs: Sequence[float]=(25, 50, 75, 90)) -> Dict[str, Dict[float, float]]:
+        return _group_percentiles(self.g_subject, self.g_score, _SUBJECT_CODES.values, qs, self.numpy)
+
+    def attendance_by_year(self, by: Optional[str]=None) -> Dict[Any, Tuple[int, int, float]]:
+        # calendar year (or (group, year)) -> (present, total, rate %) over every attendance record with an ISO date
+        codes, labels = self._keys(by)
+        if self.numpy:
+            if len(self.a_date):
+                dates, inv = _np.unique(self.a_date, return_inverse=True)
+                yr = _np.asarray([_date_year(int(c)) for c in dates], dtype=_np.int64)[inv]
+            else: yr = _np.zeros(0, dtype=_np.int64)
+            ok = yr > 0
+            if not ok.any(): return {}
+            y0 = int(yr[ok].min()); span = int(yr[ok].max()) - y0 + 1
+            key = _np.asarray(codes, dtype=_np.int64)[self.a_row[ok]] * span + (yr[ok] - y0)
+            tot = _np.bincount(key, minlength=len(labels) * span)
+            pres = _np.bincount(key, weights=self.a_present[ok], minlength=len(labels) * span)
+            acc = {(int(k) // span, y0 + int(k) % span): (int(pres[k]), int(tot[k])) for k in _np.flatnonzero(tot)}
+        else:
+            acc2: Dict[Tuple[int, int], List[int]] = {}; years: Dict[int, int] = {}
+            for row, d, p in zip(self.a_row, self.a_date, self.a_present):
+                y = years.get(d)
+                if y is None: y = years[d] = _date_year(d)
+                if not y: continue
+                c = acc2.get((codes[row], y))
+                if c is None: c = acc2[(codes[row], y)] = [0, 0]
+                c[0] += p; c[1] += 1
+            acc = {k: (v[0], v[1]) for k, v in acc2.items()}
+        out: Dict[Any, Tuple[int, int, float]] = {}
+        for (g, y), (p, n) in sorted(acc.items()):
+            out[y if by is None else (labels[g], y)] = (p, n, round(100.0 * p / n, 2))
+        return out
+
+def _group_stats(codes: Any, vals: Any, labels: Sequence[Any], numpy: bool) -> Dict[Any, GroupStats]:
+    if numpy:
+        codes = _np.asarray(codes, dtype=_np.int64); vals = _np.asarray(vals, dtype=float)
+        if not len(vals): return {}
+        g = int(codes.max()) + 1
+        cnt = _np.bincount(codes, minlength=g)
+        s = _np.bincount(codes, weights=vals, minlength=g); ss = _np.bincount(codes, weights=vals * vals, minlength=g)
+        order = _np.lexsort((vals, codes)); sv = vals[order]
+        starts = _np.searchsorted(codes[order], _np.arange(g))
+        out: Dict[Any, GroupStats] = {}
+        for k in _np.flatnonzero(cnt).tolist():
+            n = int(cnt[k]); mean = s[k] / n
+            out[labels[k]] = GroupStats(n, float(mean), math.sqrt(max(0.0, ss[k] / n - mean * mean)), float(sv[starts[k]]), float(sv[starts[k] + n - 1]))
+        return out
+    acc: Dict[int, List[float]] = {}
+    for c, v in zip(codes, vals):
+        a = acc.get(c)
+        if a is None: acc[c] = [1, v, v * v, v, v]
+        else:
+            a[0] += 1; a[1] += v; a[2] += v * v
+            if v < a[3]: a[3] = v
+            if v > a[4]: a[4] = v
+    res: Dict[Any, GroupStats] = {}
+    for k in sorted(acc):
+        n, s1, s2, mn, mx = acc[k]; mean = s1 / n
+        res[labels[k]] = GroupStats(int(n), mean, math.sqrt(max(0.0, s2 / n - mean * mean)), mn, mx)
+    return res
+
+def _interp(sv: Any, q: float) -> float:
+    # linear interpolation between closest ranks (NumPy's default percentile method)
+    n = len(sv); pos = (n - 1) * q / 100.0
+    lo = int(math.floor(pos)); hi = min(lo + 1, n - 1)
+    return float(sv[lo] + (sv[hi] - sv[lo]) * (pos - lo))
+
+def _group_percentiles(codes: Any, vals: Any, labels: Sequence[Any], qs: Sequence[float], numpy: bool) -> Dict[Any, Dict[float, float]]:
+    for q in qs:
+        if not 0 <= q <= 100: raise ValueError("Percentiles must be within 0..100")
+    if numpy:
+        codes = _np.asarray(codes, dtype=_np.int64); vals = _np.asarray(vals, dtype=float)
+        if not len(vals): return {}
+        order = _np.lexsort((vals, codes)); sc = codes[order]; sv = vals[order]
+        bounds = _np.flatnonzero(_np.diff(sc)) + 1
+        starts = _np.concatenate(([0], bounds)); ends = _np.concatenate((bounds, [len(sv)]))
+        return {labels[int(sc[a])]: {q: _interp(sv[a:b], q) for q in qs} for a, b in zip(starts.tolist(), ends.tolist())}
+    groups: Dict[int, List[float]] = {}
+    for c, v in zip(codes, vals): groups.setdefault(c, []).append(v)
+    return {labels[k]: {q: _interp(sorted(groups[k]), q) for q in qs} for k in sorted(groups)}
+
+def _date_year(code: int) -> int:
+    # calendar year of an attendance date code (0 when the date is not ISO)
+    day = _code_day(code)
+    return datetime.date.fromordinal(day).year if day is not None else 0
+
+# Snapshot builders
+_SNAPSHOTS: "weakref.WeakKeyDictionary[StudentRegistry, Tuple[int, Snapshot]]" = weakref.WeakKeyDictionary()
+
+def snapshot(reg: StudentRegistry, use_numpy: Optional[bool]=None) -> Snapshot:
+    # consistent copy of the registry's columns. In-memory registries are read through a registry snapshot,
+    # so writers are never held up, and the result is reused until the registry's version moves
+    from student_records_sqlite import SQLiteStudentRegistry
+    if isinstance(reg, SQLiteStudentRegistry):
+        with reg._rw.write(): return _snapshot_sqlite(reg, use_numpy)  # every SQLite call shares one connection
+    hit = _SNAPSHOTS.get(reg)
+    if hit is not None and hit[0] == reg._version and hit[1].numpy == Snapshot(use_numpy).numpy: return hit[1]
+    with reg.snapshot() as view:
+        snap = Snapshot(use_numpy)
+        for _ in view.map(functools.partial(_add_student, snap)): pass
+        _SNAPSHOTS[reg] = (view.version, snap._finish())
+    return snap
+
+def _add_student(snap: Snapshot, s: Student) -> None:
+    row = snap._add(s.student_id, s.department, s.gender, s.year, s.gpa(), s._att_present, s._att_total)
+    for subj, scores in s.grades.items():
+        n = len(scores)
+        if not n: continue
+        snap.g_score.extend(scores if isinstance(scores, array) else array("d", scores))
+        snap.g_subject.extend(array("I", [_SUBJECT_CODES.id(subj)]) * n); snap.g_row.extend(array("I", [row]) * n)
+    log = s.attendance_log; n = len(log)
+    if n:
+        snap.a_date.extend(log._dates); snap.a_row.extend(array("I", [row]) * n)
+        snap.a_present += b"".join([_BITS[b] for b in log._present])[:n]
+
+def _snapshot_sqlite(reg: Any, use_numpy: Optional[bool]) -> Snapshot:
+    # straight from the tables, without hydrating students
+    snap = Snapshot(use_numpy); rows: Dict[str, int] = {}
+    db = reg._db
+    for sid, dept, gender, year, gpa, present, total in db.execute("SELECT student_id, department, gender, year, gpa, att_present, att_total FROM students ORDER BY seq"):
+        rows[sid] = snap._add(sid, dept, gender, year, gpa, present, total)
+    for sid, subj, score in db.execute("SELECT student_id, subject, score FROM grades ORDER BY id"):
+        snap.g_row.append(rows[sid]); snap.g_subject.append(_SUBJECT_CODES.id(subj)); snap.g_score.append(score)
+    for sid, date, present in db.execute("SELECT student_id, date, present FROM attendance ORDER BY id"):
+        snap.a_row.append(rows[sid]); snap.a_date.append(_date_code(date)); snap.a_present.append(1 if present else 0)
+    return snap._finish()
+
+def dashboard(reg: StudentRegistry, snap: Optional[Snapshot]=None) -> Dict[str, Any]:
+    # whole-school overview: department GPA stats and histograms, subject score percentiles, attendance by year
+    snap = snap if snap is not None else snapshot(reg)
+    return {
+        "students": len(snap),
+        "gpa_by_department": snap.group_by("department", "gpa"),
+        "gpa_by_year": snap.group_by("year", "gpa"),
+        "gpa_histogram": snap.histogram("gpa", bins=8, lo=0.0, hi=4.0, by="department"),
+        "attendance_by_department": snap.group_by("department", "att_rate"),
+        "subject_scores": snap.subject_stats(),
+        "subject_percentiles": snap.subject_percentiles(),
+        "attendance_by_year": snap.attendance_by_year(),
+    }
@@ -0,0 +1,247 @@
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import argparse, datetime, gc, json, os, platform, random, sys, tempfile, time, tracemalloc
+
+from student_records import StudentRegistry, Student, DATA_FILE, CATALOG_FILE, _np
+
+# Synthetic data: every value comes from random.Random(seed), so a spec always yields the same dataset
+_FIRST = ["Tariq", "Amna", "Omar", "Sara", "Yusuf", "Huda", "Ali", "Mona", "Khalid", "Reem", "John", "Mary", "Li", "Ana", "Ivan", "Noor"]
+_LAST = ["Osman", "Ahmed", "Hassan", "Mohamed", "Ibrahim", "Abdalla", "Salih", "Smith", "Brown", "Khan", "Nguyen", "Garcia"]
+_DEPTS = ["CS", "Math", "Physics", "Biology", "Chemistry", "Economics", "History", "Medicine"]
+
+@dataclass
+class DatasetSpec:
+    students: int = 1000
+    subjects: int = 5     # enrolled per student
+    grades: int = 3       # grades per enrolled subject
+    days: int = 20        # attendance days, one record per enrolled subject per day
+    catalog: int = 40     # subject codes with a timetable slot
+    seed: int = 42
+
+def _codes(spec: DatasetSpec) -> List[str]:
+    return [f"SUB{i:03d}" for i in range(max(spec.catalog, spec.subjects))]
+
+def generate_catalog(spec: DatasetSpec) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(spec.seed + 1)
+    out: Dict[str, Dict[str, float]] = {}
+    for code in _codes(spec)[:spec.catalog]:
+        start = rng.randrange(8 * 60, 17 * 60, 15)
+        out[code] = {"start": start, "end": start + rng.choice((45, 60, 90, 120)), "weight": float(rng.randint(1, 5))}
+    return out
+
+def generate_records(spec: DatasetSpec) -> Iterator[dict]:
+    # student records in the data.json format
+    rng = random.Random(spec.seed)
+    codes = _codes(spec)
+    first = datetime.date(2024, 9, 2)
+    dates = [(first + datetime.timedelta(days=d)).isoformat() for d in range(spec.days)]
+    for i in range(spec.students):
+        subs = rng.sample(codes, spec.subjects)
+        grades = {c: [float(rng.randint(35, 100)) for _ in range(spec.grades)] for c in subs}
+        yield {
+            "student_id": f"S{i:07d}", "name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+            "department": rng.choice(_DEPTS), "gender": rng.choice("FM"), "year": rng.randint(1, 4),
+            "subjects": subs, "grades": grades, "grade_history": [[c, sc] for c in subs for sc in grades[c]],
+            "attendance_log": [{"date": d, "subject": c, "present": rng.random() < 0.9} for d in dates for c in subs],
+        }
+
+def write_dataset(spec: DatasetSpec, data_path: str=DATA_FILE, catalog_path: str=CATALOG_FILE) -> int:
+    # streamed, so large datasets never sit in memory as one document; returns the data file size
+    with open(data_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for n, rec in enumerate(generate_records(spec)):
+            f.write(",\n" if n else "\n"); f.write(json.dumps(rec))
+        f.write("\n]\n")
+    with open(catalog_path, "w", encoding="utf-8") as f:
+        json.dump(generate_catalog(spec), f, indent=2)
+    return os.path.getsize(data_path)
+
+# Measurement
+def _pct(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals: return 0.0
+    pos = (len(sorted_vals) - 1) * q / 100.0; lo = int(pos); hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (pos - lo)
+
+class _Op:
+    # latencies of one benchmarked operation, plus the items / bytes it handled and its traced peak memory
+    def __init__(self, name: str, memory: bool):
+        self.name = name; self.memory = memory
+        self.lat: List[float] = []; self.items = 0; self.bytes = 0; self.peak = 0; self._base = 0
+    def __enter__(self) -> "_Op":
+        gc.collect()
+        if self.memory: tracemalloc.reset_peak(); self._base = tracemalloc.get_traced_memory()[0]
+        return self
+    def __exit__(self, *exc: Any) -> None:
+        if self.memory: self.peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self._base)
+    def time(self, fn: Callable[..., Any], *args: Any, items: int=1) -> Any:
+        t = time.perf_counter(); out = fn(*args); self.lat.append(time.perf_counter() - t)
+        self.items += items
+        return out
+    def result(self) -> Dict[str, Any]:
+        lat = sorted(self.lat); total = sum(lat)
+        return {
+            "op": self.name, "calls": len(lat), "items": self.items, "total_s": round(total, 6),
+            "calls_per_s": round(len(lat) / total, 2) if total else None,
+            "items_per_s": round(self.items / total, 2) if total else None,
+            "mb_per_s": round(self.bytes / total / 1e6, 2) if total and self.bytes else None,
+            "p50_ms": round(_pct(lat, 50) * 1000, 4), "p90_ms": round(_pct(lat, 90) * 1000, 4),
+            "p99_ms": round(_pct(lat, 99) * 1000, 4), "max_ms": round(lat[-1] * 1000, 4) if lat else 0.0,
+            "peak_kib": round(self.peak / 1024, 1) if self.memory else None,
+        }
+
+def _registry(backend: str, n: int) -> StudentRegistry:
+    if backend == "sqlite":
+        from student_records_sqlite import SQLiteStudentRegistry
+        return SQLiteStudentRegistry(f"bench{n}.db")
+    return StudentRegistry()
+
+def run(spec: DatasetSpec, backend: str="memory", repeat: int=5, queries: int=1000, memory: bool=True,
+        progress: Optional[Callable[[str], None]]=None) -> Dict[str, Any]:
+    # returns {"meta", "spec", "results"}. tracemalloc slows allocation-heavy code several times over, so
+    # timings come from an untraced pass and peak memory from a second, traced pass with fewer calls
+    if backend not in ("memory", "sqlite"): raise ValueError(f"Unknown backend {backend!r}")
+    started = time.perf_counter()
+    results = _suite(spec, backend, repeat, queries, False, progress)
+    peak = None
+    if memory:
+        traced = _suite(spec, backend, 1, min(queries, 100), True, progress and (lambda name: progress(f"{name} (memory)")))
+        peaks = {r["op"]: r["peak_kib"] for r in traced}
+        for r in results: r["peak_kib"] = peaks.get(r["op"])
+        peak = max(peaks.values(), default=0.0)
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "platform": platform.platform(), "numpy": _np.__version__ if _np is not None else None,
+            "backend": backend, "repeat": repeat, "queries": queries,
+            "peak_kib": peak,  # largest per-op peak
+            "wall_s": round(time.perf_counter() - started, 3),
+        },
+        "spec": asdict(spec), "results": results,
+    }
+
+def _suite(spec: DatasetSpec, backend: str, repeat: int, queries: int, memory: bool,
+           progress: Optional[Callable[[str], None]]) -> List[Dict[str, Any]]:
+    # one pass over every benchmark in a scratch directory
+    rng = random.Random(spec.seed + 2)
+    results: List[Dict[str, Any]] = []
+    cwd = os.getcwd(); opened: List[StudentRegistry] = []
+    def step(name: str) -> _Op:
+        if progress is not None: progress(name)
+        return _Op(name, memory)
+    def done(op: _Op) -> None: results.append(op.result())
+    if memory: tracemalloc.start()
+    with tempfile.TemporaryDirectory(prefix="srbench-") as tmp:
+        os.chdir(tmp)
+        try:
+            size = write_dataset(spec)
+            # load / save: a fresh registry per load, a fresh file per save so dirty tracking never skips one
+            with step("load") as op:
+                for r in range(repeat):
+                    reg = _registry(backend, r); opened.append(reg)
+                    op.time(reg.load, DATA_FILE, items=spec.students); op.bytes += size
+            done(op)
+            with step("save") as op:
+                for r in range(repeat):
+                    path = f"out{r}.json"
+                    op.time(reg.save, path, items=spec.students)
+                    if os.path.exists(path): op.bytes += os.path.getsize(path)
+            done(op)
+            # add_student: one call per student into an empty registry
+            students = [Student.from_dict(d) for d in generate_records(spec)]
+            fresh = _registry(backend, repeat); opened.append(fresh)
+            with step("add_student") as op:
+                for s in students: op.time(fresh.add_student, s)
+            done(op); del students
+            # process_attendance: one batch per new day, one record per student
+            sids = [sm.student_id for sm in reg.summaries()]
+            firsts = {s.student_id: s.subjects.to_list()[0] for s in reg.list_students() if len(s.subjects)}
+            day0 = datetime.date(2024, 9, 2) + datetime.timedelta(days=spec.days)
+            with step("process_attendance") as op:
+                for r in range(repeat):
+                    date = (day0 + datetime.timedelta(days=r)).isoformat()
+                    for sid, subj in firsts.items(): reg.enqueue_attendance(sid, date, subj, rng.random() < 0.9)
+                    op.time(reg.process_attendance, items=len(firsts))
+            done(op)
+            for name in ("sorted_by_name", "sorted_by_id", "sorted_by_gpa"):
+                with step(name) as op:
+                    fn = getattr(reg, name)
+                    for _ in range(repeat): op.time(fn, items=spec.students)
+                done(op)
+            names = [sm.name for sm in reg.summaries()]
+            with step("binary_search_by_name") as op:
+                for _ in range(queries): op.time(reg.binary_search_by_name, rng.choice(names))
+            done(op)
+            with step("choose_class_representatives") as op:
+                for _ in range(repeat): op.time(reg.choose_class_representatives, items=spec.students)
+            done(op)
+            with step("optimize_timetable_for") as op:
+                for _ in range(queries): op.time(reg.optimize_timetable_for, rng.choice(sids))
+            done(op)
+        finally:
+            for r in opened:
+                try: r.close()
+                except Exception as e: print("[WARN] could not close benchmark registry:", e)
+            os.chdir(cwd)
+    if memory: tracemalloc.stop()
+    return results
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float=1.2) -> List[Dict[str, Any]]:
+    # per op: p50 ratio new/old; above threshold counts as a regression
+    if old.get("spec") != new.get("spec"): print("[WARN] the runs used different dataset specs")
+    before = {r["op"]: r for r in old.get("results", [])}
+    out = []
+    for r in new["results"]:
+        b = before.get(r["op"])
+        if b is None or not b["p50_ms"]: continue
+        ratio = r["p50_ms"] / b["p50_ms"]
+        out.append({"op": r["op"], "old_p50_ms": b["p50_ms"], "new_p50_ms": r["p50_ms"], "ratio": round(ratio, 3), "regressed": ratio > threshold})
+    return out
+
+# CLI
+def _table(rows: List[Dict[str, Any]], cols: List[str]) -> str:
+    cells = [[("-" if r.get(c) is None else str(r.get(c))) for c in cols] for r in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]]=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark StudentRegistry on a deterministic synthetic dataset.")
+    ap.add_argument("--students", type=int, default=DatasetSpec.students)
+    ap.add_argument("--subjects", type=int, default=DatasetSpec.subjects, help="subjects per student")
+    ap.add_argument("--grades", type=int, default=DatasetSpec.grades, help="grades per subject")
+    ap.add_argument("--days", type=int, default=DatasetSpec.days, help="attendance days")
+    ap.add_argument("--catalog", type=int, default=DatasetSpec.catalog, help="subject codes in the catalog")
+    ap.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    ap.add_argument("--backend", choices=("memory", "sqlite"), default="memory")
+    ap.add_argument("--repeat", type=int, default=5, help="calls per bulk operation")
+    ap.add_argument("--queries", type=int, default=1000, help="calls per lookup operation")
+    ap.add_argument("--no-memory", action="store_true", help="skip the traced pass that measures peak memory")
+    ap.add_argument("--out", help="write the results as JSON to this file")
+    ap.add_argument("--compare", help="earlier results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    ap.add_argument("--generate", metavar="DIR", help="only write data.json and catalog.json into DIR")
+    a = ap.parse_args(argv)
+    spec = DatasetSpec(a.students, a.subjects, a.grades, a.days, a.catalog, a.seed)
+    if min(spec.students, spec.subjects, spec.grades, spec.days, spec.catalog) < 0: ap.error("sizes must be non-negative")
+    if a.generate:
+        os.makedirs(a.generate, exist_ok=True)
+        size = write_dataset(spec, os.path.join(a.generate, DATA_FILE), os.path.join(a.generate, CATALOG_FILE))
+        print(f"Wrote {spec.students} students ({size} bytes) to {a.generate}")
+        return 0
+    res = run(spec, a.backend, max(1, a.repeat), max(1, a.queries), not a.no_memory,
+              progress=lambda name: print(f"... {name}", file=sys.stderr))
+    print(_table(res["results"], ["op", "calls", "items_per_s", "p50_ms", "p90_ms", "p99_ms", "max_ms", "peak_kib"]))
+    print(f"peak traced memory (largest op): {res['meta']['peak_kib']} KiB | wall {res['meta']['wall_s']} s")
+    if a.out:
+        with open(a.out, "w", encoding="utf-8") as f: json.dump(res, f, indent=2)
+    if a.compare:
+        with open(a.compare, "r", encoding="utf-8") as f: old = json.load(f)
+        rows = compare(old, res, a.threshold)
+        print(_table(rows, ["op", "old_p50_ms", "new_p50_ms", "ratio", "regressed"]))
+        if any(r["regressed"] for r in rows): return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
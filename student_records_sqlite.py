@@ -0,0 +1,426 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+import sqlite3, json, os, weakref, threading, heapq, datetime
+
+from student_records import (StudentRegistry, Student, StudentSummary, AttendanceIngestResult,
+                             NameIndex, RegistrySnapshot, DATA_FILE, CATALOG_FILE, _INDEXED_FIELDS, _group_attendance_rows, _quiet, _day_bound)
+
+DB_FILE = "students.db"
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL, name_lc TEXT NOT NULL,
+    department TEXT NOT NULL, department_lc TEXT NOT NULL,
+    gender TEXT NOT NULL, year INTEGER NOT NULL,
+    gpa REAL NOT NULL DEFAULT 0, att_present INTEGER NOT NULL DEFAULT 0, att_total INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_students_name ON students(name_lc, seq);
+CREATE INDEX IF NOT EXISTS ix_students_dept_year ON students(department_lc, year);
+CREATE INDEX IF NOT EXISTS ix_students_year ON students(year);
+CREATE INDEX IF NOT EXISTS ix_students_gender ON students(gender);
+CREATE INDEX IF NOT EXISTS ix_students_gpa ON students(gpa, seq);
+CREATE TABLE IF NOT EXISTS enrollments (
+    student_id TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL, subject TEXT NOT NULL,
+    PRIMARY KEY (student_id, subject)
+);
+CREATE INDEX IF NOT EXISTS ix_enrollments_subject ON enrollments(subject);
+CREATE TABLE IF NOT EXISTS grades (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+    subject TEXT NOT NULL, score
+);
+CREATE INDEX IF NOT EXISTS ix_grades_student ON grades(student_id, subject);
+CREATE TABLE IF NOT EXISTS grade_history (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+    subject TEXT NOT NULL, score
+);
+CREATE INDEX IF NOT EXISTS ix_grade_history_student ON grade_history(student_id, id);
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+    date TEXT NOT NULL, subject TEXT NOT NULL, present INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_attendance_student ON attendance(student_id, subject);
+CREATE INDEX IF NOT EXISTS ix_attendance_date ON attendance(date);
+CREATE TABLE IF NOT EXISTS subject_slots (
+    code TEXT PRIMARY KEY, start INTEGER NOT NULL, "end" INTEGER NOT NULL, weight REAL NOT NULL
+);
+"""
+
+_SUMMARY_COLS = "student_id, name, department, gender, year, gpa"
+_PAGE_ORDERS = {"insertion": "seq", "id": "student_id", "name": "name_lc, seq", "gpa": "gpa DESC, seq DESC"}
+# sort keys answered by ORDER BY (ties fall back to insertion order, as in the stable in-memory sort)
+_SORT_COLS: Dict[Any, str] = {"student_id": "student_id", "name": "name", "department": "department", "gender": "gender",
+                              "year": "year", "gpa": "gpa", Student.gpa: "gpa"}
+
+def _sql_order(keys: Sequence[Any]) -> Optional[str]:
+    cols = []
+    for k in keys:
+        k, desc = k if isinstance(k, tuple) else (k, False)
+        try: col = _SORT_COLS[k]
+        except (KeyError, TypeError): return None
+        cols.append(col + (" DESC" if desc else ""))
+    return ", ".join(cols + ["seq"]) if cols else None
+
+def _prefix_end(prefix: str) -> str:
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _student_docs(db: sqlite3.Connection, sids: Sequence[str]) -> Dict[str, dict]:
+    # data.json-style records for sids, read in chunks of 500 ids
+    docs: Dict[str, dict] = {}
+    for i in range(0, len(sids), 500):
+        chunk = list(sids[i:i+500]); marks = ",".join("?"*len(chunk))
+        for sid, name, dept, gender, year in db.execute(f"SELECT student_id, name, department, gender, year FROM students WHERE student_id IN ({marks})", chunk):
+            docs[sid] = {"student_id": sid, "name": name, "department": dept, "gender": gender, "year": year,
+                         "subjects": [], "grades": {}, "grade_history": [], "attendance_log": []}
+        for sid, subj in db.execute(f"SELECT student_id, subject FROM enrollments WHERE student_id IN ({marks}) ORDER BY student_id, position", chunk):
+            docs[sid]["subjects"].append(subj)
+        for sid, subj, sc in db.execute(f"SELECT student_id, subject, score FROM grades WHERE student_id IN ({marks}) ORDER BY id", chunk):
+            docs[sid]["grades"].setdefault(subj, []).append(sc)
+        for sid, subj, sc in db.execute(f"SELECT student_id, subject, score FROM grade_history WHERE student_id IN ({marks}) ORDER BY id", chunk):
+            docs[sid]["grade_history"].append((subj, sc))
+        for sid, date, subj, present in db.execute(f"SELECT student_id, date, subject, present FROM attendance WHERE student_id IN ({marks}) ORDER BY id", chunk):
+            docs[sid]["attendance_log"].append({"date": date, "subject": subj, "present": bool(present)})
+    return docs
+
+# Snapshot: a read transaction on a second connection; in WAL mode it keeps seeing the database as of its
+# first read while the registry's connection goes on committing. Students are rebuilt privately per read.
+class SQLiteSnapshot(RegistrySnapshot):
+    def __init__(self, reg: "SQLiteStudentRegistry") -> None:
+        if reg.db_path == ":memory:" or reg.db_path.startswith("file::memory:"): raise ValueError("Snapshots need a file-backed database.")
+        self.version = reg._version
+        self._reg = reg
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(reg.db_path, check_same_thread=False)
+        self._conn.execute("BEGIN")
+        self._ids: Dict[str, None] = dict.fromkeys(r[0] for r in self._conn.execute("SELECT student_id FROM students ORDER BY seq"))
+    def __len__(self) -> int: return len(self._ids)
+    def __contains__(self, sid: object) -> bool: return sid in self._ids
+    def __iter__(self) -> Iterator[str]: return iter(list(self._ids))
+    def close(self) -> None:
+        if self._reg is None: return
+        self._reg = None; self._ids = {}
+        with self._lock: self._conn.close()
+    def _load(self, sids: Sequence[str]) -> List[Student]:
+        self._check()
+        with self._lock: docs = _student_docs(self._conn, sids)
+        return [Student.from_dict(docs[sid]) for sid in sids if sid in docs]
+    def read(self, sid: str, fn: Callable[[Student], T]) -> T:
+        if sid not in self._ids: self._check(); raise KeyError(sid)
+        return fn(self._load([sid])[0])
+    def map(self, fn: Callable[[Student], T]) -> Iterator[T]:
+        ids = list(self._ids)
+        for i in range(0, len(ids), 500):
+            for s in self._load(ids[i:i+500]): yield fn(s)
+    def student(self, sid: str) -> Optional[Student]:
+        return self._load([sid])[0] if sid in self._ids else None
+    def records(self) -> Iterator[dict]:
+        return self.map(Student._to_dict)
+
+# Registry backed by sqlite3: the database is the source of truth, Student objects are
+# hydrated on demand and every mutation on them is written through in its own transaction
+class SQLiteStudentRegistry(StudentRegistry):
+    # one connection: readers share the registry read lock and take turns on the connection through
+    # _db_lock, which also holds every write transaction (student write-through runs under a read lock);
+    # attendance ingest commits before patching live students, so it stays exclusive
+    _READ_METHODS = tuple(m for m in StudentRegistry._READ_METHODS if m not in ("ingest_attendance", "process_attendance")) + (
+        "export_json", "student_attendance_rate", "attendance_rates_by_subject")
+    _WRITE_METHODS = StudentRegistry._WRITE_METHODS + ("ingest_attendance", "process_attendance", "import_students", "migrate_from_json")
+    _METRIC_FILES: Dict[str, str] = {}  # save/load commit or migrate; the JSON files are not what they read or write
+
+    def __init__(self, db_path: str=DB_FILE, thread_safe: bool=False) -> None:
+        super().__init__(thread_safe=thread_safe)
+        self.db_path = db_path
+        self._db_lock = threading.RLock()  # the connection: reads, write transactions, hydration
+        self._db = sqlite3.connect(db_path, check_same_thread=not thread_safe)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+        self._live: "weakref.WeakValueDictionary[str, Student]" = weakref.WeakValueDictionary()
+        self._read_catalog()
+
+    # Students
+    def add_student(self, s: Student) -> None:
+        with self._db_lock, self._db:
+            self._insert_student(s)
+        self._adopt(s)
+        if self._names is not None: self._names.add(s.student_id, s.name)
+        self._emit("added", s.student_id)
+    def import_students(self, students: Iterable[Student]) -> int:
+        # bulk import in a single transaction; existing ids are skipped
+        cnt = 0; added: List[Student] = []
+        with self._db_lock, self._db:
+            for s in students:
+                if self._exists(s.student_id): continue
+                self._insert_student(s); added.append(s); cnt += 1
+        for s in added:
+            self._adopt(s)
+            if self._names is not None: self._names.add(s.student_id, s.name)
+            self._emit("added", s.student_id)
+        return cnt
+    def _insert_student(self, s: Student) -> None:
+        if self._exists(s.student_id):
+            raise ValueError(f"Student ID {s.student_id} already exists.")
+        sid = s.student_id
+        self._db.execute(
+            "INSERT INTO students (student_id, name, name_lc, department, department_lc, gender, year, gpa, att_present, att_total) VALUES (?,?,?,?,?,?,?,?,?,?)",
+            (sid, s.name, _INDEXED_FIELDS["name"](s.name), s.department, _INDEXED_FIELDS["department"](s.department),
+             s.gender, int(s.year), s.gpa(), s._att_present, s._att_total))
+        self._db.executemany("INSERT INTO enrollments VALUES (?,?,?)", [(sid, i, c) for i, c in enumerate(s.subjects)])
+        self._db.executemany("INSERT INTO grades (student_id, subject, score) VALUES (?,?,?)",
+                             [(sid, subj, sc) for subj, scores in s.grades.items() for sc in scores])
+        self._db.executemany("INSERT INTO grade_history (student_id, subject, score) VALUES (?,?,?)",
+                             [(sid, subj, sc) for subj, sc in s.grade_history])
+        self._db.executemany("INSERT INTO attendance (student_id, date, subject, present) VALUES (?,?,?,?)",
+                             [(sid, r.date, r.subject, int(r.present)) for r in s.attendance_log])
+    def _adopt(self, s: Student) -> None:
+        super()._adopt(s)
+        self._live[s.student_id] = s
+    def _held_students(self) -> List[Student]:
+        return list(self._live.values())
+    def _rows(self, sql: str, params: Sequence[Any]=()) -> List[Any]:
+        with self._db_lock: return self._db.execute(sql, params).fetchall()
+    def _row(self, sql: str, params: Sequence[Any]=()) -> Optional[Any]:
+        with self._db_lock: return self._db.execute(sql, params).fetchone()
+    def _exists(self, sid: str) -> bool:
+        return self._row("SELECT 1 FROM students WHERE student_id=?", (sid,)) is not None
+    def get_by_id(self, sid: str) -> Optional[Student]:
+        s = self._live.get(sid)
+        if s is not None: return s
+        found = self._hydrate([sid])
+        return found[0] if found else None
+    def remove_student(self, sid: str) -> None:
+        with self._db_lock, self._db:
+            cur = self._db.execute("DELETE FROM students WHERE student_id=?", (sid,))
+        if not cur.rowcount: raise ValueError("Not found.")
+        s = self._live.pop(sid, None)
+        if s is not None: self._release(s)
+        if self._names is not None: self._names.remove(sid)
+        self._emit("removed", sid)
+    def _hydrate(self, sids: Sequence[str]) -> List[Student]:
+        # rebuild Students for ids not already live, keeping the order of sids; under _db_lock so two
+        # readers never build two Students for one id
+        found: Dict[str, Student] = {}
+        with self._db_lock:
+            for sid in sids:
+                s = self._live.get(sid)
+                if s is not None: found[sid] = s
+            for sid, d in _student_docs(self._db, [sid for sid in sids if sid not in found]).items():
+                s = found[sid] = Student.from_dict(d)
+                self._adopt(s)
+        return [found[sid] for sid in sids if sid in found]
+    def _students_where(self, where: str="", params: Sequence[Any]=(), order: str="seq") -> List[Student]:
+        sql = "SELECT student_id FROM students" + (f" WHERE {where}" if where else "") + f" ORDER BY {order}"
+        return self._hydrate([r[0] for r in self._rows(sql, params)])
+    def _on_student_change(self, s: Student, op: str, args: tuple) -> None:
+        sid = s.student_id
+        with self._db_lock, self._db:
+            if op == "enroll":
+                self._db.execute("INSERT INTO enrollments VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM enrollments WHERE student_id=?), ?)", (sid, sid, args[0]))
+            elif op == "drop":
+                self._db.execute("DELETE FROM enrollments WHERE student_id=? AND subject=?", (sid, args[0]))
+            elif op == "grade":
+                self._db.execute("INSERT INTO grades (student_id, subject, score) VALUES (?,?,?)", (sid, args[0], args[1]))
+                self._db.execute("INSERT INTO grade_history (student_id, subject, score) VALUES (?,?,?)", (sid, args[0], args[1]))
+            elif op == "undo":
+                row = self._row("SELECT id, subject, score FROM grade_history WHERE student_id=? ORDER BY id DESC LIMIT 1", (sid,))
+                if row is not None:
+                    self._db.execute("DELETE FROM grade_history WHERE id=?", (row[0],))
+                    last = self._row("SELECT id, score FROM grades WHERE student_id=? AND subject=? ORDER BY id DESC LIMIT 1", (sid, row[1]))
+                    if last is not None and last[1] == row[2]: self._db.execute("DELETE FROM grades WHERE id=?", (last[0],))
+            elif op == "attend":
+                self._db.execute("INSERT INTO attendance (student_id, date, subject, present) VALUES (?,?,?,?)", (sid, args[0], args[1], int(args[2])))
+            elif op == "attend_many":
+                self._db.executemany("INSERT INTO attendance (student_id, date, subject, present) VALUES (?,?,?,?)", [(sid, d, subj, int(p)) for d, subj, p in args[0]])
+            self._db.execute("UPDATE students SET gpa=?, att_present=?, att_total=? WHERE student_id=?", (s.gpa(), s._att_present, s._att_total, sid))
+        super()._on_student_change(s, op, args)
+
+    # Attendance (one transaction per ingested batch, validated in SQL without hydrating students)
+    def ingest_attendance(self, rows: Iterable[Any]) -> AttendanceIngestResult:
+        res = AttendanceIngestResult()
+        groups = _group_attendance_rows(rows, res)
+        enrolled: Dict[str, set] = {}
+        sids = list(groups)
+        for i in range(0, len(sids), 500):
+            chunk = sids[i:i+500]; marks = ",".join("?"*len(chunk))
+            for (sid,) in self._rows(f"SELECT student_id FROM students WHERE student_id IN ({marks})", chunk): enrolled[sid] = set()
+            for sid, subj in self._rows(f"SELECT student_id, subject FROM enrollments WHERE student_id IN ({marks})", chunk): enrolled[sid].add(subj)
+        good: Dict[str, List[Tuple[str, str, bool]]] = {}
+        for sid, recs in groups.items():
+            subjects = enrolled.get(sid)
+            for n, date, subj, present in recs:
+                if subjects is None: res.reject(n, sid, "Unknown student")
+                elif subj not in subjects: res.reject(n, sid, f"Not enrolled in {subj}.")
+                else: good.setdefault(sid, []).append((date, subj, present))
+        with self._db_lock, self._db:
+            self._db.executemany("INSERT INTO attendance (student_id, date, subject, present) VALUES (?,?,?,?)",
+                                 [(sid, d, subj, int(p)) for sid, recs in good.items() for d, subj, p in recs])
+            self._db.executemany("UPDATE students SET att_present = att_present + ?, att_total = att_total + ? WHERE student_id=?",
+                                 [(sum(1 for r in recs if r[2]), len(recs), sid) for sid, recs in good.items()])
+        for sid, recs in good.items():
+            res.applied += len(recs)
+            s = self._live.get(sid)
+            if s is None: self._emit("updated", sid); continue
+            s._listener = None
+            try: s._append_attendance(recs)
+            finally: s._listener = self._on_student_change
+            super()._on_student_change(s, "attend_many", (recs,))
+        res.errors.sort(key=lambda e: e[0])
+        return res
+    def student_attendance_rate(self, sid: str, subject: Optional[str]=None) -> float:
+        if subject is None:
+            row = self._row("SELECT SUM(present), COUNT(*) FROM attendance WHERE student_id=?", (sid,))
+        else:
+            row = self._row("SELECT SUM(present), COUNT(*) FROM attendance WHERE student_id=? AND subject=?", (sid, subject.upper()))
+        return round(100.0 * row[0] / row[1], 2) if row[1] else 0.0
+    def daily_absences(self, start: Any=None, end: Any=None) -> Dict[str, int]:
+        # ISO dates sort as text, so the range is a scan of ix_attendance_date
+        lo, hi = _day_bound(start), _day_bound(end)
+        conds = ["date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"]; params: List[Any] = []
+        if lo is not None: conds.append("date >= ?"); params.append(datetime.date.fromordinal(lo).isoformat())
+        if hi is not None: conds.append("date <= ?"); params.append(datetime.date.fromordinal(hi).isoformat())
+        return {d: n for d, n in self._rows(
+            f"SELECT date, SUM(1 - present) FROM attendance WHERE {' AND '.join(conds)} GROUP BY date ORDER BY date", params)}
+    def attendance_rates_by_subject(self, sid: str) -> Dict[str, float]:
+        return {subj: round(100.0 * p / n, 2) for subj, p, n in self._rows(
+            "SELECT subject, SUM(present), COUNT(*) FROM attendance WHERE student_id=? GROUP BY subject", (sid,))}
+
+    # Listings and lookups
+    def list_students(self) -> List[Student]: return self._students_where()
+    def summaries(self, students: Optional[Iterable[Student]]=None) -> List[StudentSummary]:
+        if students is not None: return [s.summary() for s in students]
+        return [StudentSummary(*r) for r in self._rows(f"SELECT {_SUMMARY_COLS} FROM students ORDER BY seq")]
+    def __len__(self) -> int: return self._row("SELECT COUNT(*) FROM students")[0]
+    def page(self, start: int, count: int, order: str="insertion") -> List[StudentSummary]:
+        if order not in _PAGE_ORDERS: raise ValueError(f"Unknown order {order!r}")
+        return [StudentSummary(*r) for r in self._rows(
+            f"SELECT {_SUMMARY_COLS} FROM students ORDER BY {_PAGE_ORDERS[order]} LIMIT ? OFFSET ?", (max(0, count), max(0, start)))]
+    def sorted_by_name(self) -> List[Student]: return self._students_where(order="name_lc, seq")
+    def sorted_by_id(self) -> List[Student]: return self._students_where(order="student_id")
+    def students_in_id_range(self, lo: str, hi: str) -> List[Student]:
+        return self._students_where("student_id BETWEEN ? AND ?", (lo, hi), "student_id")
+    def students_with_id_prefix(self, prefix: str) -> List[Student]:
+        if not prefix: return self.sorted_by_id()
+        return self._students_where("student_id >= ? AND student_id < ?", (prefix, _prefix_end(prefix)), "student_id")
+    def snapshot(self) -> RegistrySnapshot:
+        return SQLiteSnapshot(self)
+    def _ids_with_prefix(self, prefix: str, limit: int) -> List[str]:
+        return [r[0] for r in self._rows("SELECT student_id FROM students WHERE student_id >= ? AND student_id < ? ORDER BY student_id LIMIT ?",
+                                               (prefix, _prefix_end(prefix), limit))]
+    def _summaries_of(self, sids: List[str]) -> List[StudentSummary]:
+        if not sids: return []
+        rows = {r[0]: StudentSummary(*r) for r in self._rows(
+            f"SELECT {_SUMMARY_COLS} FROM students WHERE student_id IN ({','.join('?' * len(sids))})", sids)}
+        return [rows[sid] for sid in sids if sid in rows]
+    def _name_index(self) -> NameIndex:
+        with self._db_lock:
+            if self._names is None: self._names = NameIndex(self._rows("SELECT student_id, name FROM students ORDER BY seq"))
+            return self._names
+    def sorted_by_gpa(self, descending: bool=True) -> List[Student]:
+        return self._students_where(order="gpa DESC, seq DESC" if descending else "gpa, seq")
+    def sorted_by(self, *keys: Any) -> List[Student]:
+        order = _sql_order(keys)
+        return super().sorted_by(*keys) if order is None else self._students_where(order=order)
+    def _sorted_records(self, keys: Sequence[Any], chunk_size: Optional[int]) -> Iterable[dict]:
+        # ordered in SQL and hydrated 500 at a time, so only the chunk being written is held
+        order = _sql_order(keys)
+        if order is None: return super()._sorted_records(keys, chunk_size)
+        ids = [r[0] for r in self._rows(f"SELECT student_id FROM students ORDER BY {order}")]
+        return (s.to_dict() for i in range(0, len(ids), 500) for s in self._hydrate(ids[i:i+500]))
+    def query(self, name: Optional[str]=None, department: Optional[str]=None, year: Optional[int]=None, gender: Optional[str]=None) -> List[Student]:
+        cols = {"name": "name_lc", "department": "department_lc", "year": "year", "gender": "gender"}
+        conds, params = [], []
+        for f, v in (("name",name),("department",department),("year",year),("gender",gender)):
+            if v is None: continue
+            conds.append(f"{cols[f]}=?"); params.append(_INDEXED_FIELDS[f](v))
+        return self._students_where(" AND ".join(conds), params)
+
+    # Persistence: every mutation is already committed; save/load keep their JSON roles
+    def save(self, path: str=DATA_FILE) -> None:
+        with self._db_lock: self._db.commit()
+    @_quiet
+    def load(self, path: str=DATA_FILE, progress: Optional[Callable[[int, int], None]]=None) -> None:
+        # first open against an empty database migrates an existing data.json/catalog.json
+        empty = self._row("SELECT COUNT(*) FROM students")[0] == 0
+        if empty and os.path.exists(path): self.migrate_from_json(path)
+        self._read_catalog()
+        if progress is not None: n = len(self); progress(n, n)
+    def migrate_from_json(self, data_path: str=DATA_FILE, catalog_path: str=CATALOG_FILE) -> int:
+        with open(data_path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        docs = json.loads(raw) if raw.strip() else []
+        students: List[Student] = []
+        for d in docs:
+            try: students.append(Student.from_dict(d))
+            except Exception: continue
+        cnt = self.import_students(students)
+        if os.path.exists(catalog_path):
+            with open(catalog_path, "r", encoding="utf-8") as f:
+                raw = f.read().strip()
+            for code, slot in (json.loads(raw) if raw else {}).items():
+                self.set_subject_slot(code, int(slot["start"]), int(slot["end"]), float(slot.get("weight", 1.0)))
+        return cnt
+    def _record(self, sid: str) -> dict:
+        return self.get_by_id(sid).to_dict()
+    def export_json(self, path: str=DATA_FILE) -> None:
+        StudentRegistry.save(self._as_memory(), path)
+    def _as_memory(self) -> StudentRegistry:
+        reg = StudentRegistry()
+        for s in self.list_students(): reg._students[s.student_id] = s
+        reg._subject_catalog = dict(self._subject_catalog)
+        return reg
+    def save_catalog(self, path: Optional[str]=None) -> None:
+        with self._db_lock: self._db.commit()
+    @_quiet
+    def load_catalog(self, path: str=CATALOG_FILE) -> None:
+        self._read_catalog()
+    def close(self) -> None:
+        self.stop_attendance_worker()
+        with self._rw.write(), self._db_lock: self._db.commit(); self._db.close()
+
+    # Subject catalog (mirrored in memory for the timetable optimizer)
+    def _read_catalog(self) -> None:
+        self._subject_catalog = {code: {"start": start, "end": end, "weight": weight}
+                                 for code, start, end, weight in self._rows('SELECT code, start, "end", weight FROM subject_slots ORDER BY rowid')}
+        self._catalog_changed()
+    def set_subject_slot(self, code: str, start_min: int, end_min: int, weight: float=1.0) -> None:
+        super().set_subject_slot(code, start_min, end_min, weight)
+        code = code.strip().upper()
+        with self._db_lock, self._db:
+            self._db.execute('INSERT INTO subject_slots (code, start, "end", weight) VALUES (?,?,?,?) ON CONFLICT(code) DO UPDATE SET start=excluded.start, "end"=excluded."end", weight=excluded.weight',
+                             (code, int(start_min), int(end_min), float(weight)))
+
+    # Timetables: enrollment sets straight from SQL, nothing is hydrated
+    def _enrollments(self, student_ids: Optional[Iterable[str]]) -> Iterator[Tuple[str, Iterable[str]]]:
+        sets: Dict[str, List[str]] = {}
+        if student_ids is None:
+            for (sid,) in self._rows("SELECT student_id FROM students ORDER BY seq"): sets[sid] = []
+            for sid, subj in self._rows("SELECT student_id, subject FROM enrollments ORDER BY student_id, position"): sets[sid].append(subj)
+            return iter(sets.items())
+        wanted = list(dict.fromkeys(student_ids))
+        for i in range(0, len(wanted), 500):
+            chunk = wanted[i:i+500]; marks = ",".join("?"*len(chunk))
+            for (sid,) in self._rows(f"SELECT student_id FROM students WHERE student_id IN ({marks})", chunk): sets[sid] = []
+            for sid, subj in self._rows(f"SELECT student_id, subject FROM enrollments WHERE student_id IN ({marks}) ORDER BY student_id, position", chunk): sets[sid].append(subj)
+        for sid in wanted:
+            if sid not in sets: raise ValueError(f"Student {sid} not found")
+        return ((sid, sets[sid]) for sid in wanted)
+
+    # Class Representatives: scores come from the maintained gpa/attendance columns,
+    # only the winners are hydrated
+    def choose_class_representatives(self, top_per_dept: int=1, alpha: float=0.7, beta: float=0.3) -> Dict[str, List[Tuple[Student, float]]]:
+        buckets: Dict[str, List[Tuple[str, float]]] = {}
+        for sid, dept, gpa, present, total in self._rows("SELECT student_id, department, gpa, att_present, att_total FROM students ORDER BY seq"):
+            rate = round(100.0 * present / total, 2) if total else 0.0
+            score = alpha * (gpa/4.0*100.0) + beta * rate
+            buckets.setdefault(dept or "-", []).append((sid, round(score, 2)))
+        chosen: Dict[str, List[Tuple[Student, float]]] = {}
+        k = max(1, int(top_per_dept))
+        for dept, lst in buckets.items():
+            chosen[dept] = [(self.get_by_id(sid), score) for sid, score in heapq.nlargest(k, lst, key=lambda t: t[1])]
+        return chosen
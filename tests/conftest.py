@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from student_records import Student, StudentRegistry  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # registries default to data.json / catalog.json in the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def make_registry():
+    # make_registry(n, cls=..., graded=..., **registry kwargs): students S000, S001, ... named "Name 000", ...
+    # (so name order is id order), years 1-4, all enrolled in MATH; graded adds one grade and one attendance mark
+    def make(n=20, cls=StudentRegistry, graded=False, **kw):
+        reg = cls(**kw)
+        for i in range(n):
+            sid = f"S{i:03d}"
+            reg.add_student(Student(sid, f"Name {i:03d}", "CS", "F", 1 + i % 4))
+            s = reg.get_by_id(sid)
+            s.enroll_subject("MATH")
+            if graded: s.add_grade("MATH", 50 + i % 50); s.record_attendance("2024-01-01", "MATH", True)
+        return reg
+    return make
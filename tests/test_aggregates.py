@@ -0,0 +1,45 @@
+import random
+
+from student_records import Student
+
+
+def _fresh_gpa(s):
+    avgs = [sum(v)/len(v) for v in s.grades.values() if len(v)]
+    return round((sum(avgs)/len(avgs)/100)*4, 2) if avgs else 0.0
+
+
+def _fresh_rate(s, subject=None):
+    rows = [p for _, subj, p in s.attendance_log.rows() if subject is None or subj == subject]
+    return round(100.0 * sum(rows) / len(rows), 2) if rows else 0.0
+
+
+def test_running_aggregates_match_a_fresh_recompute():
+    rng = random.Random(3)
+    s = Student("S1", "Ann", "CS", "F", 1)
+    for code in ("MATH", "PHYS", "CHEM"): s.enroll_subject(code)
+    for i in range(2000):
+        r = rng.random(); subj = rng.choice(("MATH", "PHYS", "CHEM"))
+        if r < 0.45: s.add_grade(subj, rng.choice((rng.randint(0, 100), rng.uniform(0, 100))))
+        elif r < 0.6 and not s.grade_history.is_empty(): s.undo_last_grade()
+        else: s.record_attendance(f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", subj, rng.random() < 0.7)
+        if i % 97 == 0:
+            assert s.gpa() == _fresh_gpa(s)
+            assert s.attendance_rate() == _fresh_rate(s)
+    assert s.gpa() == _fresh_gpa(s)
+    for subj in ("MATH", "PHYS", "CHEM", None): assert s.attendance_rate(subj) == _fresh_rate(s, subj)
+    assert s.attendance_rate("BIO") == 0.0
+
+
+def test_undo_to_empty_and_reload():
+    s = Student("S1", "Ann", "CS", "F", 1)
+    s.enroll_subject("MATH"); s.enroll_subject("PHYS")
+    s.add_grade("MATH", 80); s.add_grade("PHYS", 60); s.record_attendance("2024-01-01", "MATH", False)
+    assert s.gpa() == 2.8 and s.attendance_rate() == 0.0
+    s.undo_last_grade()
+    assert s.gpa() == 3.2
+    s.undo_last_grade()
+    assert s.gpa() == 0.0
+    s.add_grade("MATH", 90.5); s.record_attendance("2024-01-02", "MATH", True)
+    t = Student.from_dict(s.to_dict())
+    assert (t.gpa(), t.attendance_rate(), t.attendance_rate("math")) == (s.gpa(), s.attendance_rate(), 50.0)
+    assert "_grade_sum" not in s.to_dict() and "_att_total" not in s.to_dict()
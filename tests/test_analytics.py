@@ -0,0 +1,102 @@
+import math
+import random
+
+import pytest
+
+import student_records_analytics as analytics
+from student_records import Student, StudentRegistry
+from student_records_sqlite import SQLiteStudentRegistry
+
+
+def _fill(reg):
+    rng = random.Random(12)
+    for i in range(60):
+        reg.add_student(Student(f"S{i:03d}", f"Name {i}", rng.choice(("CS", "EE", "ME")), rng.choice("FM"), rng.randint(1, 4)))
+        s = reg.get_by_id(f"S{i:03d}")
+        for code in rng.sample(("MATH", "PHYS", "CHEM"), 2):
+            s.enroll_subject(code)
+            for _ in range(rng.randint(0, 3)): s.add_grade(code, rng.randint(20, 100))
+            for _ in range(rng.randint(0, 4)):
+                s.record_attendance(f"{rng.choice((2023, 2024))}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", code, rng.random() < 0.8)
+        if i % 10 == 0: s.record_attendance("week 3", code, True)  # not an ISO date, left out of per-year counts
+    return reg
+
+
+def _stats(vals):
+    n = len(vals); mean = sum(vals) / n
+    return n, mean, math.sqrt(sum((v - mean) ** 2 for v in vals) / n), min(vals), max(vals)
+
+
+def _pct(vals, q):
+    sv = sorted(vals); pos = (len(sv) - 1) * q / 100.0; lo = int(pos); hi = min(lo + 1, len(sv) - 1)
+    return sv[lo] + (sv[hi] - sv[lo]) * (pos - lo)
+
+
+def _close(got, want):
+    assert tuple(got) == pytest.approx(tuple(want), abs=1e-9)
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def use_numpy(request):
+    if request.param: pytest.importorskip("numpy")
+    return request.param
+
+
+def test_snapshot_aggregates_match_brute_force(use_numpy):
+    reg = _fill(StudentRegistry()); studs = reg.list_students()
+    snap = analytics.snapshot(reg, use_numpy=use_numpy)
+    assert snap.numpy == use_numpy and len(snap) == 60
+    by_dept = snap.group_by("department", "gpa")
+    for dept in ("CS", "EE", "ME"): _close(by_dept[dept], _stats([s.gpa() for s in studs if s.department == dept]))
+    _close(snap.group_by(None, "att_rate")["all"], _stats([100.0 * s._att_present / s._att_total if s._att_total else 0.0 for s in studs]))
+    scores = {}
+    for s in studs:
+        for code, vals in s.grades.items(): scores.setdefault(code, []).extend(vals)
+    for code, st in snap.subject_stats().items(): _close(st, _stats(scores[code]))
+    for code, qs in snap.subject_percentiles((0, 25, 50, 90, 100)).items():
+        assert qs == pytest.approx({q: _pct(scores[code], q) for q in (0, 25, 50, 90, 100)})
+    years = {}
+    for s in studs:
+        for date, _, present in s.attendance_log.rows():
+            if date[:4].isdigit(): c = years.setdefault(int(date[:4]), [0, 0]); c[0] += present; c[1] += 1
+    assert snap.attendance_by_year() == {y: (p, n, round(100.0 * p / n, 2)) for y, (p, n) in sorted(years.items())}
+    edges, counts = snap.histogram("gpa", bins=4, lo=0.0, hi=4.0, by="gender")
+    assert edges == [0.0, 1.0, 2.0, 3.0, 4.0]
+    for g, row in counts.items():
+        assert row == [sum(1 for s in studs if s.gender == g and (b <= s.gpa() < b + 1 or b == 3 and s.gpa() == 4.0)) for b in range(4)]
+
+
+def test_numpy_and_python_dashboards_agree():
+    pytest.importorskip("numpy")
+    reg = _fill(StudentRegistry())
+    fast = analytics.dashboard(reg, analytics.snapshot(reg, use_numpy=True))
+    slow = analytics.dashboard(reg, analytics.snapshot(reg, use_numpy=False))
+    assert fast.keys() == slow.keys() and fast["attendance_by_year"] == slow["attendance_by_year"]
+    assert fast["gpa_histogram"] == slow["gpa_histogram"]
+    for key in ("gpa_by_department", "gpa_by_year", "attendance_by_department", "subject_scores"):
+        assert fast[key].keys() == slow[key].keys()
+        for k in fast[key]: _close(fast[key][k], slow[key][k])
+
+
+def test_snapshot_is_reused_until_the_registry_changes(use_numpy):
+    reg = _fill(StudentRegistry())
+    snap = analytics.snapshot(reg, use_numpy=use_numpy)
+    assert analytics.snapshot(reg, use_numpy=use_numpy) is snap
+    reg.get_by_id("S001").add_grade(reg.get_by_id("S001").subjects.to_list()[0], 100)
+    again = analytics.snapshot(reg, use_numpy=use_numpy)
+    assert again is not snap and len(again.g_score) == len(snap.g_score) + 1
+
+
+def test_sqlite_snapshot_matches_memory(workdir, use_numpy):
+    mem = _fill(StudentRegistry()); sql = _fill(SQLiteStudentRegistry(db_path=str(workdir / "s.db")))
+    a = analytics.dashboard(mem, analytics.snapshot(mem, use_numpy=use_numpy))
+    b = analytics.dashboard(sql, analytics.snapshot(sql, use_numpy=use_numpy))
+    assert a["students"] == b["students"] and a["attendance_by_year"] == b["attendance_by_year"]
+    for k in a["subject_scores"]: _close(a["subject_scores"][k], b["subject_scores"][k])
+
+
+def test_bad_arguments():
+    snap = analytics.snapshot(_fill(StudentRegistry()))
+    with pytest.raises(ValueError, match="Unknown field"): snap.group_by("department", "height")
+    with pytest.raises(ValueError, match="Unknown group"): snap.group_by("name")
+    with pytest.raises(ValueError, match="0..100"): snap.percentiles(qs=(150,))
@@ -0,0 +1,54 @@
+import pytest
+
+from student_records import Student, StudentRegistry
+from student_records_sqlite import SQLiteStudentRegistry
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def reg(request, workdir):
+    r = StudentRegistry() if request.param == "memory" else SQLiteStudentRegistry(str(workdir / "ingest.db"))
+    for sid in ("A", "B"):
+        r.add_student(Student(sid, f"Name {sid}", "CS", "F", 1))
+        r.get_by_id(sid).enroll_subject("MATH")
+    yield r
+    if request.param == "sqlite": r.close()
+
+
+QUEUE = [("B", "2024-01-01", "ART", True), ("A", "2024-01-01", "MATH", True), ("X", "2024-01-01", "MATH", True),
+         ("A", "2024-01-02", "PHYS", False), ("B", "2024-01-02", "MATH", False), ("B", "2024-01-03", "CHEM", True)]
+
+
+def test_rejections_are_reported_in_input_order(reg):
+    res = reg.ingest_attendance(QUEUE)
+    assert res.applied == 2
+    assert res.errors == [(1, "B", "Not enrolled in ART."), (3, "X", "Unknown student"),
+                          (4, "A", "Not enrolled in PHYS."), (6, "B", "Not enrolled in CHEM.")]
+
+
+def test_process_attendance_warns_in_queue_order(reg, capsys):
+    for row in QUEUE: reg.enqueue_attendance(*row)
+    assert reg.process_attendance() == 2
+    assert capsys.readouterr().out.splitlines() == [
+        "[WARN] attendance failed for B: Not enrolled in ART.",
+        "[WARN] Unknown student X",
+        "[WARN] attendance failed for A: Not enrolled in PHYS.",
+        "[WARN] attendance failed for B: Not enrolled in CHEM.",
+    ]
+
+
+@pytest.mark.parametrize("header", ["Student_ID,Date,Subject,Present", "present,subject,SID,date", ""])
+def test_csv_header_is_found_by_its_names(reg, header):
+    cells = header.lower().replace("sid", "student_id").split(",") if header else ["student_id", "date", "subject", "present"]
+    rec = {"student_id": "A", "date": "2024-01-05", "subject": "math", "present": "1.0"}
+    lines = ([header] if header else []) + [",".join(rec[c] for c in cells)]
+    res = reg.ingest_attendance_csv(lines)
+    assert (res.applied, res.rejected) == (1, 0)
+    assert reg.get_by_id("A").attendance_rate("MATH") == 100.0
+
+
+def test_csv_present_values(reg):
+    values = ["0", "1", "0.0", "1.0", "true", "FALSE", "2.5", "maybe"]
+    res = reg.ingest_attendance_csv([f"A,2024-01-{i + 1:02d},MATH,{v}" for i, v in enumerate(values)])
+    assert res.applied == 6 and [n for n, *_ in res.errors] == [7, 8]
+    assert reg.get_by_id("A").attendance_rate() == 50.0
+    assert reg.ingest_attendance([("B", "2024-02-01", "MATH", 1.0), ("B", "2024-02-02", "MATH", 0.0)]).applied == 2
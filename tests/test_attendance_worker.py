@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from student_records import StudentRegistry
+
+
+def _close_within(reg, seconds=30):
+    t = threading.Thread(target=reg.close, daemon=True)
+    t.start(); t.join(seconds)
+    assert not t.is_alive(), "close() deadlocked"
+
+
+def test_close_drains_non_empty_queue(make_registry):
+    reg = make_registry(thread_safe=True)
+    w = reg.start_attendance_worker(batch_size=1)
+    for k in range(2000):
+        w.submit(f"S{k % 20:03d}", f"2024-01-{k % 28 + 1:02d}", "MATH", k % 3 != 0)
+    assert w.pending() > 0
+    _close_within(reg)
+    assert w.applied == 2000
+    assert sum(len(reg.get_by_id(f"S{i:03d}").attendance_log) for i in range(20)) == 2000
+
+
+def test_close_with_journal_compacts_queued_rows(workdir, make_registry):
+    make_registry().save()
+    reg = StudentRegistry(journal=True, thread_safe=True); reg.load()
+    w = reg.start_attendance_worker(batch_size=1)
+    for k in range(500):
+        w.submit("S000", f"2024-02-{k % 28 + 1:02d}", "MATH", True)
+    _close_within(reg)
+    again = StudentRegistry(); again.load()
+    assert len(again.get_by_id("S000").attendance_log) == 500
+
+
+def test_close_discards_when_not_flushing(make_registry):
+    reg = make_registry(thread_safe=True)
+    w = reg.start_attendance_worker(batch_size=1)
+    for k in range(200):
+        w.submit("S001", "2024-03-01", "MATH", True)
+    reg.stop_attendance_worker(flush=False)
+    _close_within(reg)
+    assert w.pending() == 0 and w.applied < 200
+
+
+def test_submit_after_stop_is_refused(make_registry):
+    reg = make_registry(thread_safe=True)
+    w = reg.start_attendance_worker()
+    reg.stop_attendance_worker()
+    with pytest.raises(RuntimeError):
+        w.submit("S000", "2024-01-01", "MATH", True)
+    w.flush()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_rows_left_by_a_dead_worker_are_rejected(make_registry, monkeypatch):
+    reg = make_registry(thread_safe=True)
+    def die(rows): raise SystemExit  # not caught by the worker: the thread ends with rows still queued
+    monkeypatch.setattr(reg, "ingest_attendance", die)
+    w = reg.start_attendance_worker(batch_size=1)
+    for _ in range(5): w.submit("S000", "2024-01-01", "MATH", True)
+    w._thread.join(5)
+    assert not w._thread.is_alive() and w.pending() == 4
+    w.stop()
+    flusher = threading.Thread(target=w.flush, daemon=True); flusher.start(); flusher.join(5)
+    assert not flusher.is_alive(), "flush() blocked on rows nobody will process"
+    assert w.rejected == 4 and w.errors[-1] == (0, "S000", "Attendance worker stopped")
+
+
+def test_full_queue_applies_back_pressure_with_timeout(make_registry, monkeypatch):
+    reg = make_registry(thread_safe=True)
+    release = threading.Event(); real = reg.ingest_attendance
+    def slow(rows): release.wait(10); return real(rows)
+    monkeypatch.setattr(reg, "ingest_attendance", slow)
+    w = reg.start_attendance_worker(batch_size=1, max_queue=1)
+    reg.enqueue_attendance("S000", "2024-01-01", "MATH", True)  # taken by the worker, which then waits
+    deadline = time.time() + 5
+    while w.pending() and time.time() < deadline: time.sleep(0.01)
+    reg.enqueue_attendance("S000", "2024-01-02", "MATH", True)  # fills the queue
+    t = time.perf_counter()
+    with pytest.raises(queue.Full):
+        reg.enqueue_attendance("S000", "2024-01-03", "MATH", True, timeout=0.05)
+    assert time.perf_counter() - t < 2
+    release.set()
+    _close_within(reg)
+    assert w.applied == 2
@@ -0,0 +1,116 @@
+import json
+import random
+import threading
+
+import pytest
+
+from student_records import Student, StudentRegistry
+from student_records_sqlite import SQLiteStudentRegistry
+
+DEPTS = ["CS", "EE", "ME", "BIO"]
+SUBJECTS = ["MATH", "PHYS", "CHEM", "ART", "HIST"]
+
+
+def _script(reg, capsys=None):
+    # the same operations, in the same order, against either backend
+    rnd = random.Random(11)
+    for code, start in zip(SUBJECTS, (540, 570, 600, 660, 700)):
+        reg.set_subject_slot(code, start, start + 60, 1.0 + SUBJECTS.index(code) / 4)
+    for i in range(60):
+        reg.add_student(Student(f"S{i:03d}", f"{rnd.choice(['Ann', 'Bob', 'Cy', 'Di'])} {rnd.choice(['Lee', 'Park', 'Hall'])} {i}",
+                                DEPTS[i % 4], "FM"[i % 2], 1 + i % 4))
+        s = reg.get_by_id(f"S{i:03d}")
+        for code in rnd.sample(SUBJECTS, 3): s.enroll_subject(code)
+        for code in list(s.subjects): s.add_grade(code, rnd.randint(40, 100))
+    reg.get_by_id("S005").undo_last_grade()
+    reg.get_by_id("S006").drop_subject(next(iter(reg.get_by_id("S006").subjects)))
+    reg.remove_student("S007")
+    rows = []
+    for k in range(300):
+        sid = f"S{rnd.randrange(62):03d}"
+        rows.append((sid, f"2024-01-{rnd.randrange(1, 29):02d}", rnd.choice(SUBJECTS), rnd.random() < 0.8))
+    result = reg.ingest_attendance(rows)
+    for sid, date, subj, present in rows[:20]:
+        reg.enqueue_attendance(sid, date, subj, present)
+    processed = reg.process_attendance()
+    return result, processed
+
+
+def _docs(reg):
+    # undoing a subject's only grade leaves an empty score list in memory; sqlite keeps one row per
+    # grade and has nothing to store for it (neither affects gpa)
+    docs = [s.to_dict() for s in reg.list_students()]
+    for d in docs: d["grades"] = {k: v for k, v in d["grades"].items() if v}
+    return docs
+
+
+@pytest.fixture
+def pair(workdir):
+    mem, sql = StudentRegistry(), SQLiteStudentRegistry(str(workdir / "parity.db"))
+    yield mem, sql
+    sql.close()
+
+
+def test_same_results_from_both_backends(pair, capsys):
+    mem, sql = pair
+    r_mem, p_mem = _script(mem); out_mem = capsys.readouterr().out
+    r_sql, p_sql = _script(sql); out_sql = capsys.readouterr().out
+    assert (r_mem.applied, r_mem.rejected, sorted(r_mem.errors)) == (r_sql.applied, r_sql.rejected, sorted(r_sql.errors))
+    assert p_mem == p_sql and out_mem == out_sql
+    assert mem.summaries() == sql.summaries()
+    assert _docs(mem) == _docs(sql)
+    assert [s.student_id for s in mem.sorted_by_name()] == [s.student_id for s in sql.sorted_by_name()]
+    assert [s.gpa() for s in mem.sorted_by_gpa()] == [s.gpa() for s in sql.sorted_by_gpa()]
+    keys = ("department", ("year", True), "name")
+    assert [s.student_id for s in mem.sorted_by(*keys)] == [s.student_id for s in sql.sorted_by(*keys)]
+    assert [s.student_id for s in mem.sorted_by((Student.gpa, True))] == [s.student_id for s in sql.sorted_by((Student.gpa, True))]
+    mem.export_sorted("mem.json", "gender", ("gpa", True)); sql.export_sorted("sql.json", "gender", ("gpa", True))
+    exported = lambda path: [{**d, "grades": {k: v for k, v in d["grades"].items() if v}} for d in json.load(open(path))]
+    assert exported("mem.json") == exported("sql.json")
+    assert [s.student_id for s in mem.students_with_id_prefix("S01")] == [s.student_id for s in sql.students_with_id_prefix("S01")]
+    assert {s.student_id for s in mem.query(department="EE", year=2)} == {s.student_id for s in sql.query(department="EE", year=2)}
+    assert mem.daily_absences() == sql.daily_absences()
+    assert mem.daily_absences("2024-01-05", "2024-01-10") == sql.daily_absences("2024-01-05", "2024-01-10")
+    assert [sm.student_id for sm in mem.search("ann lee")] == [sm.student_id for sm in sql.search("ann lee")]
+    for sid in ("S000", "S011", "S042"):
+        assert mem.get_by_id(sid).attendance_rate() == sql.student_attendance_rate(sid)
+        assert mem.optimize_timetable_for(sid) == sql.optimize_timetable_for(sid)
+    reps = lambda reg: {d: [(s.student_id, round(sc, 9)) for s, sc in v] for d, v in reg.choose_class_representatives(2).items()}
+    assert reps(mem) == reps(sql)
+    assert mem.get_by_id("S007") is None and sql.get_by_id("S007") is None
+
+
+def test_sqlite_reopen_matches_memory(workdir, capsys):
+    mem, sql = StudentRegistry(), SQLiteStudentRegistry(str(workdir / "reopen.db"))
+    _script(mem); _script(sql); sql.close()
+    again = SQLiteStudentRegistry(str(workdir / "reopen.db"))
+    try:
+        assert _docs(mem) == _docs(again)
+        assert mem.summaries() == again.summaries()
+    finally:
+        again.close()
+
+
+def test_removed_student_is_detached(pair):
+    for reg in pair:
+        reg.add_student(Student("R1", "Gone", "CS", "F", 1))
+        s = reg.get_by_id("R1")
+        reg.remove_student("R1")
+        assert s._listener is None and s._before is None
+
+
+def test_sqlite_reads_share_the_read_lock(workdir, make_registry):
+    sql = make_registry(30, cls=SQLiteStudentRegistry, db_path=str(workdir / "rw.db"), thread_safe=True)
+    out = []
+    try:
+        with sql._rw.read():  # a write-locked read would wait for this to be released
+            t = threading.Thread(target=lambda: out.append((len(sql.sorted_by_name()), len(sql.page(0, 10, "gpa")))))
+            t.start(); t.join(5)
+            assert out == [(30, 10)]
+            w = threading.Thread(target=sql.add_student, args=(Student("W1", "Writer", "CS", "F", 1),))
+            w.start(); w.join(0.2)
+            assert w.is_alive()  # writers still wait for readers
+        w.join(5)
+        assert sql.get_by_id("W1") is not None
+    finally:
+        sql.close()
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import student_records_bench as bench
+from student_records import StudentRegistry
+
+_SMALL = bench.DatasetSpec(students=30, subjects=3, grades=2, days=4, catalog=10, seed=5)
+
+
+def test_generator_is_deterministic_and_loadable(workdir):
+    assert list(bench.generate_records(_SMALL)) == list(bench.generate_records(_SMALL))
+    assert list(bench.generate_records(_SMALL)) != list(bench.generate_records(bench.DatasetSpec(30, 3, 2, 4, 10, seed=6)))
+    assert bench.write_dataset(_SMALL) == (workdir / "data.json").stat().st_size
+    reg = StudentRegistry(); reg.load(); reg.load_catalog()
+    assert len(reg) == 30 and len(reg._subject_catalog) == 10
+    s = reg.get_by_id("S0000007")
+    assert len(s.subjects) == 3 and all(len(v) == 2 for v in s.grades.values()) and len(s.attendance_log) == 12
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_run_reports_every_op(backend):
+    res = bench.run(_SMALL, backend, repeat=1, queries=3, memory=False)
+    assert res["spec"] == bench.asdict(_SMALL) and res["meta"]["backend"] == backend
+    ops = [r["op"] for r in res["results"]]
+    assert ops and len(ops) == len(set(ops))
+    assert all(r["calls"] >= 1 and r["p50_ms"] >= 0 and r["peak_kib"] is None for r in res["results"])
+    with pytest.raises(ValueError, match="Unknown backend"): bench.run(_SMALL, "csv")
+
+
+def test_compare_flags_regressions():
+    old = {"spec": {}, "results": [{"op": "a", "p50_ms": 1.0}, {"op": "b", "p50_ms": 2.0}, {"op": "c", "p50_ms": 0.0}]}
+    new = {"spec": {}, "results": [{"op": "a", "p50_ms": 1.1}, {"op": "b", "p50_ms": 3.0}, {"op": "c", "p50_ms": 1.0}, {"op": "d", "p50_ms": 1.0}]}
+    rows = bench.compare(old, new)
+    assert [(r["op"], r["regressed"]) for r in rows] == [("a", False), ("b", True)]
+    assert bench.compare(old, new, threshold=2.0)[1]["regressed"] is False
+
+
+def test_cli(workdir, capsys):
+    args = ["--students", "20", "--subjects", "2", "--grades", "1", "--days", "2", "--catalog", "5", "--repeat", "1", "--queries", "2"]
+    assert bench.main(args + ["--generate", "gen"]) == 0
+    assert len(json.loads((workdir / "gen" / "data.json").read_text())) == 20
+    assert bench.main(args + ["--no-memory", "--out", "run.json"]) == 0
+    out = capsys.readouterr().out
+    assert "p50_ms" in out and json.loads((workdir / "run.json").read_text())["spec"]["students"] == 20
+    fast = json.loads((workdir / "run.json").read_text())
+    for r in fast["results"]: r["p50_ms"] = 1e-9
+    (workdir / "fast.json").write_text(json.dumps(fast))
+    assert bench.main(args + ["--no-memory", "--compare", "fast.json"]) == 1
+    with pytest.raises(SystemExit): bench.main(["--students", "-1"])
@@ -0,0 +1,71 @@
+import random
+import threading
+import time
+
+
+
+def _delay_listener(s, seconds):
+    # widens the window between a log append and the registry hearing about it
+    inner = s._listener
+    def slow(*a):
+        time.sleep(seconds); inner(*a)
+    s._listener = slow
+
+
+def test_first_daily_absences_does_not_double_count(make_registry):
+    reg = make_registry(3, thread_safe=True)
+    s = reg.get_by_id("S001")
+    _delay_listener(s, 0.3)
+    t = threading.Thread(target=s.record_attendance, args=("2024-01-01", "MATH", False))
+    t.start(); time.sleep(0.1)
+    first = reg.daily_absences()
+    t.join()
+    assert first in ({}, {"2024-01-01": 1})
+    assert reg.daily_absences() == {"2024-01-01": 1}
+
+
+def test_daily_absences_matches_logs_under_concurrent_writes(make_registry):
+    reg = make_registry(50, thread_safe=True)
+    stop = threading.Event()
+    def writer(seed):
+        rnd = random.Random(seed)
+        while not stop.is_set():
+            s = reg.get_by_id(f"S{rnd.randrange(50):03d}")
+            s.record_attendance(f"2024-01-{rnd.randrange(1, 29):02d}", "MATH", rnd.random() < 0.7)
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in threads: t.start()
+    try:
+        for _ in range(20):
+            reg._daily = None  # force a rebuild racing the writers
+            reg.daily_absences()
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    expected = {}
+    for s in reg.list_students():
+        for date, _subj, present in s.attendance_log.rows():
+            expected[date] = expected.get(date, 0) + (not present)
+    assert reg.daily_absences() == expected
+
+
+def test_sorted_views_track_concurrent_grades(make_registry):
+    reg = make_registry(60, thread_safe=True)
+    assert len(reg.page(0, 60, order="gpa")) == 60
+    stop = threading.Event()
+    def writer(seed):
+        rnd = random.Random(seed)
+        while not stop.is_set():
+            reg.get_by_id(f"S{rnd.randrange(60):03d}").add_grade("MATH", rnd.randint(0, 100))
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in threads: t.start()
+    try:
+        for _ in range(50):
+            rows = reg.page(0, 60, order="name")
+            assert [r.student_id for r in rows] == [f"S{i:03d}" for i in range(60)]
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    by_gpa = [r.student_id for r in reg.page(0, 60, order="gpa")]
+    gpas = {s.student_id: s.gpa() for s in reg.list_students()}
+    assert [gpas[sid] for sid in by_gpa] == sorted(gpas.values(), reverse=True)
+    assert sorted(by_gpa) == sorted(gpas)
@@ -0,0 +1,67 @@
+import pytest
+
+from student_records import StudentRegistry
+
+
+def test_corrupt_indexed_file_is_quarantined_before_reset(make_registry, workdir, capsys):
+    make_registry(5).save_indexed("idx.bin")
+    (workdir / "bad.bin").write_bytes(b'{"format": "student-records-indexed/1", "index": [["S1", 0, 99')
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    reg.load_indexed("bad.bin")
+    assert "[WARN] bad.bin is corrupt" in capsys.readouterr().out
+    assert (workdir / "bad.bin.corrupt").exists() and not (workdir / "bad.bin").exists()
+    assert len(reg) == 0 and reg._mm is None
+
+
+def test_truncated_indexed_file_is_rejected(make_registry, workdir):
+    make_registry(5, graded=True).save_indexed("idx.bin")
+    raw = (workdir / "idx.bin").read_bytes()
+    (workdir / "idx.bin").write_bytes(raw[:-40])
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    assert len(reg) == 0 and (workdir / "idx.bin.corrupt").read_bytes() == raw[:-40]
+
+
+def test_missing_indexed_file_leaves_the_registry_alone(make_registry):
+    reg = make_registry(5)
+    with pytest.raises(FileNotFoundError):
+        reg.load_indexed("nope.bin")
+    assert len(reg) == 5 and reg.get_by_id("S003") is not None
+
+
+def test_corrupt_shard_is_skipped_without_half_loading(make_registry, workdir, capsys):
+    src = make_registry(40, graded=True)
+    src.save_shards("d", shards=4)
+    (workdir / "d" / "shard-0002.json").write_text("[{")
+    reg = make_registry(3)
+    reg.load_shards("d")
+    assert "skipping corrupt shard" in capsys.readouterr().out
+    assert sorted(reg._students) == sorted(sid for sid in src._students if src._shard_for(sid) != 2)
+    assert (workdir / "d" / "shard-0002.json.corrupt").exists()
+
+
+def test_indexed_load_is_lazy(make_registry):
+    src = make_registry(10, graded=True); src.save_indexed("idx.bin")
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    assert len(reg._pending) == 10 and all(s is None for s in reg._students.values())
+    # table rows and id scans come from the header without decoding anything
+    assert reg.summaries() == src.summaries()
+    assert [sm.student_id for sm in reg.page(3, 4)] == ["S003", "S004", "S005", "S006"]
+    assert len(reg._pending) == 10
+    s = reg.get_by_id("S007")
+    assert s.to_dict() == src.get_by_id("S007").to_dict()
+    assert "S007" not in reg._pending and len(reg._pending) == 9 and reg.get_by_id("S007") is s
+    assert [x.student_id for x in reg.students_in_id_range("S006", "S008")] == ["S006", "S007", "S008"]
+    assert len(reg._pending) == 7
+
+
+def test_save_indexed_over_the_mapped_file(make_registry):
+    src = make_registry(6, graded=True); src.save_indexed("idx.bin")
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    s = reg.get_by_id("S002"); s.add_grade("MATH", 100)
+    reg.save_indexed("idx.bin")
+    # still-pending records point at their new offsets in the rewritten file
+    assert len(reg._pending) == 5
+    assert [reg.get_by_id(sid).to_dict() for sid in ("S000", "S005")] == [src.get_by_id(sid).to_dict() for sid in ("S000", "S005")]
+    again = StudentRegistry(); again.load_indexed("idx.bin")
+    assert again.get_by_id("S002").to_dict() == s.to_dict()
+    assert again.summaries()[2].gpa == s.gpa()
@@ -0,0 +1,43 @@
+import random
+
+from student_records import IntervalIndex, StudentRegistry
+
+
+def _intervals(n=200, seed=2):
+    rng = random.Random(seed); out = []
+    for i in range(n):
+        s = rng.randrange(0, 1440, 5); out.append((s, s + rng.choice((5, 30, 45, 60, 90, 240)), f"C{i:03d}"))
+    return out
+
+
+def test_point_and_window_queries_match_brute_force():
+    items = _intervals(); idx = IntervalIndex(items)
+    assert len(idx) == len(items)
+    for t in list(range(0, 1700, 7)) + [s for s, _, _ in items[:40]] + [e for _, e, _ in items[:40]]:
+        assert sorted(idx.at(t)) == sorted(k for s, e, k in items if s <= t < e), t
+    rng = random.Random(5)
+    for _ in range(300):
+        a = rng.randrange(0, 1500); b = a + rng.randrange(1, 200)
+        assert sorted(idx.overlapping(a, b)) == sorted(k for s, e, k in items if s < b and a < e), (a, b)
+    assert IntervalIndex().at(10) == [] and IntervalIndex().overlapping(0, 100) == []
+
+
+def test_registry_slot_queries():
+    reg = StudentRegistry(); items = _intervals(40, seed=8)
+    for s, e, code in items: reg.set_subject_slot(code, s, e)
+    for t in range(0, 1440, 13):
+        assert reg.subjects_at(t) == sorted(k for s, e, k in items if s <= t < e)
+    assert reg.subjects_in_window(600, 660) == sorted(k for s, e, k in items if s < 660 and 600 < e)
+    graph = reg.conflict_graph()
+    for s, e, code in items:
+        want = sorted(k for s2, e2, k in items if k != code and s2 < e and s < e2)
+        assert sorted(graph[code]) == want and reg.subjects_overlapping(code.lower()) == want
+    assert reg.subjects_overlapping("NOPE") == []
+
+
+def test_slot_changes_rebuild_the_index():
+    reg = StudentRegistry()
+    reg.set_subject_slot("MATH", 540, 600); reg.set_subject_slot("PHYS", 600, 660)
+    assert reg.subjects_at(600) == ["PHYS"] and reg.subjects_overlapping("MATH") == []
+    reg.set_subject_slot("PHYS", 570, 630)
+    assert reg.subjects_at(580) == ["MATH", "PHYS"] and reg.subjects_overlapping("MATH") == ["PHYS"]
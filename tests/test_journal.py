@@ -0,0 +1,148 @@
+import json
+import os
+
+import pytest
+
+import student_records
+from student_records import Student, StudentRegistry
+
+
+@pytest.fixture
+def seeded(make_registry):
+    # data.json with three students, for journal-mode registries to load
+    make_registry(3).save()
+
+
+def _open(compact_every=1000):
+    reg = StudentRegistry(journal=True, compact_every=compact_every); reg.load()
+    return reg
+
+
+def _state(reg):
+    return [s.to_dict() for s in reg.list_students()], dict(reg._subject_catalog)
+
+
+def _journal_lines(workdir):
+    return (workdir / "data.json.journal").read_bytes().splitlines(keepends=True)
+
+
+def test_crash_replay_restores_unsaved_mutations(seeded, workdir):
+    reg = _open()
+    reg.get_by_id("S000").add_grade("MATH", 90)
+    reg.get_by_id("S001").record_attendance("2024-01-01", "MATH", False)
+    reg.add_student(Student("S9", "Late", "EE", "M", 2))
+    reg.remove_student("S002")
+    reg.set_subject_slot("MATH", 540, 600)
+    expected = _state(reg)
+    # no save() or close(): the journal is all that survives
+    assert _state(_open()) == expected
+
+
+def test_torn_tail_is_dropped_and_truncated(seeded, workdir):
+    reg = _open()
+    reg.get_by_id("S000").add_grade("MATH", 80)
+    expected = _state(reg)
+    reg.get_by_id("S000").add_grade("MATH", 70)
+    lines = _journal_lines(workdir)
+    torn = b"".join(lines[:-1]) + lines[-1][: len(lines[-1]) // 2]
+    (workdir / "data.json.journal").write_bytes(torn)
+    again = _open()
+    assert _state(again) == expected
+    assert _journal_lines(workdir) == lines[:-1]
+
+
+def test_garbage_line_stops_replay(seeded, workdir, capsys):
+    reg = _open()
+    reg.get_by_id("S000").add_grade("MATH", 80)
+    expected = _state(reg)
+    with open(workdir / "data.json.journal", "ab") as f:
+        f.write(b"{not json\n" + json.dumps(["grade", "S000", "MATH", 10]).encode() + b"\n")
+    kept = (workdir / "data.json.journal").read_bytes()
+    assert _state(_open()) == expected
+    assert "corrupt at line" in capsys.readouterr().out
+    assert (workdir / "data.json.journal.stale").read_bytes() == kept
+
+
+def test_rejected_replay_records_are_logged(seeded, workdir, capsys):
+    _open()
+    with open(workdir / "data.json.journal", "ab") as f:
+        f.write(json.dumps(["grade", "S404", "MATH", 10]).encode() + b"\n")
+        f.write(json.dumps(["grade", "S000", "ART", 10]).encode() + b"\n")
+    _open()
+    out = capsys.readouterr().out
+    assert "[WARN] journal grade rejected: Unknown student S404" in out
+    assert "[WARN] journal grade rejected for S000" in out
+
+
+def test_journal_from_older_snapshot_is_moved_aside(seeded, workdir, capsys):
+    reg = _open()
+    reg.get_by_id("S000").add_grade("MATH", 80)
+    stale = (workdir / "data.json.journal").read_bytes()
+    reg.compact()
+    expected = _state(reg)
+    (workdir / "data.json.journal").write_bytes(stale)
+    assert _state(_open()) == expected
+    assert "[WARN] journal data.json.journal does not extend data.json" in capsys.readouterr().out
+    assert (workdir / "data.json.journal.stale").read_bytes() == stale
+    assert len(_journal_lines(workdir)) == 1
+
+
+def test_compaction_folds_journal_into_data_file(seeded, workdir):
+    reg = _open(compact_every=5)
+    for score in range(10, 80, 10):
+        reg.get_by_id("S001").add_grade("MATH", score)
+    reg.set_subject_slot("MATH", 540, 600)
+    expected = _state(reg)
+    assert len(_journal_lines(workdir)) < 7
+    reg.close()
+    assert len(_journal_lines(workdir)) == 1
+    assert json.loads((workdir / "catalog.json").read_text())["MATH"]["start"] == 540
+    assert _state(_open()) == expected
+
+
+def test_crash_right_after_data_write_loses_nothing(seeded, workdir, monkeypatch):
+    reg = _open()
+    reg.set_subject_slot("ART", 600, 660)
+    reg.get_by_id("S000").add_grade("MATH", 55)
+    expected = _state(reg)
+    real = student_records._atomic_write
+    def crash_after_data(path, data):
+        real(path, data)
+        if os.path.basename(path) == "data.json": raise SystemExit("crash")
+    monkeypatch.setattr(student_records, "_atomic_write", crash_after_data)
+    with pytest.raises(SystemExit):
+        reg.compact()
+    monkeypatch.setattr(student_records, "_atomic_write", real)
+    assert _state(_open()) == expected
+
+
+def test_failed_catalog_write_aborts_compaction(seeded, workdir, monkeypatch, capsys):
+    reg = _open(compact_every=3)
+    data_before = (workdir / "data.json").read_bytes()
+    real = StudentRegistry._write_catalog
+    def fail(self, path): raise OSError("disk full")
+    monkeypatch.setattr(StudentRegistry, "_write_catalog", fail)
+    reg.set_subject_slot("ART", 600, 660)
+    reg.get_by_id("S000").add_grade("MATH", 55)
+    reg.get_by_id("S001").add_grade("MATH", 65)  # reaches compact_every: compaction fails, journal kept
+    assert "compaction failed" in capsys.readouterr().out
+    with pytest.raises(OSError):
+        reg.compact()
+    assert (workdir / "data.json").read_bytes() == data_before
+    reg.get_by_id("S002").add_grade("MATH", 75)  # still journaled after the failure
+    expected = _state(reg)
+    monkeypatch.setattr(StudentRegistry, "_write_catalog", real)
+    assert _state(_open()) == expected
+
+
+def test_catalog_goes_back_to_the_file_it_was_loaded_from(seeded, workdir):
+    reg = _open()
+    (workdir / "term").mkdir()
+    reg.load_catalog(str(workdir / "term" / "catalog.json"))
+    reg.set_subject_slot("ART", 600, 660)
+    reg.save()  # journal mode: the journal is synced and the catalog written
+    assert json.loads((workdir / "term" / "catalog.json").read_text())["ART"]["start"] == 600
+    reg.set_subject_slot("ART", 700, 760)
+    reg.compact()
+    assert json.loads((workdir / "term" / "catalog.json").read_text())["ART"]["start"] == 700
+    assert json.loads((workdir / "catalog.json").read_text()) == {}
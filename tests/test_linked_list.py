@@ -0,0 +1,30 @@
+import pytest
+
+from student_records import SinglyLinkedList
+
+
+def test_membership_tracks_duplicates_and_removal():
+    ll = SinglyLinkedList(["MATH", "PHYS", "MATH"])
+    assert "MATH" in ll and "PHYS" in ll and "CHEM" not in ll
+    assert ll.remove("MATH") and "MATH" in ll
+    assert ll.remove("MATH") and "MATH" not in ll
+    assert not ll.remove("MATH")
+    assert ll.to_list() == ["PHYS"] and len(ll) == 1
+
+
+def test_tail_survives_removing_the_last_node():
+    ll = SinglyLinkedList([1, 2, 3])
+    assert ll.remove(3)
+    ll.append(4)
+    assert ll.to_list() == [1, 2, 4] and 3 not in ll and 4 in ll
+    assert ll.remove(1) and ll.remove(2) and ll.remove(4)
+    ll.append(5)
+    assert ll.to_list() == [5] and len(ll) == 1
+
+
+def test_enrollment_membership(make_registry):
+    s = make_registry(1).get_by_id("S000")
+    assert "MATH" in s.subjects
+    s.drop_subject("MATH")
+    assert "MATH" not in s.subjects
+    with pytest.raises(ValueError, match="not found"): s.drop_subject("MATH")
@@ -0,0 +1,58 @@
+from student_records import Student
+
+
+def _count(m, op):
+    return m.stats().get(op, {}).get("count", 0)
+
+
+def test_student_calls_go_to_their_own_registry(make_registry):
+    a, b = make_registry(1), make_registry(1)
+    ma, mb = a.enable_metrics(), b.enable_metrics()
+    a.get_by_id("S000").add_grade("MATH", 90)
+    b.get_by_id("S000").add_grade("MATH", 80); b.get_by_id("S000").add_grade("MATH", 70)
+    loose = Student("L1", "Loose", "CS", "F", 1); loose.enroll_subject("MATH"); loose.add_grade("MATH", 50)
+    assert _count(ma, "Student.add_grade") == 1
+    assert _count(mb, "Student.add_grade") == 2
+    a.disable_metrics(); b.disable_metrics()
+
+
+def test_disabling_one_registry_keeps_the_other_recording(make_registry):
+    a, b = make_registry(1), make_registry(1)
+    a.enable_metrics(); mb = b.enable_metrics()
+    a.disable_metrics()
+    b.get_by_id("S000").add_grade("MATH", 80)
+    a.get_by_id("S000").add_grade("MATH", 90)
+    assert _count(mb, "Student.add_grade") == 1
+    b.disable_metrics()
+    assert not hasattr(Student.__dict__["add_grade"], "_metered")
+
+
+def test_removed_student_is_no_longer_recorded(make_registry):
+    a = make_registry(1); m = a.enable_metrics()
+    s = a.get_by_id("S000"); a.remove_student("S000")
+    s.add_grade("MATH", 90)
+    assert _count(m, "Student.add_grade") == 0
+    a.disable_metrics()
+
+
+def test_attendance_batches_count_rows_and_rejections(make_registry):
+    reg = make_registry(2); m = reg.enable_metrics()
+    reg.enqueue_attendance("S000", "2024-01-01", "MATH", True)
+    reg.enqueue_attendance("S001", "2024-01-01", "ART", True)
+    reg.enqueue_attendance("S404", "2024-01-01", "MATH", False)
+    assert reg.process_attendance() == 1
+    st = m.stats()["process_attendance"]
+    assert (st["items"], st["rejected"]) == (3, 2)
+    assert 'student_records_op_rejected_total{op="process_attendance"} 2' in m.to_prometheus()
+    reg.disable_metrics()
+
+
+def test_only_students_of_metered_registries_are_wrapped(make_registry):
+    a, b = make_registry(2), make_registry(2)
+    a.enable_metrics()
+    assert type(a.get_by_id("S000")) is not Student and type(b.get_by_id("S000")) is Student
+    assert repr(a.get_by_id("S000")).startswith("Student(")
+    s = a.get_by_id("S001"); a.remove_student("S001")
+    assert type(s) is Student
+    a.disable_metrics()
+    assert type(a.get_by_id("S000")) is Student
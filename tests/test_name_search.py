@@ -0,0 +1,56 @@
+import random
+
+from student_records import NameIndex, Student, StudentRegistry, _norm_name, _trigrams
+
+_FIRST = ("Anna", "Annabel", "Bob", "Roberta", "Chen", "Cheng", "Dana", "Daniel", "Eve", "Evelyn")
+_LAST = ("Smith", "Smythe", "Jones", "Johnson", "Li", "Lin", "Garcia", "Garcias", "O'Neil", "Brown")
+
+
+def _names(n=300, seed=6):
+    rng = random.Random(seed)
+    return {f"S{i:03d}": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}" for i in range(n)}
+
+
+def _brute(names, query, min_score=0.4):
+    # every match with its score, ranked as search() documents: score, then closeness in length, then name
+    q = _norm_name(query); qw = q.split(); grams = _trigrams(f" {q}"); scores = {}
+    for k, raw in names.items():
+        n = _norm_name(raw)
+        if all(any(w.startswith(x) for w in n.split()) for x in qw): scores[k] = 2.0 if n.startswith(q) else 1.5
+        else:
+            share = len(grams & _trigrams(f" {n} ")) / len(grams)
+            if share >= min_score: scores[k] = share
+    return sorted(scores.items(), key=lambda kv: (-kv[1], abs(len(_norm_name(names[kv[0]])) - len(q)), _norm_name(names[kv[0]]), kv[0]))
+
+
+def test_search_ranks_like_brute_force():
+    names = _names(); idx = NameIndex(names.items())
+    for query in ("anna", "Dan smi", "smyth", "Jonsen", "garcai", "cheng li", "o'ne", "evlyn brwn", "zz"):
+        assert idx.search(query, limit=1000) == _brute(names, query), query
+    assert [k for k, _ in idx.search("Eve", limit=3)] == [k for k, _ in _brute(names, "Eve")[:3]]
+
+
+def test_incremental_updates_match_a_fresh_build():
+    names = _names(120); idx = NameIndex(names.items()); rng = random.Random(1)
+    for sid in rng.sample(sorted(names), 40): idx.remove(sid); del names[sid]
+    for i in range(30):
+        names[f"N{i:03d}"] = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"; idx.add(f"N{i:03d}", names[f"N{i:03d}"])
+    idx.add("S999", "Zed Zero"); idx.add("S999", "Anna Zed"); names["S999"] = "Anna Zed"
+    fresh = NameIndex(names.items())
+    assert len(idx) == len(fresh) == len(names)
+    assert idx._words == fresh._words and idx._grams.keys() == fresh._grams.keys()
+    for query in ("anna", "zed", "zero", "smi jo", "chenk"):
+        assert idx.search(query, limit=500) == fresh.search(query, limit=500)
+    assert idx.search("zero", min_score=0.9) == []
+
+
+def test_registry_search_puts_id_prefixes_first(make_registry):
+    reg = make_registry(30)
+    reg.add_student(Student("X01", "Name 001 Junior", "CS", "M", 2))
+    assert [sm.student_id for sm in reg.search("s01")][:10] == [f"S01{i}" for i in range(10)]
+    hits = [sm.student_id for sm in reg.search("S00", limit=12)]
+    assert hits[:10] == [f"S00{i}" for i in range(10)]
+    assert [sm.student_id for sm in reg.search("name 001")][:2] == ["S001", "X01"]
+    reg.remove_student("X01")
+    assert "X01" not in [sm.student_id for sm in reg.search("junior")]
+    assert reg.search("  ") == [] and reg.search("S0", limit=0) == []
@@ -0,0 +1,41 @@
+from student_records import Student, StudentRegistry
+
+
+def test_mutations_emit_events(make_registry):
+    reg = make_registry(3); events = []
+    cb = reg.subscribe(lambda ev, key: events.append((ev, key)))
+    reg.add_student(Student("X1", "Ann", "CS", "F", 1))
+    s = reg.get_by_id("S001"); s.add_grade("MATH", 70); s.record_attendance("2024-01-02", "MATH", True)
+    reg.remove_student("S002")
+    reg.set_subject_slot("math", 540, 600)
+    assert events == [("added", "X1"), ("updated", "S001"), ("updated", "S001"), ("removed", "S002"), ("slot", "MATH")]
+    reg.unsubscribe(cb); reg.unsubscribe(cb)
+    reg.remove_student("X1")
+    assert len(events) == 5
+
+
+def test_loads_emit_a_single_reset(make_registry):
+    make_registry(5).save()
+    reg = StudentRegistry(); events = []
+    reg.subscribe(lambda ev, key: events.append((ev, key)))
+    reg.load()
+    assert events == [("reset", None)]
+    reg.get_by_id("S000").add_grade("MATH", 90)
+    assert events[-1] == ("updated", "S000")
+
+
+def test_removed_students_stop_notifying(make_registry):
+    reg = make_registry(2); events = []
+    reg.subscribe(lambda ev, key: events.append(ev))
+    s = reg.get_by_id("S000"); reg.remove_student("S000")
+    s.add_grade("MATH", 50)
+    assert events == ["removed"]
+
+
+def test_failing_subscriber_is_reported_and_others_still_run(make_registry, capsys):
+    reg = make_registry(1); seen = []
+    reg.subscribe(lambda ev, key: 1 / 0)
+    reg.subscribe(lambda ev, key: seen.append(ev))
+    reg.get_by_id("S000").enroll_subject("PHYS")
+    assert seen == ["updated"]
+    assert "[WARN] change subscriber failed on updated" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from student_records import Student, StudentRegistry
+
+
+def _registry(n=53):
+    rng = random.Random(11); reg = StudentRegistry()
+    for i in rng.sample(range(n), n):
+        s = Student(f"S{i:03d}", rng.choice(("ann", "Bob", "Cy", "dee")), "CS", "F", 1 + i % 4)
+        reg.add_student(s); s.enroll_subject("MATH"); s.add_grade("MATH", rng.choice((40, 60, 80)))
+    return reg
+
+
+def _expected(reg, order):
+    rows = list(enumerate(reg.summaries()))
+    if order == "id": rows.sort(key=lambda r: r[1].student_id)
+    elif order == "name": rows.sort(key=lambda r: (r[1].name.lower(), r[0]))
+    elif order == "gpa": rows.sort(key=lambda r: (r[1].gpa, r[0]), reverse=True)
+    return [sm for _, sm in rows]
+
+
+@pytest.mark.parametrize("order", ["insertion", "id", "name", "gpa"])
+def test_pages_tile_the_full_order(order):
+    reg = _registry(); want = _expected(reg, order)
+    got = [sm for start in range(0, len(reg), 7) for sm in reg.page(start, 7, order)]
+    assert got == want
+    assert reg.page(50, 10, order) == want[50:] and reg.page(53, 10, order) == [] and reg.page(0, 0, order) == []
+
+
+def test_pages_follow_mutations():
+    reg = _registry()
+    reg.page(0, 5, "name"); reg.page(0, 5, "gpa")
+    reg.remove_student("S010"); reg.get_by_id("S020").add_grade("MATH", 100)
+    reg.add_student(Student("S999", "Aaron", "CS", "M", 2))
+    for order in ("insertion", "id", "name", "gpa"):
+        assert reg.page(0, len(reg), order) == _expected(reg, order)
+
+
+def test_unknown_order():
+    with pytest.raises(ValueError, match="Unknown order"):
+        _registry(3).page(0, 10, "year")
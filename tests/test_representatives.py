@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+import student_records
+
+
+def _scored(make_registry, n=300):
+    reg = make_registry(n, graded=True)
+    rnd = random.Random(3)
+    for s in reg.list_students():
+        for day in range(1, rnd.randrange(2, 9)):
+            s.record_attendance(f"2024-02-{day:02d}", "MATH", rnd.random() < 0.7)
+    return reg
+
+
+def _reps(reg, k, alpha=0.7, beta=0.3):
+    return {d: [(s.student_id, sc) for s, sc in v] for d, v in reg.choose_class_representatives(k, alpha, beta).items()}
+
+
+def test_numpy_scores_round_like_python(make_registry, monkeypatch):
+    pytest.importorskip("numpy")
+    reg = _scored(make_registry)
+    for k, alpha, beta in ((1, 0.7, 0.3), (3, 0.5, 0.5), (40, 0.5, 0.5), (300, 0.25, 0.75)):
+        with_numpy = _reps(reg, k, alpha, beta)
+        monkeypatch.setattr(student_records, "_np", None); reg._scores = None
+        assert _reps(reg, k, alpha, beta) == with_numpy
+        monkeypatch.undo(); reg._scores = None
+
+
+def _brute(reg, k, alpha, beta):
+    # full sort per department: highest rounded score first, ties in insertion order
+    out = {}
+    for i, s in enumerate(reg.list_students()):
+        out.setdefault(s.department or "-", []).append((i, s.student_id, round(alpha * (s.gpa() / 4.0 * 100.0) + beta * s.attendance_rate(), 2)))
+    return {d: [(sid, sc) for _, sid, sc in sorted(rows, key=lambda r: (-r[2], r[0]))[:k]] for d, rows in out.items()}
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_top_k_matches_a_full_sort(make_registry, monkeypatch, use_numpy):
+    if use_numpy: pytest.importorskip("numpy")
+    else: monkeypatch.setattr(student_records, "_np", None)
+    reg = _scored(make_registry, 120)
+    for i in range(40):
+        s = student_records.Student(f"E{i:03d}", f"Eng {i}", "EE", "M", 2); reg.add_student(s)
+        s.enroll_subject("MATH"); s.add_grade("MATH", 40 + i % 25); s.record_attendance("2024-01-01", "MATH", i % 2 == 0)
+    for k in (1, 2, 7, 200):
+        assert _reps(reg, k) == _brute(reg, k, 0.7, 0.3)
+    assert _reps(reg, 0) == _brute(reg, 1, 0.7, 0.3)
+
+
+def test_scores_follow_changes(make_registry):
+    reg = _scored(make_registry, 30)
+    first = _reps(reg, 1)
+    s = reg.get_by_id("S000")
+    for _ in range(20): s.add_grade("MATH", 100)
+    for day in range(10, 30): s.record_attendance(f"2024-03-{day:02d}", "MATH", True)
+    assert first["CS"][0][0] != "S000" and _reps(reg, 1)["CS"][0][0] == "S000"
+    assert _reps(reg, 1) == _brute(reg, 1, 0.7, 0.3)
@@ -0,0 +1,41 @@
+import itertools
+import random
+
+from student_records import Student, StudentRegistry
+
+
+def _brute(reg, name=None, department=None, year=None, gender=None):
+    def ok(s):
+        return ((name is None or s.name.lower() == name.lower()) and (department is None or s.department.lower() == department.lower())
+                and (year is None or s.year == int(year)) and (gender is None or s.gender.upper() == gender.upper()))
+    return sorted(s.student_id for s in reg.list_students() if ok(s))
+
+
+def _check_all(reg):
+    for name, dept, year, gender in itertools.product((None, "ann", "Bob"), (None, "cs", "EE"), (None, 1, "3"), (None, "f", "M")):
+        got = sorted(s.student_id for s in reg.query(name, dept, year, gender))
+        assert got == _brute(reg, name, dept, year, gender), (name, dept, year, gender)
+
+
+def test_query_matches_brute_force_after_adds_and_removes():
+    rng = random.Random(5); reg = StudentRegistry()
+    for i in range(200):
+        reg.add_student(Student(f"S{i:03d}", rng.choice(("Ann", "Bob", "Cy")), rng.choice(("CS", "EE")), rng.choice("FM"), rng.randint(1, 4)))
+    _check_all(reg)
+    for i in range(0, 200, 3): reg.remove_student(f"S{i:03d}")
+    _check_all(reg)
+    assert reg.query() == reg.list_students()
+    assert reg.query(name="nobody") == [] and reg.query(department="CS", year=4, name="zed") == []
+
+
+def test_query_after_json_and_indexed_loads(make_registry):
+    reg = make_registry(12); reg.add_student(Student("X1", "Ann", "EE", "M", 3))
+    reg.save(); reg.save_indexed()
+    for load in ("load", "load_indexed"):
+        r = StudentRegistry(); getattr(r, load)()
+        # queried before anything is materialized, then against the decoded students
+        assert [s.student_id for s in r.query(department="ee", gender="m")] == ["X1"]
+        assert [s.student_id for s in r.query(year=1)] == ["S000", "S004", "S008"]
+        _check_all(r)
+        r.remove_student("X1")
+        assert r.query(name="ann") == []
@@ -0,0 +1,31 @@
+import os
+
+from student_records import StudentRegistry
+
+
+def _shard_files(d):
+    return sorted(n for n in os.listdir(d) if n.startswith("shard-"))
+
+
+def test_shrinking_the_shard_count_rewrites_and_drops_stale_files(make_registry):
+    reg = make_registry(30, graded=True)
+    reg.save_shards("d", shards=16)
+    assert len(_shard_files("d")) == 16
+    reg.save_shards("d", shards=4)
+    assert _shard_files("d") == [f"shard-{k:04d}.json" for k in range(4)]
+    back = StudentRegistry(); back.load_shards("d")
+    assert sorted(back._students) == sorted(reg._students)
+    assert back.get_by_id("S007").to_dict() == reg.get_by_id("S007").to_dict()
+
+
+def test_incremental_save_rewrites_only_dirty_shards(make_registry):
+    reg = make_registry(30)
+    reg.save_shards("d", shards=8)
+    before = {n: os.stat(os.path.join("d", n)).st_mtime_ns for n in _shard_files("d")}
+    for n in before: os.utime(os.path.join("d", n), ns=(0, 0))
+    reg.get_by_id("S003").add_grade("MATH", 91)
+    reg.save_shards("d")
+    touched = [n for n in _shard_files("d") if os.stat(os.path.join("d", n)).st_mtime_ns]
+    assert touched == [f"shard-{reg._shard_for('S003'):04d}.json"]
+    back = StudentRegistry(); back.load_shards("d")
+    assert back.get_by_id("S003").to_dict() == reg.get_by_id("S003").to_dict()
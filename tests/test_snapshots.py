@@ -0,0 +1,124 @@
+import gc
+import json
+import random
+import threading
+
+import pytest
+
+from student_records import Student, StudentRegistry
+from student_records_sqlite import SQLiteStudentRegistry
+
+
+def _docs(reg, n):
+    # JSON round trip: tuples in to_dict() come back as lists, like records() read from a data file
+    return json.loads(json.dumps([reg.get_by_id(f"S{i:03d}").to_dict() for i in range(n)]))
+
+
+def _records(snap):
+    return json.loads(json.dumps(list(snap.records())))
+
+
+@pytest.mark.parametrize("thread_safe", [False, True])
+def test_snapshot_keeps_point_in_time_view(workdir, make_registry, thread_safe):
+    reg = make_registry(30, graded=True, thread_safe=thread_safe)
+    before = _docs(reg, 30)
+    snap = reg.snapshot()
+    s3 = reg.get_by_id("S003")
+    s3.add_grade("MATH", 99); s3.record_attendance("2024-01-02", "MATH", False); s3.enroll_subject("ART")
+    reg.get_by_id("S004").undo_last_grade()
+    reg.get_by_id("S005").drop_subject("MATH")
+    reg.ingest_attendance([("S006", "2024-01-03", "MATH", True)])
+    reg.remove_student("S007")
+    reg.add_student(Student("S007", "Replaced", "EE", "M", 2))
+    reg.add_student(Student("S9999", "Later", "CS", "F", 1))
+    assert _records(snap) == before
+    assert len(snap) == 30 and "S9999" not in snap and snap.student("S9999") is None
+    assert set(snap._frozen) == {"S003", "S004", "S005", "S006", "S007"}  # untouched students are not copied
+    assert [sm.gpa for sm in snap.summaries()] == [Student.from_dict(d).gpa() for d in before]
+    assert reg.get_by_id("S003").grades["MATH"][-1] == 99
+    snap.save("snap.json")
+    assert json.loads((workdir / "snap.json").read_text()) == before
+
+
+def test_snapshot_student_is_a_private_copy(make_registry):
+    reg = make_registry(3, graded=True)
+    snap = reg.snapshot()
+    copy = snap.student("S001"); copy.add_grade("MATH", 1)
+    assert snap.read("S001", lambda s: list(s.grades["MATH"])) == [51.0]
+    assert list(reg.get_by_id("S001").grades["MATH"]) == [51.0]
+
+
+def test_snapshots_share_copies_and_are_pruned(make_registry):
+    reg = make_registry(5, graded=True)
+    a, b = reg.snapshot(), reg.snapshot()
+    reg.get_by_id("S001").add_grade("MATH", 1)
+    assert a._frozen["S001"] is b._frozen["S001"]
+    a.close(); b.close()
+    assert reg._snapshots == ()
+    with pytest.raises(ValueError):
+        a.read("S001", lambda s: s)
+    with reg.snapshot():
+        pass
+    c = reg.snapshot(); del c; gc.collect()
+    assert reg._snapshots == ()
+
+
+def test_snapshot_over_lazily_loaded_registry(workdir, make_registry):
+    make_registry(20, graded=True).save_indexed("idx.bin")
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    before = [json.loads(reg._raw(f"S{i:03d}")) for i in range(20)]
+    snap = reg.snapshot()
+    reg.get_by_id("S001").add_grade("MATH", 7)  # decoded, then changed
+    reg.remove_student("S002")                  # removed while still undecoded
+    reg.load_indexed("idx.bin")                  # reload unmaps the file the snapshot was reading
+    assert _records(snap) == before
+
+
+def test_snapshot_isolated_from_concurrent_writers(make_registry):
+    reg = make_registry(200, graded=True, thread_safe=True)
+    expected = _docs(reg, 200)
+    snap = reg.snapshot(); stop = threading.Event()
+    def writer(seed):
+        rnd = random.Random(seed)
+        while not stop.is_set():
+            s = reg.get_by_id(f"S{rnd.randrange(200):03d}")
+            s.add_grade("MATH", rnd.randint(0, 100)); s.record_attendance("2024-02-01", "MATH", rnd.random() < 0.5)
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in threads: t.start()
+    try:
+        for _ in range(5):
+            assert _records(snap) == expected
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    assert snap._frozen
+
+
+def test_sqlite_snapshot_reads_a_wal_transaction(workdir, make_registry):
+    reg = make_registry(20, graded=True, cls=SQLiteStudentRegistry, db_path="s.db")
+    before = _docs(reg, 20)
+    snap = reg.snapshot()
+    reg.get_by_id("S001").add_grade("MATH", 3)
+    reg.remove_student("S002")
+    reg.add_student(Student("X1", "New", "CS", "F", 1))
+    assert _records(snap) == before and "X1" not in snap
+    assert snap.read("S002", lambda s: s.name) == "Name 002"
+    snap.close(); reg.close()
+
+
+def test_snapshot_shares_the_id_map_until_the_next_add_or_remove(make_registry):
+    reg = make_registry(5)
+    a = reg.snapshot(); b = reg.snapshot()
+    assert a._members is reg._students and b._members is reg._students  # nothing copied when taken
+    reg.get_by_id("S001").add_grade("MATH", 70)  # changing a student does not copy the map
+    assert a._members is reg._students
+    reg.add_student(Student("S100", "New", "CS", "F", 1))
+    assert a._members is b._members is not reg._students
+    assert "S100" not in a and len(a) == 5 and len(reg) == 6
+    c = reg.snapshot(); reg.remove_student("S000")
+    assert "S000" in c and "S000" not in reg._students and len(c) == 6
+    a.close(); b.close()
+    reg.add_student(Student("S101", "Later", "CS", "F", 1))
+    reg.load()  # a reload replaces the map instead of clearing one a snapshot may still hold
+    assert "S100" in c and "S101" not in c and len(c) == 6
+    c.close()
@@ -0,0 +1,55 @@
+import random
+
+from student_records import Student, StudentRegistry
+
+
+def _names(reg):
+    return [s.student_id for s in sorted(reg.list_students(), key=lambda s: s.name.lower())]
+
+
+def _gpas(reg, descending=True):
+    rows = list(enumerate(reg.list_students()))
+    rows.sort(key=lambda r: (r[1].gpa(), r[0]), reverse=descending)
+    return [s.student_id for _, s in rows]
+
+
+def _check(reg):
+    assert [s.student_id for s in reg.sorted_by_name()] == _names(reg)
+    assert [s.student_id for s in reg.sorted_by_gpa()] == _gpas(reg)
+    assert [s.student_id for s in reg.sorted_by_gpa(descending=False)] == _gpas(reg, False)
+
+
+def test_views_are_patched_not_rebuilt_across_mutations():
+    rng = random.Random(9); reg = StudentRegistry()
+    for i in range(40):
+        reg.add_student(Student(f"S{i:03d}", rng.choice(("ann", "Bob", "cy")) + str(i % 7), "CS", "F", 1))
+        reg.get_by_id(f"S{i:03d}").enroll_subject("MATH")
+    _check(reg)
+    views = dict(reg._views)
+    for step in range(200):
+        r = rng.random(); sid = rng.choice(list(reg._students))
+        if r < 0.6: reg.get_by_id(sid).add_grade("MATH", rng.randint(0, 100))
+        elif r < 0.75 and not reg.get_by_id(sid).grade_history.is_empty(): reg.get_by_id(sid).undo_last_grade()
+        elif r < 0.9: reg.remove_student(sid)
+        else:
+            reg.add_student(Student(f"N{step:03d}", rng.choice(("Ann", "bob", "Dee")), "CS", "M", 2))
+            reg.get_by_id(f"N{step:03d}").enroll_subject("MATH")
+        if step % 20 == 0: _check(reg)
+    _check(reg)
+    assert all(reg._views[k] is v for k, v in views.items())
+
+
+def test_views_reset_on_load(make_registry):
+    reg = make_registry(10, graded=True); _check(reg)
+    other = make_registry(4); other.get_by_id("S003").add_grade("MATH", 100); other.save()
+    reg.load()
+    assert len(reg) == 4 and reg.sorted_by_gpa()[0].student_id == "S003"
+    _check(reg)
+
+
+def test_views_serve_lazily_loaded_students(make_registry):
+    make_registry(8, graded=True).save_indexed("idx.bin")
+    reg = StudentRegistry(); reg.load_indexed("idx.bin")
+    assert [sm.student_id for sm in reg.page(0, 3, "gpa")] == ["S007", "S006", "S005"]
+    assert len(reg._pending) == 8
+    _check(reg)
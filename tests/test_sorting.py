@@ -0,0 +1,50 @@
+import json
+import operator
+import random
+
+import pytest
+
+from student_records import external_sort, mergesort, quicksort, sort_by
+
+
+def test_sort_by_without_keys(make_registry):
+    assert sort_by([3, 1, 2]) == [1, 2, 3]
+    reg = make_registry(3)
+    assert [sm.student_id for sm in sort_by(reversed(reg.summaries()))] == ["S000", "S001", "S002"]
+    with pytest.raises(ValueError, match="at least one key"):
+        sort_by(reg.list_students())
+    with pytest.raises(ValueError, match="at least one key"):
+        reg.sorted_by()
+
+
+_rng = random.Random(4)
+_ROWS = [(_rng.choice("abc"), _rng.randint(0, 5), i) for i in range(300)]
+
+
+def test_sort_by_multi_key_is_stable_and_honours_descending():
+    got = sort_by(_ROWS, operator.itemgetter(0), (operator.itemgetter(1), True))
+    assert got == sorted(_ROWS, key=lambda r: (r[0], -r[1], r[2]))
+    # equal keys keep input order in both directions
+    assert sort_by(_ROWS, (operator.itemgetter(0), True)) == sorted(_ROWS, key=lambda r: (-ord(r[0]), r[2]))
+
+
+def test_external_sort_matches_sort_by(tmp_path):
+    keys = (operator.itemgetter(1), (operator.itemgetter(0), True))
+    got = list(external_sort(_ROWS, *keys, chunk_size=17, encode=list, decode=tuple, tmpdir=str(tmp_path)))
+    assert got == sort_by(_ROWS, *keys)
+    assert list(external_sort([3, 1, 2], chunk_size=2)) == [1, 2, 3] and list(external_sort([])) == []
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("algo", [mergesort, quicksort])
+def test_mergesort_and_quicksort_are_stable(algo):
+    assert algo(_ROWS, key=operator.itemgetter(1)) == sorted(_ROWS, key=operator.itemgetter(1))
+    assert algo([5, 3, 9, 3, 1]) == [1, 3, 3, 5, 9] and algo([]) == [] and algo([1]) == [1]
+
+
+def test_registry_export_sorted(make_registry, workdir):
+    reg = make_registry(25, graded=True)
+    want = [s.student_id for s in sort_by(reg.list_students(), (lambda s: s.year, True), "name")]
+    for chunk in (None, 4):
+        assert reg.export_sorted("out.json", ("year", True), "name", chunk_size=chunk) == 25
+        assert [r["student_id"] for r in json.loads((workdir / "out.json").read_text())] == want
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import student_records
+from student_records import AttendanceRecord, Student, StudentRegistry
+
+DOC = [{
+    "student_id": "S1", "name": "Ada", "department": "CS", "gender": "F", "year": 2,
+    "subjects": ["MATH", "ART"],
+    "grades": {"MATH": [90, 85.5, 70], "ART": [88.0]},
+    "grade_history": [["MATH", 90.0], ["MATH", 85.5], ["MATH", 70.0], ["ART", 88.0]],
+    "attendance_log": [
+        {"date": "2024-01-01", "subject": "MATH", "present": 1},
+        {"date": "2024-01-02", "subject": "MATH", "present": False},
+        {"date": "2024-01-03", "subject": "ART", "present": 0},
+    ],
+}]
+
+
+def _load(workdir):
+    raw = json.dumps(DOC, indent=2)
+    (workdir / "data.json").write_text(raw)
+    reg = StudentRegistry(); reg.load()
+    return reg, raw
+
+
+def test_load_save_is_byte_identical(workdir):
+    reg, raw = _load(workdir)
+    reg._dirty.add("S1")
+    reg.save("out.json")
+    assert (workdir / "out.json").read_text() == raw
+
+
+def test_int_scores_survive_add_and_undo(workdir):
+    reg, _ = _load(workdir)
+    s = reg.get_by_id("S1")
+    s.add_grade("MATH", 60)
+    d = s.to_dict()
+    assert d["grades"]["MATH"] == [90, 85.5, 70, 60] and type(d["grades"]["MATH"][-1]) is int
+    assert d["grade_history"][-1] == ("MATH", 60) and type(d["grade_history"][-1][1]) is int
+    s.undo_last_grade()
+    assert s.to_dict()["grades"] == DOC[0]["grades"]
+    assert s.gpa() == round((sum([90, 85.5, 70]) / 3 + 88) / 2 / 100 * 4, 2)
+
+
+def test_present_values_are_kept_but_read_as_bools(workdir):
+    reg, _ = _load(workdir)
+    s = reg.get_by_id("S1")
+    assert [p for _d, _s, p in s.attendance_log.rows()] == [True, False, False]
+    assert [r["present"] for r in s.to_dict()["attendance_log"]] == [1, False, 0]
+    assert s.attendance_rate() == 33.33
+
+
+def test_direct_log_append_goes_through_the_student(workdir):
+    reg, _ = _load(workdir)
+    s = reg.get_by_id("S1")
+    s.attendance_log.append(AttendanceRecord("2024-01-04", "art", True))
+    assert s.attendance_rate() == 50.0 and s.attendance_rate("ART") == 50.0
+    assert reg._dirty == {"S1"}
+    with pytest.raises(ValueError):
+        s.attendance_log.append(AttendanceRecord("2024-01-05", "HIST", True))
+    assert len(s.attendance_log) == 4
+
+
+def test_equality_follows_what_is_saved(workdir):
+    a = Student.from_dict(DOC[0])
+    b = Student.from_dict({**DOC[0], "attendance_log": [{**r, "present": bool(r["present"])} for r in DOC[0]["attendance_log"]]})
+    assert a.attendance_log != b.attendance_log
+    assert a.attendance_log == Student.from_dict(DOC[0]).attendance_log
+    c = Student.from_dict(DOC[0])
+    assert a.grade_history == c.grade_history
+    c.grade_history.push(("ART", 70)); a.grade_history.push(("ART", 70.0))
+    assert a.grade_history != c.grade_history
+
+
+def test_date_codes_and_parse_cache(workdir):
+    s = Student.from_dict(DOC[0])
+    interned = len(student_records._DATE_CODES.values)
+    s.enroll_subject("HIST")
+    s.record_attendance("2031-05-06", "HIST", True)
+    assert len(student_records._DATE_CODES.values) == interned  # ISO dates are stored as day numbers
+    s.record_attendance("week 3", "HIST", False)
+    assert [r.date for r in s.attendance_log][-2:] == ["2031-05-06", "week 3"]
+    assert s.attendance_between("2031-05-01", "2031-05-31") == (1, 1)
+    before = student_records._iso_day.cache_info().currsize
+    assert student_records._day_number("2024-02-30") is None
+    assert student_records._iso_day.cache_info().currsize == before
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from student_records import AVLTree, _avl_h
+
+
+def _check(n):
+    # returns (height, size) and asserts the AVL and size invariants at every node
+    if n is None: return 0, 0
+    lh, ls = _check(n.left); rh, rs = _check(n.right)
+    assert abs(lh - rh) <= 1
+    assert n.height == 1 + max(lh, rh) and n.size == 1 + ls + rs
+    return n.height, n.size
+
+
+def test_sequential_inserts_stay_balanced():
+    t = AVLTree()
+    for i in range(1024): t.insert(f"S{i:05d}", i)
+    _check(t._root)
+    assert _avl_h(t._root) <= 11
+    assert [k for k, _ in t.inorder()] == [f"S{i:05d}" for i in range(1024)]
+
+
+def test_random_inserts_and_deletes_match_dict():
+    rng = random.Random(7); t = AVLTree(); ref = {}
+    for _ in range(3000):
+        k = rng.randrange(500)
+        if rng.random() < 0.4: t.delete(k); ref.pop(k, None)
+        else: t.insert(k, -k); ref[k] = -k
+    _check(t._root)
+    assert len(t) == len(ref)
+    assert list(t.inorder()) == sorted(ref.items())
+    assert all(t.search(k) == ref.get(k) for k in range(500))
+
+
+def test_range_prefix_and_positional_scans():
+    keys = sorted(f"{p}{i:03d}" for p in ("A", "B", "C") for i in range(50))
+    t = AVLTree.from_sorted([(k, k.lower()) for k in keys])
+    _check(t._root)
+    assert [k for k, _ in t.range("A040", "B009")] == [k for k in keys if "A040" <= k <= "B009"]
+    assert [k for k, _ in t.range(hi="A002")] == ["A000", "A001", "A002"]
+    assert [k for k, _ in t.range("C048")] == ["C048", "C049"]
+    assert [k for k, _ in t.prefix("B01")] == [f"B01{i}" for i in range(10)]
+    assert list(t.prefix("D")) == []
+    assert t.slice(45, 10) == [(k, k.lower()) for k in keys[45:55]]
+    assert t.slice(145, 10) == [(k, k.lower()) for k in keys[145:]]
+    assert t.at(75) == (keys[75], keys[75].lower())
+    with pytest.raises(IndexError): t.at(150)
+
+
+def test_registry_id_scans(make_registry):
+    reg = make_registry(30)
+    reg.remove_student("S012")
+    assert [s.student_id for s in reg.students_in_id_range("S010", "S014")] == ["S010", "S011", "S013", "S014"]
+    assert [s.student_id for s in reg.students_with_id_prefix("S02")] == [f"S02{i}" for i in range(10)]
+    assert [s.student_id for s in reg.sorted_by_id()] == sorted(s.student_id for s in reg.list_students())
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("tkinter")
+import student_records_GUI as gui  # noqa: E402
+
+
+class _Var:
+    def __init__(self): self.value = ""
+    def set(self, v): self.value = v
+    def get(self): return self.value
+
+
+class _Widget:
+    def __init__(self): self.opts = {"mode": "indeterminate"}; self.running = False
+    def configure(self, **kw): self.opts.update(kw)
+    def cget(self, k): return self.opts.get(k)
+    def start(self, _ms=None): self.running = True
+    def stop(self): self.running = False
+
+
+class _App:
+    # stands in for the Tk root: after() callbacks are queued and run by drain() on the test thread
+    def __init__(self): self.pending = []; self.busy = []
+    def after(self, _ms, fn): self.pending.append(fn)
+    def _set_busy(self, busy, write): self.busy.append((busy, write))
+    def drain(self):
+        deadline = time.monotonic() + 5
+        while self.pending and time.monotonic() < deadline:
+            self.pending.pop(0)()
+            if self.pending: time.sleep(0.001)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    shown = []
+    monkeypatch.setattr(gui.messagebox, "showerror", lambda *a: shown.append(("error",) + a))
+    monkeypatch.setattr(gui.messagebox, "showwarning", lambda *a: shown.append(("warning",) + a))
+    r = gui.TaskRunner.__new__(gui.TaskRunner)
+    r.app = _App(); r.poll_ms = 1; r._events = gui.queue.Queue(); r.current = None; r.write = False
+    r.status = _Var(); r.cancel_btn = _Widget(); r.bar = _Widget(); r.shown = shown
+    return r
+
+
+def test_task_runs_on_a_worker_and_reports_back_through_after(runner):
+    got = []
+    def work(t):
+        for i in range(3): t.progress(i + 1, 3)
+        return threading.current_thread().name
+    runner.run("Loading", work, on_done=got.append, write=True)
+    assert runner.busy and runner.write and runner.app.busy == [(True, True)]
+    runner.app.drain()
+    assert got == ["task:Loading"] and not runner.busy
+    assert runner.status.get() == "Loading done" and runner.app.busy[-1] == (False, False)
+    assert runner.bar.cget("mode") == "indeterminate" and runner.cancel_btn.cget("state") == "disabled"
+
+
+def test_cancel_and_errors(runner):
+    got = []; gate = threading.Event()
+    def slow(t):
+        gate.wait(5); t.check(); return "unreachable"
+    task = runner.run("Sorting", slow, on_done=got.append)
+    assert runner.cancel_btn.cget("state") == "normal"
+    runner.cancel(); gate.set()
+    assert task.cancelled and runner.status.get() == "Sorting (cancelling)..."
+    runner.app.drain()
+    assert got == [] and runner.status.get() == "Sorting cancelled" and not runner.busy
+    runner.run("Saving", lambda t: 1 / 0, on_done=got.append)
+    runner.app.drain()
+    assert got == [] and runner.status.get() == "Saving failed" and runner.shown[0][0] == "error"
+
+
+def test_one_task_at_a_time(runner):
+    gate = threading.Event()
+    runner.run("Saving", lambda t: gate.wait(5))
+    assert runner.run("Loading", lambda t: None) is None and runner.shown[-1][0] == "warning"
+    gate.set(); runner.app.drain()
+    assert not runner.busy
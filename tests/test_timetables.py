@@ -0,0 +1,33 @@
+import concurrent.futures
+import random
+
+import student_records
+from student_records import Student, StudentRegistry
+
+
+def _registry():
+    reg = StudentRegistry(); rnd = random.Random(7)
+    codes = [f"C{i:02d}" for i in range(12)]
+    for c in codes:
+        start = rnd.randrange(480, 900)
+        reg.set_subject_slot(c, start, start + rnd.randrange(30, 120), rnd.random() * 3)
+    for i in range(300):
+        reg.add_student(Student(f"S{i:03d}", f"Name {i}", "CS", "F", 1))
+        s = reg.get_by_id(f"S{i:03d}")
+        for c in rnd.sample(codes, 5): s.enroll_subject(c)
+    return reg
+
+
+def test_default_runs_in_process(monkeypatch):
+    def no_pool(*a, **k): raise AssertionError("process pool used without workers > 0")
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(student_records, "_TIMETABLE_POOL_MIN", 1)
+    reg = _registry()
+    plans = reg.optimize_timetables()
+    assert plans == {s.student_id: reg.optimize_timetable_for(s.student_id) for s in reg.list_students()}
+
+
+def test_pool_matches_in_process(monkeypatch):
+    monkeypatch.setattr(student_records, "_TIMETABLE_POOL_MIN", 1)
+    inline = _registry().optimize_timetables(workers=0)
+    assert _registry().optimize_timetables(workers=2) == inline